@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+#
+# Tests the --import-ast option of the compiler by exporting the AST of every syntax test and
+# AST JSON test, importing it back and exporting it again. The second AST must be identical to
+# the first one.
+#
+# Each test is compiled and exported with a single Standard JSON invocation that contains all of
+# its sources. Tests are processed in parallel and the ASTs are compared in memory.
+#
+# Usage: scripts/ASTImportTest.py <path to solc> [--jobs N] [test files or directories...]
+#
+# Set DIFFVIEW to a diff tool to have it called on every pair of mismatched ASTs.
+
+import difflib
+import json
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from functools import partial
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional, Tuple, Union
+
+from splitSources import loadSources
+
+
+REPO_ROOT = Path(__file__).parent.parent
+DEFAULT_TEST_DIRS = [
+    REPO_ROOT / 'test/libsolidity/syntaxTests',
+    REPO_ROOT / 'test/libsolidity/ASTJSON',
+]
+
+
+class TestOutcome(Enum):
+    PASSED = 'passed'
+    FAILED = 'failed'
+    UNCOMPILABLE = 'uncompilable'
+
+
+@dataclass(frozen=True)
+class TestResult:
+    test_file: Path
+    source_count: int
+    outcome: TestOutcome
+    # Error output of the compiler if the import failed, None otherwise.
+    message: Optional[str] = None
+    # ASTs from the first and the second export if they differ, None otherwise.
+    expected_asts: Optional[Dict[str, dict]] = None
+    obtained_asts: Optional[Dict[str, dict]] = None
+
+
+def find_test_files(paths: List[Union[Path, str]]) -> List[Path]:
+    test_files = []
+    for path in paths:
+        if Path(path).is_dir():
+            test_files += sorted(Path(path).glob('**/*.sol'))
+        else:
+            test_files.append(Path(path))
+    return test_files
+
+
+def prepare_sources(test_file: Path) -> Tuple[Dict[str, dict], bool]:
+    # Returns the `sources` part of the Standard JSON input and a flag saying whether the compiler
+    # needs to read the file from disk.
+    try:
+        sources = loadSources(test_file)
+    except UnicodeDecodeError:
+        # NOTE: This is expected for some tests containing invalid utf8 sequences. Such a file
+        # cannot be embedded in JSON so the compiler has to load it on its own.
+        return ({str(test_file): {'urls': [str(test_file)]}}, True)
+
+    if sources is None:
+        with open(test_file, mode='r', encoding='utf8', newline='') as source_file:
+            return ({str(test_file): {'content': source_file.read()}}, False)
+
+    return ({source_name: {'content': content} for source_name, content in sources.items()}, False)
+
+
+def prepare_standard_json_input(sources: Dict[str, dict]) -> str:
+    return json.dumps({
+        'language': 'Solidity',
+        'sources': sources,
+        'settings': {
+            # NOTE: Bytecode is requested only so that the compiler goes through code generation.
+            # Importing the AST triggers it as well so tests that fail there must not be imported.
+            'outputSelection': {'*': {'*': ['evm.bytecode.object'], '': ['ast']}},
+        },
+    })
+
+
+def remove_null_members(value):
+    # Equivalent of removeNullMembers() that the compiler applies to --combined-json output.
+    if isinstance(value, dict):
+        return {key: remove_null_members(member) for key, member in value.items() if member is not None}
+    if isinstance(value, list):
+        return [remove_null_members(element) for element in value]
+    return value
+
+
+def export_asts(compiler_path: Path, test_file: Path) -> Tuple[int, Optional[Dict[str, dict]]]:
+    # Returns the number of sources in the test and their ASTs, in the same format as the compiler
+    # prints them with --combined-json. The ASTs are None if the test could not be compiled.
+    (sources, read_from_disk) = prepare_sources(test_file)
+
+    command_line = [str(compiler_path), '--standard-json']
+    if read_from_disk:
+        command_line += ['--allow-paths', str(test_file.parent)]
+
+    process = subprocess.run(
+        command_line,
+        input=prepare_standard_json_input(sources),
+        encoding='utf8',
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    if process.returncode != 0:
+        return (len(sources), None)
+
+    output = json.loads(process.stdout)
+    if any(error['severity'] == 'error' for error in output.get('errors', [])):
+        return (len(sources), None)
+
+    return (
+        len(sources),
+        {source_name: remove_null_members(source['ast']) for source_name, source in output['sources'].items()},
+    )
+
+
+def import_and_export_asts(
+    compiler_path: Path,
+    asts: Dict[str, dict],
+    tmp_file_path: Path,
+) -> Tuple[bool, Union[Dict[str, dict], str]]:
+    # Returns the ASTs exported again from the imported ones or the error output of the compiler.
+    with open(tmp_file_path, 'w', encoding='utf8') as tmp_file:
+        json.dump({'sources': {source_name: {'AST': ast} for source_name, ast in asts.items()}}, tmp_file)
+
+    process = subprocess.run(
+        [str(compiler_path), '--import-ast', '--combined-json', 'ast,compact-format', str(tmp_file_path)],
+        encoding='utf8',
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if process.returncode != 0:
+        return (False, process.stderr)
+
+    output = json.loads(process.stdout)
+    return (True, {source_name: source['AST'] for source_name, source in output['sources'].items()})
+
+
+def run_round_trip(compiler_path: Path, test_file: Path, tmp_file_path: Path) -> TestResult:
+    (source_count, expected_asts) = export_asts(compiler_path, test_file)
+    if expected_asts is None:
+        return TestResult(test_file, source_count, TestOutcome.UNCOMPILABLE)
+
+    (imported, result) = import_and_export_asts(compiler_path, expected_asts, tmp_file_path)
+    if not imported:
+        return TestResult(test_file, source_count, TestOutcome.FAILED, message=result)
+
+    if result != expected_asts:
+        return TestResult(test_file, source_count, TestOutcome.FAILED, expected_asts=expected_asts, obtained_asts=result)
+
+    return TestResult(test_file, source_count, TestOutcome.PASSED)
+
+
+def format_ast_diff(expected_asts: Dict[str, dict], obtained_asts: Dict[str, dict]) -> str:
+    return ''.join(difflib.unified_diff(
+        json.dumps(expected_asts, indent=2, sort_keys=True).splitlines(keepends=True),
+        json.dumps(obtained_asts, indent=2, sort_keys=True).splitlines(keepends=True),
+        fromfile='expected',
+        tofile='obtained',
+    ))
+
+
+def report_failure(result: TestResult, diff_view: Optional[str], tmp_dir: Path):
+    if result.message is not None:
+        print(f"\nERROR: Failed to import the AST of {result.test_file}:\n{result.message}")
+    elif diff_view is None:
+        print(f"\nERROR: JSONS differ for {result.test_file}:\n{format_ast_diff(result.expected_asts, result.obtained_asts)}")
+    else:
+        # Use user supplied diff view binary
+        expected_path = tmp_dir / 'expected.json'
+        obtained_path = tmp_dir / 'obtained.json'
+        expected_path.write_text(json.dumps(result.expected_asts, indent=2, sort_keys=True), encoding='utf8')
+        obtained_path.write_text(json.dumps(result.obtained_asts, indent=2, sort_keys=True), encoding='utf8')
+        subprocess.run([diff_view, str(expected_path), str(obtained_path)], check=False)
+
+
+def run_tests(compiler_path: Path, test_files: List[Path], jobs: int, diff_view: Optional[str]) -> bool:
+    counts = {outcome: 0 for outcome in TestOutcome}
+    source_count = 0
+
+    print(f"Looking at {len(test_files)} .sol files...")
+    with TemporaryDirectory(prefix='ASTImportTest-') as tmp_dir:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # NOTE: map() returns results in the order of the input so the output does not depend
+            # on the number of jobs.
+            results = executor.map(
+                partial(run_round_trip, compiler_path),
+                test_files,
+                [Path(tmp_dir) / f'{i}.json' for i in range(len(test_files))],
+            )
+            for result in results:
+                print('.', end='', flush=True)
+                counts[result.outcome] += 1
+                source_count += result.source_count
+                if result.outcome == TestOutcome.FAILED:
+                    report_failure(result, diff_view, Path(tmp_dir))
+
+    print()
+    if counts[TestOutcome.FAILED] == 0:
+        print(
+            f"SUCCESS: {counts[TestOutcome.PASSED]} syntaxTests passed, {counts[TestOutcome.FAILED]} failed, "
+            f"{counts[TestOutcome.UNCOMPILABLE]} could not be compiled ({source_count} sources total)."
+        )
+        return True
+
+    print(
+        f"FAILURE: Out of {len(test_files)} tests ({source_count} sources), {counts[TestOutcome.FAILED]} failed, "
+        f"({counts[TestOutcome.UNCOMPILABLE]} could not be compiled)."
+    )
+    return False
+
+
+def parse_command_line():
+    script_description = (
+        "Exports the AST of every test, imports it back into the compiler and checks that exporting "
+        "it again gives the same result."
+    )
+
+    parser = ArgumentParser(description=script_description)
+    parser.add_argument(dest='compiler_path', help="Solidity compiler executable")
+    parser.add_argument(
+        dest='test_paths',
+        nargs='*',
+        default=DEFAULT_TEST_DIRS,
+        help="Test files or directories to search for *.sol files. By default syntax tests and AST JSON tests.",
+    )
+    parser.add_argument(
+        '--jobs',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count(),
+        help="Number of tests processed in parallel. By default the number of CPUs.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    options = parse_command_line()
+    success = run_tests(
+        Path(options.compiler_path),
+        find_test_files(options.test_paths),
+        options.jobs,
+        os.environ.get('DIFFVIEW') or None,
+    )
+    sys.exit(0 if success else 1)
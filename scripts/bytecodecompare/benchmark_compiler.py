@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+
+import sys
+import hashlib
+import json
+import statistics
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional
+
+# NOTE: Makes bytecodecompare importable as a package when the script is executed directly.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pragma pylint: disable=import-error,wrong-import-position
+from bytecodecompare.prepare_report import CompilerInterface, CompilerProfile, SMTUse
+from bytecodecompare.prepare_report import detect_metadata_cli_option_support, find_source_files, load_source, run_compiler
+# pragma pylint: enable=import-error,wrong-import-position
+
+
+OPTIMIZE_SETTINGS = {'unoptimized': False, 'optimized': True}
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    baseline_time: float
+    current_time: float
+
+    def __str__(self) -> str:
+        change = (self.current_time - self.baseline_time) / self.baseline_time * 100 if self.baseline_time > 0 else float('inf')
+        return f"{self.name}: {self.baseline_time:.4f} s -> {self.current_time:.4f} s (+{change:.1f}%)"
+
+
+def corpus_hash(source_file_names: List[str]) -> str:
+    # Identifies the exact set of sources so that results for different corpora are never compared.
+    corpus_digest = hashlib.sha256()
+    for source_file_name in source_file_names:
+        corpus_digest.update(source_file_name.encode('utf8') + b'\0')
+        corpus_digest.update(hashlib.sha256(load_source(source_file_name, SMTUse.PRESERVE).encode('utf8')).digest())
+    return corpus_digest.hexdigest()
+
+
+def summarize(times: List[float]) -> Dict[str, float]:
+    return {
+        'median': statistics.median(times),
+        'variance': statistics.variance(times) if len(times) > 1 else 0.0,
+    }
+
+
+def run_benchmark(  # pylint: disable=too-many-arguments,too-many-locals
+    source_file_names: List[str],
+    compiler_path: Path,
+    interface: CompilerInterface,
+    smt_use: SMTUse,
+    repeat: int,
+    metric: str,
+    corpus_version: str,
+) -> dict:
+    metadata_option_supported = detect_metadata_cli_option_support(compiler_path)
+
+    # times[setting][file name] -> list of times, one per repetition
+    times: Dict[str, Dict[str, List[float]]] = {setting: {f: [] for f in source_file_names} for setting in OPTIMIZE_SETTINGS}
+    total_times: List[float] = []
+
+    with TemporaryDirectory(prefix='benchmark_compiler-') as tmp_dir:
+        # NOTE: Repetitions are the outermost loop so that any slow drift in machine performance
+        # affects all files equally instead of skewing the results for some of them.
+        for repetition in range(repeat):
+            total_time = 0.0
+            for setting, optimize in OPTIMIZE_SETTINGS.items():
+                for source_file_name in source_file_names:
+                    profile = CompilerProfile()
+                    run_compiler(
+                        compiler_path,
+                        Path(source_file_name),
+                        optimize,
+                        False,
+                        interface,
+                        smt_use,
+                        metadata_option_supported,
+                        Path(tmp_dir),
+                        False,
+                        None,
+                        profile,
+                    )
+
+                    assert len(profile.runs) == 1
+                    run_time = getattr(profile.runs[0], metric)
+                    if run_time is None:
+                        raise Exception(f"Metric '{metric}' is not available on this platform.")
+
+                    times[setting][source_file_name].append(run_time)
+                    total_time += run_time
+
+            total_times.append(total_time)
+            print(f"Repetition {repetition + 1}/{repeat}: {total_time:.2f} s", flush=True)
+
+    return {
+        'corpus_version': corpus_version,
+        'corpus_hash': corpus_hash(source_file_names),
+        'interface': interface.value,
+        'metric': metric,
+        'repeat': repeat,
+        'total': summarize(total_times),
+        'files': {
+            source_file_name: {setting: summarize(times[setting][source_file_name]) for setting in OPTIMIZE_SETTINGS}
+            for source_file_name in source_file_names
+        },
+    }
+
+
+def find_regressions(
+    results: dict,
+    baseline: dict,
+    threshold: float,
+    file_threshold: float,
+    min_file_time_delta: float,
+) -> List[Regression]:
+    for key in ['corpus_version', 'corpus_hash', 'interface', 'metric']:
+        if results[key] != baseline[key]:
+            raise ValueError(f"Results are not comparable with the baseline: different {key}.")
+
+    regressions = []
+
+    if results['total']['median'] > baseline['total']['median'] * (1 + threshold):
+        regressions.append(Regression('<total>', baseline['total']['median'], results['total']['median']))
+
+    for source_file_name, file_results in sorted(results['files'].items()):
+        for setting in OPTIMIZE_SETTINGS:
+            baseline_time = baseline['files'][source_file_name][setting]['median']
+            current_time = file_results[setting]['median']
+
+            # NOTE: Very short compilations are dominated by noise. The absolute difference must be
+            # significant too, not just the relative one.
+            if (
+                current_time > baseline_time * (1 + file_threshold) and
+                current_time - baseline_time > min_file_time_delta
+            ):
+                regressions.append(Regression(f"{source_file_name} ({setting})", baseline_time, current_time))
+
+    return regressions
+
+
+def commandline_parser() -> ArgumentParser:
+    script_description = (
+        "Measures the time it takes to compile all the *.sol files found in the current working directory "
+        "(the benchmark corpus, e.g. test cases extracted with isolate_tests.py) with and without the optimizer. "
+        "Every file is compiled multiple times and median times are reported. "
+        "Optionally compares the results against a baseline and fails if compilation got slower."
+    )
+
+    parser = ArgumentParser(description=script_description)
+    parser.add_argument(dest='compiler_path', help="Solidity compiler executable")
+    parser.add_argument(
+        '--interface',
+        dest='interface',
+        default=CompilerInterface.STANDARD_JSON.value,
+        choices=[c.value for c in CompilerInterface],
+        help="Compiler interface to use.",
+    )
+    parser.add_argument(
+        '--smt-use',
+        dest='smt_use',
+        default=SMTUse.DISABLE.value,
+        choices=[s.value for s in SMTUse],
+        help="What to do about contracts that use the experimental SMT checker."
+    )
+    parser.add_argument('--repeat', dest='repeat', default=5, type=int, help="Number of times to compile every file.")
+    parser.add_argument(
+        '--metric',
+        dest='metric',
+        default='wall_time',
+        choices=['wall_time', 'cpu_time'],
+        help="What to measure. CPU time is less noisy but not available on all platforms.",
+    )
+    parser.add_argument(
+        '--corpus-version',
+        dest='corpus_version',
+        default='unversioned',
+        help="Label identifying the corpus. Results are only compared against a baseline with the same label.",
+    )
+    parser.add_argument('--output-file', dest='output_file', default='benchmark.json', help="File to write the results to.")
+    parser.add_argument(
+        '--baseline-file',
+        dest='baseline_file',
+        default=None,
+        help="Results of an earlier run to compare against.",
+    )
+    parser.add_argument(
+        '--threshold',
+        dest='threshold',
+        default=0.05,
+        type=float,
+        help="Maximum allowed relative increase of the total median time (0.05 means 5%%).",
+    )
+    parser.add_argument(
+        '--file-threshold',
+        dest='file_threshold',
+        default=0.25,
+        type=float,
+        help="Maximum allowed relative increase of the median time for a single file.",
+    )
+    parser.add_argument(
+        '--min-file-time-delta',
+        dest='min_file_time_delta',
+        default=0.05,
+        type=float,
+        help="Increases of the median time for a single file smaller than this many seconds are never reported.",
+    )
+    return parser
+
+
+def main(options) -> int:
+    source_file_names = find_source_files()
+    if len(source_file_names) == 0:
+        print("No *.sol files found in the current working directory.", file=sys.stderr)
+        return 1
+
+    baseline: Optional[dict] = None
+    if options.baseline_file is not None:
+        with open(options.baseline_file, encoding='utf8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = run_benchmark(
+        source_file_names,
+        Path(options.compiler_path),
+        CompilerInterface(options.interface),
+        SMTUse(options.smt_use),
+        options.repeat,
+        options.metric,
+        options.corpus_version,
+    )
+
+    with open(options.output_file, 'w', encoding='utf8', newline='\n') as output_file:
+        json.dump(results, output_file, indent=4, sort_keys=True)
+        output_file.write('\n')
+
+    print(f"Total median: {results['total']['median']:.2f} s, variance: {results['total']['variance']:.4f}")
+
+    if baseline is None:
+        return 0
+
+    try:
+        regressions = find_regressions(
+            results,
+            baseline,
+            options.threshold,
+            options.file_threshold,
+            options.min_file_time_delta,
+        )
+    except ValueError as exception:
+        print(f"Cannot compare with {options.baseline_file}: {exception}", file=sys.stderr)
+        return 1
+    if len(regressions) > 0:
+        print(f"Baseline total median: {baseline['total']['median']:.2f} s")
+        print(f"Found {len(regressions)} regressions:")
+        for regression in regressions:
+            print(f"    {regression}")
+        return 1
+
+    print(f"No regressions compared to the baseline (total median: {baseline['total']['median']:.2f} s).")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = commandline_parser()
+    options = parser.parse_args()
+    if options.repeat < 1:
+        parser.error("--repeat must be at least 1.")
+
+    sys.exit(main(options))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+# Stand-in for a long-lived compiler process, implementing the line-delimited protocol expected by
+# `prepare_report.py --compiler-server`. Every request is handled by running the compiler binary
+# given on the command line with --standard-json, so there is no actual start-up cost saved. It
+# exists so that the driver can be used and tested without a compiler build that supports the
+# protocol natively.
+#
+# Protocol (one JSON object per line, UTF-8):
+# - Once ready to accept requests, the server writes {"ready": true}.
+# - Request:  {"id": <int>, "input": <Standard JSON input as a string>}
+# - Response: {"id": <int>, "output": <Standard JSON output as a string>, "exit_code": <int>, "stderr": <string>}
+# - The server exits when its standard input is closed.
+#
+# Usage: cli_compiler_server.py <compiler command>...
+
+import sys
+import json
+import subprocess
+
+
+def serve(compiler_command):
+    print(json.dumps({'ready': True}), flush=True)
+
+    for line in sys.stdin:
+        if line.strip() == '':
+            continue
+
+        request = json.loads(line)
+        process = subprocess.run(
+            compiler_command + ['--standard-json'],
+            input=request['input'],
+            encoding='utf8',
+            capture_output=True,
+            check=False,
+        )
+
+        print(json.dumps({
+            'id': request['id'],
+            'output': process.stdout,
+            'exit_code': process.returncode,
+            'stderr': process.stderr,
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Usage: cli_compiler_server.py <compiler command>...")
+
+    serve(sys.argv[1:])
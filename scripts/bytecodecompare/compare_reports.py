@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+import sys
+import hashlib
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+# NOTE: Reports produced by prepare_report.py and prepare_report.js list all the files twice, first
+# compiled without and then with the optimizer. Files are listed in the same order in both passes.
+OPTIMIZE_SETTINGS = [False, True]
+
+
+@dataclass(frozen=True)
+class ReportEntry:
+    # The optimize setting is not stated explicitly in the report. It's inferred from the position.
+    optimize: bool
+    file_name: str
+    contract_name: Optional[str]
+    # NOTE: Storing digests rather than full values keeps memory usage independent of bytecode size.
+    bytecode_digest: Optional[bytes]
+    stripped_bytecode_digest: Optional[bytes]
+    metadata_digest: Optional[bytes]
+
+    @property
+    def key(self) -> Tuple[bool, str, Optional[str]]:
+        return (self.optimize, self.file_name, self.contract_name)
+
+    def format_key(self) -> str:
+        contract_name = self.contract_name if self.contract_name is not None else '<ERROR>'
+        return f"{self.file_name}:{contract_name} (optimize={self.optimize})"
+
+
+@dataclass
+class ComparisonResult:
+    bytecode_differences: List[ReportEntry] = field(default_factory=list)
+    metadata_differences: List[ReportEntry] = field(default_factory=list)
+    cbor_only_differences: List[ReportEntry] = field(default_factory=list)
+    only_in_first: List[ReportEntry] = field(default_factory=list)
+    only_in_second: List[ReportEntry] = field(default_factory=list)
+
+    def identical(self) -> bool:
+        return (
+            len(self.bytecode_differences) == 0 and
+            len(self.metadata_differences) == 0 and
+            len(self.only_in_first) == 0 and
+            len(self.only_in_second) == 0
+        )
+
+    def format_summary(self, first_report_name: str, second_report_name: str) -> str:
+        summary = ""
+        for title, entries in [
+            ("Bytecode differences", self.bytecode_differences),
+            ("Metadata differences", self.metadata_differences),
+            (f"Only in {first_report_name}", self.only_in_first),
+            (f"Only in {second_report_name}", self.only_in_second),
+        ]:
+            if len(entries) > 0:
+                summary += f"{title} ({len(entries)}):\n"
+                summary += ''.join(f"    {entry.format_key()}\n" for entry in sorted(entries, key=sort_key))
+
+        if len(self.cbor_only_differences) > 0:
+            summary += (
+                f"Ignored {len(self.cbor_only_differences)} bytecode differences confined to the "
+                "CBOR metadata at the end of the bytecode.\n"
+            )
+
+        return summary
+
+
+def sort_key(entry: ReportEntry) -> Tuple[bool, str, str]:
+    return (entry.optimize, entry.file_name, entry.contract_name if entry.contract_name is not None else '')
+
+
+def digest(value: str) -> bytes:
+    return hashlib.sha256(value.encode('utf8')).digest()
+
+
+def strip_cbor_metadata(bytecode: str) -> str:
+    # The compiler appends CBOR-encoded metadata (including the metadata hash) to the bytecode,
+    # followed by its length as a two-byte big endian integer. If the tail does not look like
+    # that, the bytecode is returned unchanged.
+    if len(bytecode) < 4 or len(bytecode) % 2 != 0:
+        return bytecode
+
+    try:
+        cbor_length = int(bytecode[-4:], 16)
+    except ValueError:
+        return bytecode
+
+    cbor_start = len(bytecode) - 4 - 2 * cbor_length
+    # CBOR map with 1-3 entries (ipfs/bzzr, solc, experimental).
+    if cbor_length == 0 or cbor_start < 0 or bytecode[cbor_start:cbor_start + 2] not in ['a1', 'a2', 'a3']:
+        return bytecode
+
+    return bytecode[:cbor_start]
+
+
+def parse_report_line(line: str) -> Tuple[str, Optional[str], str]:
+    # Lines look like '<file name>:<contract name> <value>' or '<file name>: <ERROR>'.
+    # NOTE: Only the last colon before the first space is the separator because the file name
+    # could in principle contain one too.
+    (key, value) = line.rstrip('\n').split(' ', 1)
+    (file_name, contract_name) = key.rsplit(':', 1)
+    return (file_name, contract_name if contract_name != '' else None, value)
+
+
+def iter_report_lines(report_path: Path) -> Iterator[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
+    # Yields (file name, contract name, bytecode, metadata) tuples, one per contract or error.
+    pending_bytecode = None
+
+    with open(report_path, encoding='utf8', newline='\n') as report_file:
+        for line in report_file:
+            if line.strip() == '':
+                continue
+
+            (file_name, contract_name, value) = parse_report_line(line)
+
+            if contract_name is None:
+                yield (file_name, None, None, None)
+            elif pending_bytecode is None:
+                # Bytecode always comes first, then metadata.
+                pending_bytecode = (file_name, contract_name, value)
+            else:
+                (bytecode_file_name, bytecode_contract_name, bytecode) = pending_bytecode
+                if (bytecode_file_name, bytecode_contract_name) != (file_name, contract_name):
+                    raise ValueError(f"Missing metadata line for {bytecode_file_name}:{bytecode_contract_name}.")
+
+                pending_bytecode = None
+                yield (file_name, contract_name, bytecode, value)
+
+    if pending_bytecode is not None:
+        raise ValueError(f"Missing metadata line for {pending_bytecode[0]}:{pending_bytecode[1]}.")
+
+
+def iter_report_entries(report_path: Path) -> Iterator[ReportEntry]:
+    # The start of the next pass is recognized by seeing the first file of the report again.
+    # Only the contracts from that one file need to be remembered for that.
+    first_file_name = None
+    first_file_contracts: Set[Optional[str]] = set()
+    left_first_file = False
+    optimize_index = 0
+
+    for (file_name, contract_name, bytecode, metadata) in iter_report_lines(report_path):
+        if first_file_name is None:
+            first_file_name = file_name
+
+        if file_name != first_file_name:
+            left_first_file = True
+        else:
+            # NOTE: Within a single pass a file has either an error or contracts, never both.
+            if (
+                left_first_file or
+                contract_name in first_file_contracts or
+                (len(first_file_contracts) > 0 and (None in first_file_contracts) != (contract_name is None))
+            ):
+                optimize_index += 1
+                left_first_file = False
+                first_file_contracts.clear()
+            first_file_contracts.add(contract_name)
+
+        if optimize_index >= len(OPTIMIZE_SETTINGS):
+            raise ValueError(f"Report {report_path} contains more than {len(OPTIMIZE_SETTINGS)} passes.")
+
+        if contract_name is None:
+            yield ReportEntry(OPTIMIZE_SETTINGS[optimize_index], file_name, None, None, None, None)
+        else:
+            assert bytecode is not None and metadata is not None
+            yield ReportEntry(
+                OPTIMIZE_SETTINGS[optimize_index],
+                file_name,
+                contract_name,
+                bytecode_digest=digest(bytecode),
+                stripped_bytecode_digest=digest(strip_cbor_metadata(bytecode)),
+                metadata_digest=digest(metadata),
+            )
+
+
+def compare_entries(first: ReportEntry, second: ReportEntry, result: ComparisonResult):
+    if first.stripped_bytecode_digest != second.stripped_bytecode_digest:
+        result.bytecode_differences.append(first)
+    elif first.bytecode_digest != second.bytecode_digest:
+        result.cbor_only_differences.append(first)
+
+    if first.metadata_digest != second.metadata_digest:
+        result.metadata_differences.append(first)
+
+
+def compare_reports(first_report_path: Path, second_report_path: Path) -> ComparisonResult:
+    # Both reports are read in lockstep and entries are only kept in memory until the matching
+    # entry from the other report shows up. When the reports list files in the same order (which
+    # is the case for reports produced by the same script), the memory usage stays constant.
+    result = ComparisonResult()
+    pending_first: Dict[Tuple[bool, str, Optional[str]], ReportEntry] = {}
+    pending_second: Dict[Tuple[bool, str, Optional[str]], ReportEntry] = {}
+
+    for first_entry, second_entry in zip_longest(
+        iter_report_entries(first_report_path),
+        iter_report_entries(second_report_path),
+    ):
+        if first_entry is not None:
+            if first_entry.key in pending_second:
+                compare_entries(first_entry, pending_second.pop(first_entry.key), result)
+            else:
+                pending_first[first_entry.key] = first_entry
+
+        if second_entry is not None:
+            if second_entry.key in pending_first:
+                compare_entries(pending_first.pop(second_entry.key), second_entry, result)
+            else:
+                pending_second[second_entry.key] = second_entry
+
+    result.only_in_first = list(pending_first.values())
+    result.only_in_second = list(pending_second.values())
+    return result
+
+
+def commandline_parser() -> ArgumentParser:
+    script_description = (
+        "Compares bytecode reports produced by prepare_report.py or prepare_report.js and lists contracts "
+        "whose bytecode or metadata differ. The first report is compared against each of the other ones. "
+        "Differences confined to the CBOR metadata appended to the bytecode are ignored."
+    )
+
+    parser = ArgumentParser(description=script_description)
+    parser.add_argument(dest='report_paths', nargs='+', help="Report files to compare.")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = commandline_parser()
+    options = parser.parse_args()
+    if len(options.report_paths) < 2:
+        parser.error("At least two reports are needed for comparison.")
+
+    all_identical = True
+    for other_report_path in options.report_paths[1:]:
+        comparison_result = compare_reports(Path(options.report_paths[0]), Path(other_report_path))
+        if comparison_result.identical():
+            print(f"Reports {options.report_paths[0]} and {other_report_path} are identical.")
+        else:
+            all_identical = False
+            print(f"Reports {options.report_paths[0]} and {other_report_path} differ.")
+        print(comparison_result.format_summary(options.report_paths[0], other_report_path), end='')
+
+    sys.exit(0 if all_identical else 1)
@@ -2,23 +2,33 @@
 
 import sys
 import subprocess
+import csv
+import hashlib
 import json
+import os
 import re
+import shlex
+import threading
+import time
 from argparse import ArgumentParser
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from enum import Enum
+from functools import partial
 from glob import glob
 from pathlib import Path
+from queue import Empty, Queue
 from tempfile import TemporaryDirectory
-from typing import List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
 
 
 CONTRACT_SEPARATOR_PATTERN = re.compile(
     r'^ *======= +(?:(?P<file_name>.+) *:)? *(?P<contract_name>[^:]+) +======= *$',
     re.MULTILINE
 )
-BYTECODE_REGEX = re.compile(r'^ *Binary: *\n(?P<bytecode>.*[0-9a-f$_]+.*)$', re.MULTILINE)
-METADATA_REGEX = re.compile(r'^ *Metadata: *\n *(?P<metadata>\{.*\}) *$', re.MULTILINE)
+BYTECODE_CHARACTER_PATTERN = re.compile(r'[0-9a-f$_]')
+
+INTERNAL_COMPILER_ERROR_TYPES = ['UnimplementedFeatureError', 'CompilerError', 'CodeGenerationError']
 
 
 class CompilerInterface(Enum):
@@ -44,6 +54,9 @@ class ContractReport:
 class FileReport:
     file_name: Path
     contract_reports: Optional[List[ContractReport]]
+    # True if the compiler was killed or crashed without printing anything. Such a result may not be
+    # reproducible (e.g. if the compiler ran out of memory) and must not be cached.
+    abnormal_termination: bool = field(default=False, compare=False)
 
     def format_report(self) -> str:
         report = ""
@@ -83,6 +96,17 @@ class FileReport:
             return '.'
 
 
+@dataclass(frozen=True)
+class CompilerRunProfile:
+    file_names: Tuple[str, ...]
+    optimize: bool
+    wall_time: float
+    # NOTE: CPU time and peak RSS are only available on platforms with os.wait4() and not when the
+    # compiler runs in server mode.
+    cpu_time: Optional[float]
+    peak_rss: Optional[int]
+
+
 @dataclass
 class Statistics:
     file_count: int = 0
@@ -90,6 +114,17 @@ class Statistics:
     error_count: int = 0
     missing_bytecode_count: int = 0
     missing_metadata_count: int = 0
+    cache_hit_count: int = 0
+    cache_miss_count: int = 0
+    compiler_server_start_count: int = 0
+    compiler_server_start_up_time: float = 0.0
+    compiler_server_request_count: int = 0
+    compiler_server_request_time: float = 0.0
+    compiler_run_count: int = 0
+    compiler_wall_time: float = 0.0
+    # NOTE: None if none of the runs reported resource usage (see CompilerRunProfile).
+    compiler_cpu_time: Optional[float] = None
+    compiler_peak_rss: Optional[int] = None
 
     def aggregate(self, report: FileReport):
         contract_reports = report.contract_reports if report.contract_reports is not None else []
@@ -101,7 +136,7 @@ class Statistics:
         self.missing_metadata_count += sum(1 for c in contract_reports if c.metadata is None)
 
     def __str__(self) -> str:
-        return "test cases: {}, contracts: {}, errors: {}, missing bytecode: {}, missing metadata: {}".format(
+        summary = "test cases: {}, contracts: {}, errors: {}, missing bytecode: {}, missing metadata: {}".format(
             self.file_count,
             str(self.contract_count) + ('+' if self.error_count > 0 else ''),
             self.error_count,
@@ -109,12 +144,249 @@ class Statistics:
             self.missing_metadata_count,
         )
 
+        if self.cache_hit_count + self.cache_miss_count > 0:
+            summary += f", cache hits: {self.cache_hit_count}, cache misses: {self.cache_miss_count}"
+
+        if self.compiler_server_start_count > 0:
+            # NOTE: No estimate of the time saved is given because it depends on how much of the
+            # compiler start-up the server actually avoids. E.g. cli_compiler_server.py still starts
+            # the compiler for every request.
+            average_start_up_time = self.compiler_server_start_up_time / self.compiler_server_start_count
+            average_request_time = self.compiler_server_request_time / max(self.compiler_server_request_count, 1)
+            summary += (
+                f"\ncompiler server requests: {self.compiler_server_request_count}, "
+                f"start-ups: {self.compiler_server_start_count}, "
+                f"average start-up time: {average_start_up_time:.3f} s, "
+                f"average request time: {average_request_time:.3f} s"
+            )
+
+        if self.compiler_run_count > 0:
+            cpu_time = f"{self.compiler_cpu_time:.1f} s" if self.compiler_cpu_time is not None else "n/a"
+            peak_rss = f"{self.compiler_peak_rss / 1024 / 1024:.1f} MiB" if self.compiler_peak_rss is not None else "n/a"
+            summary += (
+                f"\ncompiler runs: {self.compiler_run_count}, "
+                f"wall time: {self.compiler_wall_time:.1f} s, "
+                f"CPU time: {cpu_time}, "
+                f"peak RSS: {peak_rss}"
+            )
+
+        return summary
+
+
+def contract_reports_to_json(report: FileReport) -> Optional[List[dict]]:
+    if report.contract_reports is None:
+        return None
+
+    return [
+        {
+            'contract_name': contract_report.contract_name,
+            'file_name': contract_report.file_name.as_posix() if contract_report.file_name is not None else None,
+            'bytecode': contract_report.bytecode,
+            'metadata': contract_report.metadata,
+        }
+        for contract_report in report.contract_reports
+    ]
+
+
+def file_report_from_json(file_name: Path, contract_reports: Optional[List[dict]]) -> FileReport:
+    if contract_reports is None:
+        return FileReport(file_name=file_name, contract_reports=None)
+
+    return FileReport(
+        file_name=file_name,
+        contract_reports=[
+            ContractReport(
+                contract_name=contract_report['contract_name'],
+                file_name=Path(contract_report['file_name']) if contract_report['file_name'] is not None else None,
+                bytecode=contract_report['bytecode'],
+                metadata=contract_report['metadata'],
+            )
+            for contract_report in contract_reports
+        ],
+    )
+
+
+def file_sha256(path: Path) -> str:
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as binary_file:
+        for chunk in iter(lambda: binary_file.read(1024 * 1024), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class CompilationCache:
+    # On-disk cache of compilation results, keyed by the content of everything that can affect them.
+    # Entries are evicted in LRU order (based on file modification time, which is updated on every hit)
+    # once the total size of the cache exceeds the limit.
+
+    def __init__(self, cache_dir: Path, compiler_path: Path, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.compiler_hash = file_sha256(compiler_path)
+
+    def key(  # pylint: disable=too-many-arguments
+        self,
+        source_file_name: Path,
+        optimize: bool,
+        force_no_optimize_yul: bool,
+        interface: CompilerInterface,
+        smt_use: SMTUse,
+        metadata_option_supported: bool,
+        source_contents: Optional[Dict[str, str]] = None,
+    ) -> str:
+        # NOTE: The name of the file matters too because it ends up in the metadata.
+        return hashlib.sha256(json.dumps([
+            self.compiler_hash,
+            hashlib.sha256(load_source(source_file_name, smt_use, source_contents).encode('utf8')).hexdigest(),
+            source_file_name.name,
+            optimize,
+            force_no_optimize_yul,
+            interface.value,
+            smt_use.value,
+            metadata_option_supported,
+        ]).encode('utf8')).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f'{key}.json'
 
-def load_source(path: Union[Path, str], smt_use: SMTUse) -> str:
-    # NOTE: newline='' disables newline conversion.
-    # We want the file exactly as is because changing even a single byte in the source affects metadata.
-    with open(path, mode='r', encoding='utf8', newline='') as source_file:
-        file_content = source_file.read()
+    def load(self, source_file_name: Path, key: str) -> Optional[FileReport]:
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, encoding='utf8') as entry_file:
+                report = file_report_from_json(source_file_name, json.load(entry_file)['contract_reports'])
+            os.utime(entry_path)
+        except (OSError, ValueError, KeyError, TypeError):
+            # NOTE: Entries that can't be read or have unexpected structure are treated as cache misses.
+            return None
+
+        return report
+
+    def store(self, key: str, report: FileReport):
+        entry = {'contract_reports': contract_reports_to_json(report)}
+
+        entry_path = self.entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so that an interrupted run never leaves a truncated entry behind.
+        tmp_entry_path = entry_path.with_name(f'{entry_path.name}.{os.getpid()}.tmp')
+        with open(tmp_entry_path, 'w', encoding='utf8') as entry_file:
+            json.dump(entry, entry_file)
+        os.replace(tmp_entry_path, entry_path)
+
+    def evict(self):
+        entries = [
+            (entry_path.stat().st_mtime, entry_path.stat().st_size, entry_path)
+            for entry_path in self.cache_dir.glob('*/*.json')
+        ]
+
+        total_size = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            entry_path.unlink()
+            total_size -= size
+
+
+class ReportJournal:
+    # Append-only record of files whose reports are complete. Each line is a self-contained JSON
+    # object written only after the file has been fully processed, which makes it possible to
+    # resume an interrupted run without recompiling those files. A line left incomplete by a crash
+    # is ignored and removed before new records are appended.
+
+    def __init__(self, journal_path: Path, settings: dict, resume: bool):
+        self.journal_path = journal_path
+        self.settings = settings
+        self.completed_reports: Dict[Tuple[bool, str], FileReport] = {}
+
+        if resume and journal_path.exists():
+            with open(journal_path, encoding='utf8') as journal_file:
+                for line in journal_file:
+                    # NOTE: Lines that are not valid records (e.g. written by a different version of
+                    # this script) are skipped so that the files they describe get compiled again.
+                    try:
+                        entry = json.loads(line)
+                        if entry['settings'] != settings:
+                            continue
+
+                        key = (entry['optimize'], entry['file_name'])
+                        report = file_report_from_json(Path(entry['file_name']), entry['contract_reports'])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+
+                    self.completed_reports[key] = report
+
+            # Drop the line left incomplete by a crash. Otherwise the next record would be appended to it.
+            with open(journal_path, 'rb+') as journal_file:
+                journal_file.truncate(journal_file.read().rfind(b'\n') + 1)
+
+        self.journal_file = open(journal_path, 'a' if resume else 'w', encoding='utf8', newline='\n')
+
+    def completed_report(self, optimize: bool, source_file_name: Path) -> Optional[FileReport]:
+        return self.completed_reports.get((optimize, source_file_name.as_posix()))
+
+    def record(self, optimize: bool, report: FileReport):
+        self.journal_file.write(json.dumps({
+            'settings': self.settings,
+            'optimize': optimize,
+            'file_name': report.file_name.as_posix(),
+            'contract_reports': contract_reports_to_json(report),
+        }) + '\n')
+        self.journal_file.flush()
+
+    def close(self):
+        self.journal_file.close()
+
+    def remove(self):
+        self.close()
+        self.journal_path.unlink()
+
+
+def find_source_files() -> List[str]:
+    # NOTE: The compiler is always run from the directory containing the sources and given just
+    # their names so that paths do not end up in the metadata.
+    return sorted(glob("*.sol"))
+
+
+def read_ndjson_sources(stream: TextIO) -> Iterator[Tuple[str, str]]:
+    # Every line is a JSON object describing a single source: {"name": <file name>, "content": <source code>}.
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip() == '':
+            continue
+
+        try:
+            source = json.loads(line)
+            yield (source['name'], source['content'])
+        except (json.JSONDecodeError, KeyError, TypeError) as exception:
+            raise ValueError(f"Invalid source on line {line_number} of the input stream: {exception}") from exception
+
+
+def collect_streamed_sources(source_stream: Iterable[Tuple[str, str]], source_contents: Dict[str, str]) -> Iterator[Path]:
+    # Stores sources in source_contents as they arrive and yields the names of the ones not seen before.
+    for source_name, content in source_stream:
+        if Path(source_name).name != source_name:
+            raise ValueError(f"Source name '{source_name}' is not a plain file name.")
+
+        if source_name in source_contents:
+            # NOTE: isolate_tests.py names files after their content so duplicates are expected.
+            if source_contents[source_name] != content:
+                raise ValueError(f"Source '{source_name}' appears multiple times with different content.")
+            continue
+
+        source_contents[source_name] = content
+        yield Path(source_name)
+
+
+def load_source(path: Union[Path, str], smt_use: SMTUse, source_contents: Optional[Dict[str, str]] = None) -> str:
+    # NOTE: Sources that did not come from files (see collect_streamed_sources()) are kept in memory,
+    # in source_contents, and never touch the disk.
+    if source_contents is not None:
+        file_content = source_contents[str(path)]
+    else:
+        # NOTE: newline='' disables newline conversion.
+        # We want the file exactly as is because changing even a single byte in the source affects metadata.
+        with open(path, mode='r', encoding='utf8', newline='') as source_file:
+            file_content = source_file.read()
 
     if smt_use == SMTUse.STRIP_PRAGMAS:
         return file_content.replace('pragma experimental SMTChecker;', '', 1)
@@ -128,13 +400,15 @@ def clean_string(value: Optional[str]) -> Optional[str]:
 
 
 def parse_standard_json_output(source_file_name: Path, standard_json_output: str) -> FileReport:
-    decoded_json_output = json.loads(standard_json_output.strip())
+    return parse_decoded_standard_json_output(source_file_name, json.loads(standard_json_output.strip()))
 
+
+def parse_decoded_standard_json_output(source_file_name: Path, decoded_json_output: dict) -> FileReport:
     # JSON interface still returns contract metadata in case of an internal compiler error while
     # CLI interface does not. To make reports comparable we must force this case to be detected as
     # an error in both cases.
     internal_compiler_error = any(
-        error['type'] in ['UnimplementedFeatureError', 'CompilerError', 'CodeGenerationError']
+        error['type'] in INTERNAL_COMPILER_ERROR_TYPES
         for error in decoded_json_output.get('errors', {})
     )
 
@@ -160,32 +434,138 @@ def parse_standard_json_output(source_file_name: Path, standard_json_output: str
     return file_report
 
 
+def parse_standard_json_batch_output(
+    source_file_names: List[Path],
+    standard_json_output: str,
+) -> Optional[List[FileReport]]:
+    # Splits the output of a compilation of multiple independent files into per-file reports.
+    # Source unit names are expected to be just the file names, without directories.
+    # Returns None if any of the files failed to compile because in that case the compiler
+    # does not produce output for the remaining ones either.
+    decoded_json_output = json.loads(standard_json_output.strip())
+    if any(
+        error['severity'] == 'error' or error['type'] in INTERNAL_COMPILER_ERROR_TYPES
+        for error in decoded_json_output.get('errors', {})
+    ):
+        return None
+
+    return [
+        parse_decoded_standard_json_output(
+            source_file_name,
+            {'contracts': {
+                source_file_name.name: decoded_json_output.get('contracts', {}).get(source_file_name.name, {}),
+            }},
+        )
+        for source_file_name in source_file_names
+    ]
+
+
+def find_failed_source_units(standard_json_output: str) -> Optional[Set[str]]:
+    # Returns None if there is at least one error that cannot be attributed to any particular source unit.
+    decoded_json_output = json.loads(standard_json_output.strip())
+
+    failed_source_units = set()
+    for error in decoded_json_output.get('errors', {}):
+        if error['severity'] == 'error' or error['type'] in INTERNAL_COMPILER_ERROR_TYPES:
+            if 'file' not in error.get('sourceLocation', {}):
+                return None
+            failed_source_units.add(error['sourceLocation']['file'])
+
+    return failed_source_units
+
+
 def parse_cli_output(source_file_name: Path, cli_output: str) -> FileReport:
-    # re.split() returns a list containing the text between pattern occurrences but also inserts the
-    # content of matched groups in between. It also never omits the empty elements so the number of
-    # list items is predictable (3 per match + the text before the first match)
-    output_segments = re.split(CONTRACT_SEPARATOR_PATTERN, cli_output)
-    assert len(output_segments) % 3 == 1
+    # Single pass over the lines of the output. Values are only ever looked for on the line directly
+    # following their label so the long bytecode and metadata lines are never scanned more than
+    # necessary.
+    lines = cli_output.split('\n')
 
-    if len(output_segments) == 1:
-        return FileReport(file_name=source_file_name, contract_reports=None)
+    file_report = FileReport(file_name=source_file_name, contract_reports=None)
+    contract_header = None
+    bytecode = None
+    metadata = None
 
-    file_report = FileReport(file_name=source_file_name, contract_reports=[])
-    for file_name, contract_name, contract_output in zip(output_segments[1::3], output_segments[2::3], output_segments[3::3]):
-        bytecode_match = re.search(BYTECODE_REGEX, contract_output)
-        metadata_match = re.search(METADATA_REGEX, contract_output)
+    def finish_contract():
+        if contract_header is None:
+            return
 
+        (file_name, contract_name) = contract_header
         assert file_report.contract_reports is not None
         file_report.contract_reports.append(ContractReport(
             contract_name=contract_name.strip(),
             file_name=Path(file_name.strip()) if file_name is not None else None,
-            bytecode=clean_string(bytecode_match['bytecode'] if bytecode_match is not None else None),
-            metadata=clean_string(metadata_match['metadata'] if metadata_match is not None else None),
+            bytecode=clean_string(bytecode),
+            metadata=clean_string(metadata),
         ))
 
+    def match_contract_separator(line: str):
+        # Cheap check first so that the regex is not run on long bytecode and metadata lines.
+        if not line.lstrip(' ').startswith('======='):
+            return None
+        return CONTRACT_SEPARATOR_PATTERN.match(line)
+
+    def is_contract_separator(line: str) -> bool:
+        return match_contract_separator(line) is not None
+
+    for i, line in enumerate(lines):
+        separator_match = match_contract_separator(line)
+        if separator_match is not None:
+            finish_contract()
+            if file_report.contract_reports is None:
+                file_report.contract_reports = []
+
+            contract_header = (separator_match['file_name'], separator_match['contract_name'])
+            bytecode = None
+            metadata = None
+            continue
+
+        # Everything before the first contract is just diagnostics
+        if contract_header is None or i + 1 == len(lines):
+            continue
+
+        # NOTE: Only the first value found for a contract counts.
+        label = line.strip(' ')
+        next_line = lines[i + 1]
+        if label == 'Binary:' and bytecode is None:
+            if BYTECODE_CHARACTER_PATTERN.search(next_line) is not None and not is_contract_separator(next_line):
+                bytecode = next_line
+        elif label == 'Metadata:' and metadata is None:
+            stripped_next_line = next_line.strip(' ')
+            if (
+                stripped_next_line.startswith('{') and
+                stripped_next_line.endswith('}') and
+                not is_contract_separator(next_line)
+            ):
+                metadata = stripped_next_line
+
+    finish_contract()
     return file_report
 
 
+def prepare_standard_json_input(
+    source_file_names: List[Path],
+    optimize: bool,
+    smt_use: SMTUse,
+    source_contents: Optional[Dict[str, str]] = None,
+) -> str:
+    json_input: dict = {
+        'language': 'Solidity',
+        'sources': {
+            str(source_file_name): {'content': load_source(source_file_name, smt_use, source_contents)}
+            for source_file_name in source_file_names
+        },
+        'settings': {
+            'optimizer': {'enabled': optimize},
+            'outputSelection': {'*': {'*': ['evm.bytecode.object', 'metadata']}},
+        }
+    }
+
+    if smt_use == SMTUse.DISABLE:
+        json_input['settings']['modelChecker'] = {'engine': 'none'}
+
+    return json.dumps(json_input)
+
+
 def prepare_compiler_input(  # pylint: disable=too-many-arguments
     compiler_path: Path,
     source_file_name: Path,
@@ -194,25 +574,12 @@ def prepare_compiler_input(  # pylint: disable=too-many-arguments
     interface: CompilerInterface,
     smt_use: SMTUse,
     metadata_option_supported: bool,
+    source_contents: Optional[Dict[str, str]] = None,
 ) -> Tuple[List[str], str]:
 
     if interface == CompilerInterface.STANDARD_JSON:
-        json_input: dict = {
-            'language': 'Solidity',
-            'sources': {
-                str(source_file_name): {'content': load_source(source_file_name, smt_use)}
-            },
-            'settings': {
-                'optimizer': {'enabled': optimize},
-                'outputSelection': {'*': {'*': ['evm.bytecode.object', 'metadata']}},
-            }
-        }
-
-        if smt_use == SMTUse.DISABLE:
-            json_input['settings']['modelChecker'] = {'engine': 'none'}
-
         command_line = [str(compiler_path), '--standard-json']
-        compiler_input = json.dumps(json_input)
+        compiler_input = prepare_standard_json_input([source_file_name], optimize, smt_use, source_contents)
     else:
         assert interface == CompilerInterface.CLI
 
@@ -227,7 +594,7 @@ def prepare_compiler_input(  # pylint: disable=too-many-arguments
             compiler_options += ['--model-checker-engine', 'none']
 
         command_line = [str(compiler_path)] + compiler_options
-        compiler_input = load_source(source_file_name, smt_use)
+        compiler_input = load_source(source_file_name, smt_use, source_contents)
 
     return (command_line, compiler_input)
 
@@ -255,6 +622,287 @@ def detect_metadata_cli_option_support(compiler_path: Path):
     return process.returncode == 0
 
 
+class CompilerProfile:
+    # Thread-safe collection of resource usage of all compiler runs.
+
+    def __init__(self):
+        self.runs: List[CompilerRunProfile] = []
+        self.lock = threading.Lock()
+
+    def record(self, run: CompilerRunProfile):
+        with self.lock:
+            self.runs.append(run)
+
+    def slowest_runs(self, count: int) -> List[CompilerRunProfile]:
+        with self.lock:
+            return sorted(self.runs, key=lambda run: (-run.wall_time, run.file_names, run.optimize))[:count]
+
+    def aggregate_statistics(self, statistics: Statistics):
+        with self.lock:
+            for run in self.runs:
+                statistics.compiler_run_count += 1
+                statistics.compiler_wall_time += run.wall_time
+                if run.cpu_time is not None:
+                    statistics.compiler_cpu_time = (statistics.compiler_cpu_time or 0.0) + run.cpu_time
+                if run.peak_rss is not None:
+                    statistics.compiler_peak_rss = max(statistics.compiler_peak_rss or 0, run.peak_rss)
+
+    def write(self, timings_file_path: Path, top_count: int):
+        slowest_runs = [asdict(run) for run in self.slowest_runs(top_count)]
+
+        if timings_file_path.suffix == '.csv':
+            with open(timings_file_path, 'w', encoding='utf8', newline='') as timings_file:
+                writer = csv.DictWriter(timings_file, fieldnames=list(CompilerRunProfile.__dataclass_fields__))
+                writer.writeheader()
+                for run in slowest_runs:
+                    writer.writerow({**run, 'file_names': ' '.join(run['file_names'])})
+        else:
+            statistics = Statistics()
+            self.aggregate_statistics(statistics)
+            with open(timings_file_path, 'w', encoding='utf8', newline='\n') as timings_file:
+                json.dump({
+                    'total': {
+                        'run_count': statistics.compiler_run_count,
+                        'wall_time': statistics.compiler_wall_time,
+                        'cpu_time': statistics.compiler_cpu_time,
+                        'peak_rss': statistics.compiler_peak_rss,
+                    },
+                    'slowest_runs': slowest_runs,
+                }, timings_file, indent=4)
+                timings_file.write('\n')
+
+
+def communicate_and_get_resource_usage(process: subprocess.Popen, process_input: Optional[str]) -> Tuple[str, str, Any]:
+    # Equivalent of process.communicate() that reaps the process with os.wait4() where available to get
+    # its resource usage as well. The resource usage is None if os.wait4() is not available.
+    if not hasattr(os, 'wait4'):
+        (stdout, stderr) = process.communicate(process_input)
+        return (stdout, stderr, None)
+
+    assert process.stdout is not None and process.stderr is not None
+
+    def write_input():
+        assert process.stdin is not None
+        try:
+            process.stdin.write(process_input)
+        except BrokenPipeError:
+            # The process exited without reading all of its input. Its exit code tells what happened.
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    stderr_chunks: List[str] = []
+
+    def read_stderr():
+        assert process.stderr is not None
+        stderr_chunks.append(process.stderr.read())
+
+    # NOTE: All the pipes must be drained at the same time. Otherwise the process could get blocked
+    # on one of them while we are waiting on another.
+    threads = [threading.Thread(target=read_stderr)]
+    if process_input is not None:
+        threads.append(threading.Thread(target=write_input))
+    for thread in threads:
+        thread.start()
+    stdout = process.stdout.read()
+    for thread in threads:
+        thread.join()
+    process.stdout.close()
+    process.stderr.close()
+
+    (_pid, status, rusage) = os.wait4(process.pid, 0)
+    # NOTE: Setting the return code tells Popen that the process has already been reaped.
+    process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    return (stdout, stderr_chunks[0], rusage)
+
+
+def run_compiler_process(  # pylint: disable=too-many-arguments
+    command_line: List[str],
+    compiler_input: Optional[str],
+    cwd: Optional[Path],
+    exit_on_error: bool,
+    source_file_names: List[Path],
+    optimize: bool,
+    profile: Optional[CompilerProfile],
+) -> subprocess.CompletedProcess:
+    start_time = time.perf_counter()
+    with subprocess.Popen(
+        command_line,
+        stdin=(subprocess.PIPE if compiler_input is not None else None),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        encoding='utf8',
+    ) as process:
+        try:
+            (stdout, stderr, rusage) = communicate_and_get_resource_usage(process, compiler_input)
+        except:
+            process.kill()
+            raise
+    wall_time = time.perf_counter() - start_time
+
+    if profile is not None:
+        profile.record(CompilerRunProfile(
+            file_names=tuple(source_file_name.as_posix() for source_file_name in source_file_names),
+            optimize=optimize,
+            wall_time=wall_time,
+            cpu_time=(rusage.ru_utime + rusage.ru_stime) if rusage is not None else None,
+            # NOTE: ru_maxrss is in bytes on macOS and in kilobytes everywhere else.
+            peak_rss=(rusage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)) if rusage is not None else None,
+        ))
+
+    if exit_on_error and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command_line, output=stdout, stderr=stderr)
+
+    return subprocess.CompletedProcess(command_line, process.returncode, stdout, stderr)
+
+
+class CompilerServer:
+    # Long-lived compiler process driven over the line-delimited protocol described in
+    # cli_compiler_server.py. Not thread-safe. Use CompilerServerPool to share servers between threads.
+
+    def __init__(self, command: List[str]):
+        self.command = command
+        self.request_count = 0
+        self.request_time = 0.0
+
+        start_time = time.perf_counter()
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding='utf8',
+        )
+        assert self.process.stdin is not None and self.process.stdout is not None
+
+        ready_line = self.process.stdout.readline()
+        if ready_line == '' or not json.loads(ready_line).get('ready', False):
+            self.close()
+            raise Exception(f"Compiler server did not report being ready: {ready_line}")
+        self.start_up_time = time.perf_counter() - start_time
+
+    def compile(self, standard_json_input: str, exit_on_error: bool) -> str:
+        assert self.process.stdin is not None and self.process.stdout is not None
+
+        request_id = self.request_count
+        start_time = time.perf_counter()
+        self.process.stdin.write(json.dumps({'id': request_id, 'input': standard_json_input}) + '\n')
+        self.process.stdin.flush()
+
+        response_line = self.process.stdout.readline()
+        if response_line == '':
+            raise Exception(f"Compiler server exited unexpectedly with code {self.process.wait()}.")
+        response = json.loads(response_line)
+        if response['id'] != request_id:
+            raise Exception(f"Compiler server responded to request {response['id']} instead of {request_id}.")
+
+        self.request_count += 1
+        self.request_time += time.perf_counter() - start_time
+        if exit_on_error and response['exit_code'] != 0:
+            raise subprocess.CalledProcessError(
+                response['exit_code'],
+                self.command,
+                output=response['output'],
+                stderr=response['stderr'],
+            )
+
+        return response['output']
+
+    def close(self):
+        assert self.process.stdin is not None and self.process.stdout is not None
+
+        self.process.stdin.close()
+        self.process.wait()
+        self.process.stdout.close()
+
+
+class CompilerServerPool:
+    # Servers are started on demand so there are never more of them than threads using the pool at
+    # the same time.
+
+    def __init__(self, command: List[str]):
+        self.command = command
+        self.idle_servers: Queue = Queue()
+        self.retired_servers: List[CompilerServer] = []
+        self.lock = threading.Lock()
+
+    def compile(self, standard_json_input: str, exit_on_error: bool) -> str:
+        try:
+            server = self.idle_servers.get_nowait()
+        except Empty:
+            server = CompilerServer(self.command)
+
+        try:
+            output = server.compile(standard_json_input, exit_on_error)
+        except subprocess.CalledProcessError:
+            self.idle_servers.put(server)
+            raise
+        except:
+            # The server may be in an inconsistent state so don't reuse it.
+            self.retire(server)
+            raise
+
+        self.idle_servers.put(server)
+        return output
+
+    def retire(self, server: CompilerServer):
+        server.close()
+        with self.lock:
+            self.retired_servers.append(server)
+
+    def close(self):
+        while True:
+            try:
+                self.retire(self.idle_servers.get_nowait())
+            except Empty:
+                break
+
+    def aggregate_statistics(self, statistics: Statistics):
+        with self.lock:
+            for server in self.retired_servers:
+                statistics.compiler_server_start_count += 1
+                statistics.compiler_server_start_up_time += server.start_up_time
+                statistics.compiler_server_request_count += server.request_count
+                statistics.compiler_server_request_time += server.request_time
+
+
+def run_standard_json_compiler(  # pylint: disable=too-many-arguments
+    compiler_path: Path,
+    standard_json_input: str,
+    exit_on_error: bool,
+    compiler_server_pool: Optional[CompilerServerPool],
+    source_file_names: List[Path],
+    optimize: bool,
+    profile: Optional[CompilerProfile],
+) -> str:
+    if compiler_server_pool is not None:
+        start_time = time.perf_counter()
+        try:
+            return compiler_server_pool.compile(standard_json_input, exit_on_error)
+        finally:
+            if profile is not None:
+                profile.record(CompilerRunProfile(
+                    file_names=tuple(source_file_name.as_posix() for source_file_name in source_file_names),
+                    optimize=optimize,
+                    wall_time=time.perf_counter() - start_time,
+                    cpu_time=None,
+                    peak_rss=None,
+                ))
+
+    return run_compiler_process(
+        [str(compiler_path), '--standard-json'],
+        standard_json_input,
+        None,
+        exit_on_error,
+        source_file_names,
+        optimize,
+        profile,
+    ).stdout
+
+
 def run_compiler(  # pylint: disable=too-many-arguments
     compiler_path: Path,
     source_file_name: Path,
@@ -265,10 +913,13 @@ def run_compiler(  # pylint: disable=too-many-arguments
     metadata_option_supported: bool,
     tmp_dir: Path,
     exit_on_error: bool,
+    compiler_server_pool: Optional[CompilerServerPool] = None,
+    profile: Optional[CompilerProfile] = None,
+    source_contents: Optional[Dict[str, str]] = None,
 ) -> FileReport:
 
     if interface == CompilerInterface.STANDARD_JSON:
-        (command_line, compiler_input) = prepare_compiler_input(
+        (_command_line, compiler_input) = prepare_compiler_input(
             compiler_path,
             Path(source_file_name.name),
             optimize,
@@ -276,17 +927,19 @@ def run_compiler(  # pylint: disable=too-many-arguments
             interface,
             smt_use,
             metadata_option_supported,
+            source_contents,
         )
 
-        process = subprocess.run(
-            command_line,
-            input=compiler_input,
-            encoding='utf8',
-            capture_output=True,
-            check=exit_on_error,
+        compiler_output = run_standard_json_compiler(
+            compiler_path,
+            compiler_input,
+            exit_on_error,
+            compiler_server_pool,
+            [source_file_name],
+            optimize,
+            profile,
         )
-
-        return parse_standard_json_output(Path(source_file_name), process.stdout)
+        return parse_standard_json_output(Path(source_file_name), compiler_output)
     else:
         assert interface == CompilerInterface.CLI
         assert tmp_dir is not None
@@ -299,27 +952,142 @@ def run_compiler(  # pylint: disable=too-many-arguments
             interface,
             smt_use,
             metadata_option_supported,
+            source_contents,
         )
 
-        # Create a copy that we can use directly with the CLI interface
-        modified_source_path = tmp_dir / source_file_name.name
-        # NOTE: newline='' disables newline conversion.
-        # We want the file exactly as is because changing even a single byte in the source affects metadata.
-        with open(modified_source_path, 'w', encoding='utf8', newline='') as modified_source_file:
-            modified_source_file.write(compiler_input)
-
-        process = subprocess.run(
+        # NOTE: The source can't be passed via stdin because the compiler would then name it '<stdin>'
+        # in the metadata. A copy under the same name is needed only if the source is not in a file or
+        # if the content has actually changed. Otherwise we can compile the original file in place.
+        compiler_cwd = None
+        if source_contents is not None or (
+            smt_use == SMTUse.STRIP_PRAGMAS and
+            compiler_input != load_source(source_file_name.name, SMTUse.PRESERVE)
+        ):
+            modified_source_path = tmp_dir / source_file_name.name
+            # NOTE: newline='' disables newline conversion.
+            # We want the file exactly as is because changing even a single byte in the source affects metadata.
+            with open(modified_source_path, 'w', encoding='utf8', newline='') as modified_source_file:
+                modified_source_file.write(compiler_input)
+            compiler_cwd = tmp_dir
+
+        process = run_compiler_process(
             command_line,
-            cwd=tmp_dir,
-            encoding='utf8',
-            capture_output=True,
-            check=exit_on_error,
+            None,
+            compiler_cwd,
+            exit_on_error,
+            [source_file_name],
+            optimize,
+            profile,
+        )
+
+        report = parse_cli_output(Path(source_file_name), process.stdout)
+        # NOTE: A negative return code means that the process was killed by a signal. A compiler that
+        # fails to compile the file still prints the errors.
+        report.abnormal_termination = process.returncode < 0 or (
+            process.returncode != 0 and process.stdout == '' and process.stderr == ''
         )
+        return report
 
-        return parse_cli_output(Path(source_file_name), process.stdout)
 
+def run_compiler_batch(  # pylint: disable=too-many-arguments
+    compiler_path: Path,
+    source_file_names: List[Path],
+    optimize: bool,
+    force_no_optimize_yul: bool,
+    interface: CompilerInterface,
+    smt_use: SMTUse,
+    metadata_option_supported: bool,
+    tmp_dir: Path,
+    exit_on_error: bool,
+    compiler_server_pool: Optional[CompilerServerPool] = None,
+    profile: Optional[CompilerProfile] = None,
+    source_contents: Optional[Dict[str, str]] = None,
+) -> List[FileReport]:
+    # Compiles multiple files with a single compiler invocation. Files that make the compilation
+    # fail are recompiled on their own so that the reports are exactly the same as they would be
+    # if every file was compiled separately.
+    if len(source_file_names) == 1:
+        return [run_compiler(
+            compiler_path,
+            source_file_names[0],
+            optimize,
+            force_no_optimize_yul,
+            interface,
+            smt_use,
+            metadata_option_supported,
+            tmp_dir,
+            exit_on_error,
+            compiler_server_pool,
+            profile,
+            source_contents,
+        )]
+
+    assert interface == CompilerInterface.STANDARD_JSON
+
+    compiler_output = run_standard_json_compiler(
+        compiler_path,
+        prepare_standard_json_input(
+            [Path(source_file_name.name) for source_file_name in source_file_names],
+            optimize,
+            smt_use,
+            source_contents,
+        ),
+        exit_on_error,
+        compiler_server_pool,
+        source_file_names,
+        optimize,
+        profile,
+    )
+
+    failed_source_units: Optional[Set[str]]
+    try:
+        reports = parse_standard_json_batch_output(source_file_names, compiler_output)
+        if reports is not None:
+            return reports
+        failed_source_units = find_failed_source_units(compiler_output)
+    except json.JSONDecodeError:
+        # NOTE: No valid output means that the compiler crashed. Just like an error without a location
+        # this can't be attributed to any particular file.
+        failed_source_units = None
+
+    def run_compiler_on(file_names: List[Path]) -> List[FileReport]:
+        if len(file_names) == 0:
+            return []
+
+        return run_compiler_batch(
+            compiler_path,
+            file_names,
+            optimize,
+            force_no_optimize_yul,
+            interface,
+            smt_use,
+            metadata_option_supported,
+            tmp_dir,
+            exit_on_error,
+            compiler_server_pool,
+            profile,
+            source_contents,
+        )
 
-def generate_report(  # pylint: disable=too-many-arguments,too-many-locals
+    if failed_source_units is None or len(failed_source_units) == 0:
+        # We can't tell which file is responsible for the failure. Split the batch in half until
+        # the culprits are isolated.
+        middle = len(source_file_names) // 2
+        return run_compiler_on(source_file_names[:middle]) + run_compiler_on(source_file_names[middle:])
+
+    failed_files = [f for f in source_file_names if f.name in failed_source_units]
+    remaining_files = [f for f in source_file_names if f.name not in failed_source_units]
+
+    reports_by_file: Dict[Path, FileReport] = {}
+    for source_file_name in failed_files:
+        reports_by_file[source_file_name] = run_compiler_on([source_file_name])[0]
+    for report in run_compiler_on(remaining_files):
+        reports_by_file[report.file_name] = report
+
+    return [reports_by_file[source_file_name] for source_file_name in source_file_names]
+
+
+def generate_report(  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements
     source_file_names: List[str],
     compiler_path: Path,
     interface: CompilerInterface,
@@ -328,49 +1096,171 @@ def generate_report(  # pylint: disable=too-many-arguments,too-many-locals
     report_file_path: Path,
     verbose: bool,
     exit_on_error: bool,
+    jobs: int = 1,
+    batch_size: int = 1,
+    cache: Optional[CompilationCache] = None,
+    resume: bool = False,
+    compiler_server_command: Optional[List[str]] = None,
+    timings_file_path: Optional[Path] = None,
+    timings_top_count: int = 50,
+    source_stream: Optional[Iterable[Tuple[str, str]]] = None,
 ):
+    # NOTE: If source_stream is given, sources (name and content pairs) are taken from it instead of
+    # from the files listed in source_file_names and are kept only in memory.
+    assert batch_size == 1 or interface == CompilerInterface.STANDARD_JSON
+    assert compiler_server_command is None or interface == CompilerInterface.STANDARD_JSON
+    assert source_stream is None or len(source_file_names) == 0
+
+    source_contents: Optional[Dict[str, str]] = {} if source_stream is not None else None
+
     statistics = Statistics()
     metadata_option_supported = detect_metadata_cli_option_support(compiler_path)
 
+    journal = ReportJournal(
+        Path(f'{report_file_path}.journal'),
+        {
+            'compiler_hash': cache.compiler_hash if cache is not None else file_sha256(compiler_path),
+            'interface': interface.value,
+            'smt_use': smt_use.value,
+            'force_no_optimize_yul': force_no_optimize_yul,
+        },
+        resume,
+    )
+    compiler_server_pool = CompilerServerPool(compiler_server_command) if compiler_server_command is not None else None
+    profile = CompilerProfile()
+
     try:
         with open(report_file_path, mode='w', encoding='utf8', newline='\n') as report_file:
             for optimize in [False, True]:
-                with TemporaryDirectory(prefix='prepare_report-') as tmp_dir:
-                    for source_file_name in sorted(source_file_names):
-                        try:
-                            report = run_compiler(
-                                compiler_path,
-                                Path(source_file_name),
-                                optimize,
-                                force_no_optimize_yul,
-                                interface,
-                                smt_use,
-                                metadata_option_supported,
-                                Path(tmp_dir),
-                                exit_on_error,
-                            )
+                with TemporaryDirectory(prefix='prepare_report-') as tmp_dir, ThreadPoolExecutor(jobs) as executor:
+                    cache_keys: Dict[Path, str] = {}
+                    cached_reports: Dict[Path, FileReport] = {}
+                    batches: List[List[Path]] = []
+                    futures = []
+                    files_to_compile: List[Path] = []
+                    compile_batch = partial(
+                        run_compiler_batch,
+                        compiler_path,
+                        optimize=optimize,
+                        force_no_optimize_yul=force_no_optimize_yul,
+                        interface=interface,
+                        smt_use=smt_use,
+                        metadata_option_supported=metadata_option_supported,
+                        tmp_dir=Path(tmp_dir),
+                        exit_on_error=exit_on_error,
+                        compiler_server_pool=compiler_server_pool,
+                        profile=profile,
+                        source_contents=source_contents,
+                    )
+
+                    if source_stream is not None and not optimize:
+                        # NOTE: Sources from a stream are compiled as soon as they arrive. The report is
+                        # written in sorted order anyway so it can only be started once all of them are known.
+                        incoming_source_file_names: Iterable[Path] = collect_streamed_sources(source_stream, source_contents)
+                    else:
+                        incoming_source_file_names = [Path(source_file_name) for source_file_name in sorted(
+                            source_file_names if source_contents is None else source_contents
+                        )]
+
+                    # NOTE: The compiler runs in a separate process so threads are enough to keep
+                    # multiple instances busy. Results are consumed in sorted order which keeps
+                    # the report identical to the one produced by a serial run.
+                    try:
+                        for source_file_name in incoming_source_file_names:
+                            completed_report = journal.completed_report(optimize, source_file_name)
+                            if completed_report is not None:
+                                cached_reports[source_file_name] = completed_report
+                                continue
+
+                            if cache is not None:
+                                cache_keys[source_file_name] = cache.key(
+                                    source_file_name,
+                                    optimize,
+                                    force_no_optimize_yul,
+                                    interface,
+                                    smt_use,
+                                    metadata_option_supported,
+                                    source_contents,
+                                )
+                                cached_report = cache.load(source_file_name, cache_keys[source_file_name])
+                                if cached_report is not None:
+                                    cached_reports[source_file_name] = cached_report
+                                    continue
+
+                            files_to_compile.append(source_file_name)
+                            if len(files_to_compile) == batch_size:
+                                batches.append(files_to_compile)
+                                futures.append(executor.submit(compile_batch, files_to_compile))
+                                files_to_compile = []
+
+                        if len(files_to_compile) > 0:
+                            batches.append(files_to_compile)
+                            futures.append(executor.submit(compile_batch, files_to_compile))
+
+                        batch_futures = {
+                            source_file_name: (batch, future)
+                            for batch, future in zip(batches, futures)
+                            for source_file_name in batch
+                        }
+                        sorted_source_file_names = sorted(set(cached_reports) | set(batch_futures))
+                        for source_file_name in sorted_source_file_names:
+                            if source_file_name in cached_reports:
+                                report = cached_reports[source_file_name]
+                                if journal.completed_report(optimize, source_file_name) is None:
+                                    statistics.cache_hit_count += 1
+                                    journal.record(optimize, report)
+                            else:
+                                (batch, future) = batch_futures[source_file_name]
+                                batch_description = ('file ' if len(batch) == 1 else 'files ') + ', '.join(
+                                    f"'{file_name}'" for file_name in batch
+                                )
+                                try:
+                                    report = future.result()[batch.index(source_file_name)]
+                                except subprocess.CalledProcessError as exception:
+                                    print(
+                                        f"\n\nInterrupted by an exception while processing "
+                                        f"{batch_description} with optimize={optimize}\n\n"
+                                        f"COMPILER STDOUT:\n{exception.stdout}\n"
+                                        f"COMPILER STDERR:\n{exception.stderr}\n",
+                                        file=sys.stderr
+                                    )
+                                    raise
+                                except:
+                                    print(
+                                        f"\n\nInterrupted by an exception while processing "
+                                        f"{batch_description} with optimize={optimize}\n",
+                                        file=sys.stderr
+                                    )
+                                    raise
+
+                                if cache is not None:
+                                    if not report.abnormal_termination:
+                                        cache.store(cache_keys[source_file_name], report)
+                                    statistics.cache_miss_count += 1
+
+                                journal.record(optimize, report)
 
                             statistics.aggregate(report)
                             print(report.format_summary(verbose), end=('\n' if verbose else ''), flush=True)
 
                             report_file.write(report.format_report())
-                        except subprocess.CalledProcessError as exception:
-                            print(
-                                f"\n\nInterrupted by an exception while processing file "
-                                f"'{source_file_name}' with optimize={optimize}\n\n"
-                                f"COMPILER STDOUT:\n{exception.stdout}\n"
-                                f"COMPILER STDERR:\n{exception.stderr}\n",
-                                file=sys.stderr
-                            )
-                            raise
-                        except:
-                            print(
-                                f"\n\nInterrupted by an exception while processing file "
-                                f"'{source_file_name}' with optimize={optimize}\n",
-                                file=sys.stderr
-                            )
-                            raise
+                    finally:
+                        # Don't start compiling files that remain in the queue if we're about to bail out.
+                        for future in futures:
+                            future.cancel()
+
+        # The report is complete so there's nothing left to resume.
+        journal.remove()
     finally:
+        journal.close()
+        if cache is not None:
+            cache.evict()
+        if compiler_server_pool is not None:
+            compiler_server_pool.close()
+            compiler_server_pool.aggregate_statistics(statistics)
+        profile.aggregate_statistics(statistics)
+        if timings_file_path is not None:
+            profile.write(timings_file_path, timings_top_count)
         print('\n', statistics, '\n', sep='')
 
 
@@ -412,13 +1302,118 @@ def commandline_parser() -> ArgumentParser:
         action='store_true',
         help="Immediately exit and print compiler output if the compiler exits with an error.",
     )
+    parser.add_argument(
+        '--jobs',
+        dest='jobs',
+        default=1,
+        type=int,
+        help=(
+            "Number of compiler processes to run in parallel. "
+            "The report is the same as with a single job, regardless of this setting."
+        ),
+    )
+    parser.add_argument(
+        '--batch-size',
+        dest='batch_size',
+        default=1,
+        type=int,
+        help=(
+            "Number of files to compile with a single compiler invocation. "
+            "Files that fail to compile are recompiled on their own so this does not affect the report as long "
+            "as the metadata lists only the sources a contract actually references, which is the case since "
+            "solc 0.4.14. Older compilers include every source of the batch in the metadata. "
+            "Only supported with the Standard JSON interface."
+        ),
+    )
+    parser.add_argument(
+        '--cache-dir',
+        dest='cache_dir',
+        default=None,
+        help=(
+            "Directory for caching compilation results between runs. "
+            "Files whose results for the same compiler binary are already in the cache are not recompiled."
+        ),
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        dest='cache_max_size',
+        default=1024,
+        type=int,
+        help="Maximum size of the cache in MiB. Least recently used entries are removed when it is exceeded.",
+    )
+    parser.add_argument(
+        '--resume',
+        dest='resume',
+        default=False,
+        action='store_true',
+        help=(
+            "Continue an interrupted run. Files recorded as completed in the journal kept next to the report "
+            "(the report file name with a .journal suffix) for the same compiler binary and settings are not recompiled."
+        ),
+    )
+    parser.add_argument(
+        '--compiler-server',
+        dest='compiler_server',
+        default=None,
+        help=(
+            "Command starting a long-lived compiler process that accepts Standard JSON input over the "
+            "line-delimited protocol described in cli_compiler_server.py. The process is reused for multiple "
+            "files instead of starting the compiler for each one. Only supported with the Standard JSON interface."
+        ),
+    )
+    parser.add_argument(
+        '--sources-from-stdin',
+        dest='sources_from_stdin',
+        default=False,
+        action='store_true',
+        help=(
+            "Read sources from standard input instead of the *.sol files in the current working directory. "
+            "Every line must be a JSON object with the file name and content of one source: "
+            '{"name": ..., "content": ...} (e.g. the output of isolate_tests.py --ndjson). '
+            "Compilation starts while the input is still being read."
+        ),
+    )
+    parser.add_argument(
+        '--timings-file',
+        dest='timings_file',
+        default=None,
+        help=(
+            "File to write the wall time, CPU time and peak memory usage of the slowest compiler runs to. "
+            "The format is CSV if the name ends with .csv and JSON otherwise."
+        ),
+    )
+    parser.add_argument(
+        '--timings-top',
+        dest='timings_top',
+        default=50,
+        type=int,
+        help="Number of the slowest compiler runs to include in the timings file.",
+    )
     return parser;
 
 
 if __name__ == "__main__":
-    options = commandline_parser().parse_args()
+    parser = commandline_parser()
+    options = parser.parse_args()
+    if options.jobs < 1:
+        parser.error("--jobs must be at least 1.")
+    if options.batch_size < 1:
+        parser.error("--batch-size must be at least 1.")
+    if options.batch_size > 1 and CompilerInterface(options.interface) != CompilerInterface.STANDARD_JSON:
+        parser.error("--batch-size is only supported with the Standard JSON interface.")
+    if options.compiler_server is not None and CompilerInterface(options.interface) != CompilerInterface.STANDARD_JSON:
+        parser.error("--compiler-server is only supported with the Standard JSON interface.")
+
+    compilation_cache = None
+    if options.cache_dir is not None:
+        compilation_cache = CompilationCache(
+            Path(options.cache_dir),
+            Path(options.compiler_path),
+            options.cache_max_size * 1024 * 1024,
+        )
+
     generate_report(
-        glob("*.sol"),
+        find_source_files() if not options.sources_from_stdin else [],
         Path(options.compiler_path),
         CompilerInterface(options.interface),
         SMTUse(options.smt_use),
@@ -426,4 +1421,12 @@ if __name__ == "__main__":
         Path(options.report_file),
         options.verbose,
         options.exit_on_error,
+        options.jobs,
+        options.batch_size,
+        compilation_cache,
+        options.resume,
+        shlex.split(options.compiler_server) if options.compiler_server is not None else None,
+        Path(options.timings_file) if options.timings_file is not None else None,
+        options.timings_top,
+        read_ndjson_sources(sys.stdin) if options.sources_from_stdin else None,
     )
@@ -26,6 +26,7 @@
 #------------------------------------------------------------------------------
 
 set -e
+set -o pipefail
 
 REPO_ROOT="$(dirname "$0")"/../..
 cd "$REPO_ROOT"
@@ -38,10 +39,10 @@ TMPDIR=$(mktemp -d)
 (
     cd "$TMPDIR"
 
-    "$REPO_ROOT"/scripts/isolate_tests.py "$REPO_ROOT"/test/
-
     if [[ "$SOLC_EMSCRIPTEN" = "On" ]]
     then
+        "$REPO_ROOT"/scripts/isolate_tests.py "$REPO_ROOT"/test/
+
         # npm install solc
         git clone --depth 1 https://github.com/ethereum/solc-js.git solc-js
         ( cd solc-js; npm install )
@@ -51,7 +52,10 @@ TMPDIR=$(mktemp -d)
         ./prepare_report.js *.sol > report.txt
         echo "Finished running the compiler."
     else
-        "$REPO_ROOT/scripts/bytecodecompare/prepare_report.py" "$BUILD_DIR/solc/solc"
+        # Sources go straight from the extractor into the compiler without being written to disk.
+        # Compilation starts while the extraction is still running.
+        "$REPO_ROOT"/scripts/isolate_tests.py "$REPO_ROOT"/test/ --ndjson |
+            "$REPO_ROOT/scripts/bytecodecompare/prepare_report.py" "$BUILD_DIR/solc/solc" --sources-from-stdin
     fi
 
     cp report.txt "$REPO_ROOT"
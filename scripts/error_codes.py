@@ -1,14 +1,29 @@
 #! /usr/bin/env python3
+import hashlib
+import json
 import random
 import re
 import os
 import getopt
+import shutil
+import subprocess
 import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from os import path
 
 ENCODING = "utf-8"
 SOURCE_FILE_PATTERN = r"\b\d+_error\b"
 
+# Must be increased whenever a change in the script affects the IDs found in files.
+INDEX_VERSION = 2
+
+# Start of a comment or of a literal that may contain something looking like a comment.
+COMMENT_OR_LITERAL_START_PATTERN = re.compile(r"//|/\*|R\"|\"|'")
+RAW_STRING_DELIMITER_PATTERN = re.compile(r"([^()\\\s]{0,16})\(")
+STRING_LITERAL_REST_PATTERN = re.compile(r'(?:[^"\\\n]|\\.)*"')
+CHARACTER_LITERAL_REST_PATTERN = re.compile(r"(?:[^'\\\n]|\\.)*'")
+
 
 def read_file(file_name):
     content = None
@@ -23,90 +38,266 @@ def read_file(file_name):
     return content
 
 
-def write_file(file_name, content):
-    with open(file_name, "w", encoding=ENCODING) as f:
-        f.write(content)
+class IdIndex:
+    """
+    On-disk cache of the IDs found in every scanned file, kept between runs.
+    A file is scanned again only if its size or modification time changed
+    and its content no longer matches the hash stored in the index.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.sections = {}
+        self.modified = False
+
+        try:
+            with open(index_path, "r", encoding=ENCODING) as f:
+                index = json.load(f)
+            # An index from a different version of the script is simply rebuilt.
+            if index.get("version") == INDEX_VERSION:
+                self.sections = index["sections"]
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+    def scan(self, section_name, file_names, scan_file, jobs=1, changed_file_names=frozenset()):
+        """
+        Returns a dictionary with the result of scan_file() for every file.
+        Files in changed_file_names are scanned again without consulting the index.
+        """
+
+        old_entries = self.sections.get(section_name, {})
+        new_entries = {}
+        files_to_scan = []
+        for file_name in file_names:
+            stat = os.stat(file_name)
+            entry = old_entries.get(file_name) if file_name not in changed_file_names else None
+            if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                with open(file_name, "rb") as f:
+                    sha256 = hashlib.sha256(f.read()).hexdigest()
+                if entry is None or entry["sha256"] != sha256:
+                    files_to_scan.append(file_name)
+                    entry = {"sha256": sha256, "ids": None}
+                entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                self.modified = True
+            new_entries[file_name] = entry
+
+        for file_name, ids in zip(files_to_scan, scan_files_in_parallel(files_to_scan, scan_file, jobs)):
+            new_entries[file_name]["ids"] = ids
+
+        if len(new_entries) != len(old_entries):
+            # Some files were removed.
+            self.modified = True
+        self.sections[section_name] = new_entries
+        self.store()
+        return {file_name: entry["ids"] for file_name, entry in new_entries.items()}
+
+    def store(self):
+        if not self.modified:
+            return
+
+        # NOTE: Write to a temporary file first so that an interrupted run can't leave a truncated index behind.
+        tmp_index_path = self.index_path + ".tmp"
+        with open(tmp_index_path, "w", encoding=ENCODING) as f:
+            json.dump({"version": INDEX_VERSION, "sections": self.sections}, f)
+        os.replace(tmp_index_path, self.index_path)
+        self.modified = False
+
+
+def scan_files_in_parallel(file_names, scan_file, jobs):
+    """Returns a list with the result of scan_file() for every file, in the same order as file_names"""
+
+    if jobs <= 1 or len(file_names) <= 1:
+        return [scan_file(file_name) for file_name in file_names]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # NOTE: map() preserves the order of inputs so the results do not depend on the number of jobs.
+        return list(executor.map(scan_file, file_names, chunksize=max(1, len(file_names) // (jobs * 4))))
+
+
+def scan_files(file_names, scan_file, index=None, section_name=None, jobs=1, changed_file_names=frozenset()):
+    """Returns a dictionary with the result of scan_file() for every file, using the index if given"""
+
+    if index is None:
+        return dict(zip(file_names, scan_files_in_parallel(file_names, scan_file, jobs)))
+    return index.scan(section_name, file_names, scan_file, jobs, changed_file_names)
+
+
+def find_comment_spans(source):
+    """
+    Returns the start and end offsets of all comments in a C++ source as two sorted lists.
+    String and character literals are skipped so that e.g. "//" inside a string does not start a comment.
+    """
+
+    comment_starts = []
+    comment_ends = []
+    pos = 0
+    while True:
+        m = COMMENT_OR_LITERAL_START_PATTERN.search(source, pos)
+        if m is None:
+            return comment_starts, comment_ends
+
+        token = m.group(0)
+        if token in ("//", "/*"):
+            end = source.find("\n" if token == "//" else "*/", m.end())
+            if end == -1:
+                end = len(source)
+            elif token == "/*":
+                end += 2
+            comment_starts.append(m.start())
+            comment_ends.append(end)
+            pos = end
+            continue
+
+        if token == 'R"':
+            delimiter_match = RAW_STRING_DELIMITER_PATTERN.match(source, m.end())
+            if delimiter_match is not None:
+                end = source.find(")" + delimiter_match.group(1) + '"', delimiter_match.end())
+                if end != -1:
+                    pos = end + len(delimiter_match.group(1)) + 2
+                    continue
+            token = '"'
+
+        # Unterminated literals are ignored.
+        rest_pattern = STRING_LITERAL_REST_PATTERN if token == '"' else CHARACTER_LITERAL_REST_PATTERN
+        rest_match = rest_pattern.match(source, m.start() + 1)
+        pos = rest_match.end() if rest_match is not None else m.start() + 1
 
 
-def in_comment(source, pos):
-    slash_slash_pos = source.rfind("//", 0, pos)
-    lf_pos = source.rfind("\n", 0, pos)
-    if slash_slash_pos > lf_pos:
-        return True
-    slash_star_pos = source.rfind("/*", 0, pos)
-    star_slash_pos = source.rfind("*/", 0, pos)
-    return slash_star_pos > star_slash_pos
+def in_comment(comment_spans, pos):
+    comment_starts, comment_ends = comment_spans
+    k = bisect_right(comment_starts, pos) - 1
+    return k >= 0 and pos < comment_ends[k]
 
 
-def find_ids_in_source_file(file_name, id_to_file_names):
+def find_ids_in_source_file(file_name):
+    """Returns a list of ids in the order they appear in the source file, without ids in comments"""
+
     source = read_file(file_name)
+    comment_spans = None
+    ids = []
     for m in re.finditer(SOURCE_FILE_PATTERN, source):
-        if in_comment(source, m.start()):
+        # NOTE: Most files do not contain any IDs so comments are only located on the first match.
+        if comment_spans is None:
+            comment_spans = find_comment_spans(source)
+        if in_comment(comment_spans, m.start()):
             continue
         underscore_pos = m.group(0).index("_")
-        id = m.group(0)[0:underscore_pos]
-        if id in id_to_file_names:
-            id_to_file_names[id].append(file_name)
-        else:
-            id_to_file_names[id] = [file_name]
+        ids.append(m.group(0)[0:underscore_pos])
+    return ids
 
 
-def find_ids_in_source_files(file_names):
+def find_ids_in_source_files(file_names, index=None, jobs=1, changed_file_names=frozenset()):
     """Returns a dictionary with list of source files for every appearance of every id"""
 
     id_to_file_names = {}
+    file_name_to_ids = scan_files(file_names, find_ids_in_source_file, index, "sources", jobs, changed_file_names)
     for file_name in file_names:
-        find_ids_in_source_file(file_name, id_to_file_names)
+        for id in file_name_to_ids[file_name]:
+            if id in id_to_file_names:
+                id_to_file_names[id].append(file_name)
+            else:
+                id_to_file_names[id] = [file_name]
     return id_to_file_names
 
 
-def get_next_id(available_ids):
-    assert len(available_ids) > 0, "Out of IDs"
-    next_id = random.choice(list(available_ids))
-    available_ids.remove(next_id)
-    return next_id
-
+def allocate_ids(available_ids, count):
+    """Returns a list of count distinct random ids from available_ids; deterministic if the random module is seeded"""
 
-def fix_ids_in_source_file(file_name, id_to_count, available_ids):
-    source = read_file(file_name)
+    assert count <= len(available_ids), "Out of IDs"
+    # NOTE: Sorting makes the result depend only on the seed and not on the iteration order of the set.
+    return random.sample(sorted(available_ids), count)
 
-    k = 0
-    destination = []
-    for m in re.finditer(SOURCE_FILE_PATTERN, source):
-        destination.extend(source[k:m.start()])
 
-        underscore_pos = m.group(0).index("_")
-        id = m.group(0)[0:underscore_pos]
-
-        # incorrect id or id has a duplicate somewhere
-        if not in_comment(source, m.start()) and (len(id) != 4 or id[0] == "0" or id_to_count[id] > 1):
-            assert id in id_to_count
-            new_id = get_next_id(available_ids)
-            assert new_id not in id_to_count
-            id_to_count[id] -= 1
-        else:
-            new_id = id
+def plan_id_replacements(file_names, id_to_file_names):
+    """
+    Returns a dictionary with the number of leading appearances of every id that has to be replaced in every file.
+    Files that do not need to be changed are omitted.
+    """
 
-        destination.extend(new_id + "_error")
-        k = m.end()
+    file_name_to_replacement_counts = {}
+    for id, id_file_names in id_to_file_names.items():
+        # Every appearance of an incorrect id is replaced.
+        # Of an id that has duplicates, only the last appearance is kept.
+        replacement_count = len(id_file_names) if len(id) != 4 or id[0] == "0" else len(id_file_names) - 1
+        for file_name in id_file_names[:replacement_count]:
+            replacement_counts = file_name_to_replacement_counts.setdefault(file_name, {})
+            replacement_counts[id] = replacement_counts.get(id, 0) + 1
+
+    return {
+        file_name: file_name_to_replacement_counts[file_name]
+        for file_name in file_names
+        if file_name in file_name_to_replacement_counts
+    }
 
-    destination.extend(source[k:])
 
-    destination = ''.join(destination)
-    if source != destination:
-        write_file(file_name, destination)
-        print(f"Fixed file: {file_name}")
+def fix_ids_in_source_file(file_name, id_to_replacement_count, new_ids):
+    """
+    Replaces the first id_to_replacement_count[id] appearances of every id outside of comments
+    with consecutive ids from new_ids. The result is written to a temporary file that then atomically
+    replaces the original one.
+    """
 
+    source = read_file(file_name)
+    comment_spans = find_comment_spans(source)
+    id_to_replacement_count = dict(id_to_replacement_count)
+    new_ids = iter(new_ids)
 
-def fix_ids_in_source_files(file_names, id_to_count):
+    tmp_file_name = file_name + ".tmp"
+    try:
+        with open(tmp_file_name, "w", encoding=ENCODING) as f:
+            k = 0
+            for m in re.finditer(SOURCE_FILE_PATTERN, source):
+                underscore_pos = m.group(0).index("_")
+                id = m.group(0)[0:underscore_pos]
+                if in_comment(comment_spans, m.start()) or id_to_replacement_count.get(id, 0) == 0:
+                    continue
+
+                f.write(source[k:m.start()])
+                f.write(next(new_ids) + "_error")
+                id_to_replacement_count[id] -= 1
+                k = m.end()
+            f.write(source[k:])
+
+        assert all(count == 0 for count in id_to_replacement_count.values()), f"Unexpected ids in {file_name}"
+        shutil.copymode(file_name, tmp_file_name)
+        os.replace(tmp_file_name, file_name)
+    except BaseException:
+        os.remove(tmp_file_name)
+        raise
+
+
+def fix_ids_in_source_files(file_names, id_to_file_names, jobs=1):
     """
     Fixes ids in given source files;
-    id_to_count contains number of appearances of every id in sources
+    id_to_file_names contains the list of source files for every appearance of every id
     """
 
-    available_ids = {str(id) for id in range(1000, 10000)} - id_to_count.keys()
-    for file_name in file_names:
-        fix_ids_in_source_file(file_name, id_to_count, available_ids)
+    file_name_to_replacement_counts = plan_id_replacements(file_names, id_to_file_names)
+    file_names_to_fix = list(file_name_to_replacement_counts)
+
+    # NOTE: All new ids are drawn at once and handed out in the order of files and appearances
+    # so that the result does not depend on the order in which files are processed.
+    available_ids = {str(id) for id in range(1000, 10000)} - id_to_file_names.keys()
+    new_ids = allocate_ids(
+        available_ids,
+        sum(sum(counts.values()) for counts in file_name_to_replacement_counts.values())
+    )
+    new_ids_per_file = []
+    for file_name in file_names_to_fix:
+        count = sum(file_name_to_replacement_counts[file_name].values())
+        new_ids_per_file.append(new_ids[:count])
+        new_ids = new_ids[count:]
+
+    replacement_counts_per_file = [file_name_to_replacement_counts[file_name] for file_name in file_names_to_fix]
+    if jobs <= 1 or len(file_names_to_fix) <= 1:
+        for file_name, replacement_counts, file_new_ids in zip(file_names_to_fix, replacement_counts_per_file, new_ids_per_file):
+            fix_ids_in_source_file(file_name, replacement_counts, file_new_ids)
+            print(f"Fixed file: {file_name}")
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(fix_ids_in_source_file, file_names_to_fix, replacement_counts_per_file, new_ids_per_file)
+            for file_name, _ in zip(file_names_to_fix, results):
+                print(f"Fixed file: {file_name}")
 
 
 def find_files(top_dir, sub_dirs, extensions):
@@ -129,12 +320,18 @@ def find_ids_in_test_file(file_name):
     return {m.group(0)[-5:-1] for m in re.finditer(pattern, source, flags=re.MULTILINE)}
 
 
-def find_ids_in_test_files(file_names):
+def find_sorted_ids_in_test_file(file_name):
+    # NOTE: Sets are not JSON-serializable so the index stores sorted lists.
+    return sorted(find_ids_in_test_file(file_name))
+
+
+def find_ids_in_test_files(file_names, index=None, jobs=1, changed_file_names=frozenset()):
     """Returns a set containing all ids in tests"""
 
     ids = set()
+    file_name_to_ids = scan_files(file_names, find_sorted_ids_in_test_file, index, "tests", jobs, changed_file_names)
     for file_name in file_names:
-        ids |= find_ids_in_test_file(file_name)
+        ids.update(file_name_to_ids[file_name])
     return ids
 
 
@@ -169,7 +366,7 @@ def print_ids_per_file(ids, id_to_file_names, top_dir):
         print()
 
 
-def examine_id_coverage(top_dir, source_id_to_file_names, new_ids_only=False):
+def examine_id_coverage(top_dir, source_id_to_file_names, new_ids_only=False, index=None, jobs=1, changed_file_names=frozenset()):
     test_sub_dirs = [
         path.join("test", "libsolidity", "errorRecoveryTests"),
         path.join("test", "libsolidity", "smtCheckerTests"),
@@ -182,7 +379,7 @@ def examine_id_coverage(top_dir, source_id_to_file_names, new_ids_only=False):
         [".sol", ".yul"]
     )
     source_ids = source_id_to_file_names.keys()
-    test_ids = find_ids_in_test_files(test_file_names)
+    test_ids = find_ids_in_test_files(test_file_names, index, jobs, changed_file_names)
 
     # special case, we are interested in warnings which are ignored by regular tests:
     # Warning (1878): SPDX license identifier not provided in source file. ....
@@ -245,6 +442,28 @@ def examine_id_coverage(top_dir, source_id_to_file_names, new_ids_only=False):
     return True
 
 
+def find_changed_files(top_dir, revision):
+    """
+    Returns a set with absolute paths of all files in top_dir that differ from the given git revision,
+    including uncommitted and untracked files
+    """
+
+    changed_file_names = set()
+    for command in [
+        ["git", "diff", "--name-only", "--no-renames", "--relative", "-z", revision, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+    ]:
+        result = subprocess.run(command, cwd=top_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+        if result.returncode != 0:
+            exit(f"Failed to list files changed since {revision}:\n{result.stderr.decode(ENCODING, errors='replace')}")
+        changed_file_names |= {
+            path.join(top_dir, file_name)
+            for file_name in result.stdout.decode(ENCODING).split("\0")
+            if file_name != ""
+        }
+    return changed_file_names
+
+
 def main(argv):
     # pylint: disable=too-many-branches, too-many-locals, too-many-statements
 
@@ -253,7 +472,15 @@ def main(argv):
     no_confirm = False
     examine_coverage = False
     next_id = False
-    opts, args = getopt.getopt(argv, "", ["check", "fix", "no-confirm", "examine-coverage", "next"])
+    index_path = None
+    jobs = os.cpu_count()
+    changed_since = None
+    seed = None
+    opts, args = getopt.getopt(
+        argv,
+        "",
+        ["check", "fix", "no-confirm", "examine-coverage", "next", "index=", "jobs=", "changed-since=", "seed="]
+    )
 
     for opt, arg in opts:
         if opt == "--check":
@@ -266,19 +493,49 @@ def main(argv):
             examine_coverage = True
         elif opt == "--next":
             next_id = True
-
-    if [check, fix, examine_coverage, next_id].count(True) != 1:
-        print("usage: python error_codes.py --check | --fix [--no-confirm] | --examine-coverage | --next")
+        elif opt == "--index":
+            index_path = arg
+        elif opt == "--jobs":
+            jobs = int(arg)
+        elif opt == "--changed-since":
+            changed_since = arg
+        elif opt == "--seed":
+            seed = int(arg)
+
+    if [check, fix, examine_coverage, next_id].count(True) != 1 or (changed_since is not None and not check):
+        print(
+            "usage: python error_codes.py --check [--changed-since <rev>] | --fix [--no-confirm] | --examine-coverage | --next\n"
+            "                              [--index <file>] [--jobs <n>] [--seed <n>]\n"
+            "\n"
+            "--index <file>  Store the IDs found in every file in an index and on subsequent runs\n"
+            "                only scan files that changed since then.\n"
+            "--jobs <n>      Number of files scanned in parallel. By default the number of CPUs.\n"
+            "--changed-since <rev>\n"
+            "                Only report problems with IDs that appear in files changed since the given git revision.\n"
+            "                The changed files are always scanned again. Use --index to avoid scanning the others.\n"
+            "--seed <n>      Seed for choosing new IDs in --fix and --next. The same seed gives the same IDs."
+        )
         exit(1)
 
     cwd = os.getcwd()
+    index = IdIndex(index_path) if index_path is not None else None
+    changed_file_names = find_changed_files(cwd, changed_since) if changed_since is not None else frozenset()
 
     source_file_names = find_files(
         cwd,
         ["libevmasm", "liblangutil", "libsolc", "libsolidity", "libsolutil", "libyul", "solc"],
         [".h", ".cpp"]
     )
-    source_id_to_file_names = find_ids_in_source_files(source_file_names)
+    source_id_to_file_names = find_ids_in_source_files(source_file_names, index, jobs, changed_file_names)
+
+    if changed_since is not None:
+        # NOTE: The whole tree must be scanned to find duplicates but only the IDs
+        # from changed files are checked.
+        source_id_to_file_names = {
+            id: file_names
+            for id, file_names in source_id_to_file_names.items()
+            if any(file_name in changed_file_names for file_name in file_names)
+        }
 
     ok = True
     for id in sorted(source_id_to_file_names):
@@ -296,19 +553,26 @@ def main(argv):
         if not ok:
             print("Incorrect IDs have to be fixed before applying --examine-coverage")
             exit(1)
-        res = 0 if examine_id_coverage(cwd, source_id_to_file_names) else 1
+        res = 0 if examine_id_coverage(cwd, source_id_to_file_names, index=index, jobs=jobs) else 1
         exit(res)
 
-    ok &= examine_id_coverage(cwd, source_id_to_file_names, new_ids_only=True)
+    ok &= examine_id_coverage(
+        cwd,
+        source_id_to_file_names,
+        new_ids_only=True,
+        index=index,
+        jobs=jobs,
+        changed_file_names=changed_file_names,
+    )
 
-    random.seed()
+    random.seed(seed)
 
     if next_id:
         if not ok:
             print("Incorrect IDs have to be fixed before applying --next")
             exit(1)
         available_ids = {str(id) for id in range(1000, 10000)} - source_id_to_file_names.keys()
-        next_id = get_next_id(available_ids)
+        [next_id] = allocate_ids(available_ids, 1)
         print(f"Next ID: {next_id}")
         exit(0)
 
@@ -332,10 +596,7 @@ def main(argv):
         if answer not in "yY":
             exit(1)
 
-    # number of appearances for every id
-    source_id_to_count = { id: len(file_names) for id, file_names in source_id_to_file_names.items() }
-
-    fix_ids_in_source_files(source_file_names, source_id_to_count)
+    fix_ids_in_source_files(source_file_names, source_id_to_file_names, jobs)
     print("Fixing completed")
     exit(2)
 
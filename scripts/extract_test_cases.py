@@ -5,39 +5,37 @@
 # This can be used to extract the Solidity test cases
 # into files for e.g. fuzz testing as
 # scripts/isolate_tests.py test/libsolidity/*
+#
+# Unlike isolate_tests.py, files are named after the Boost test case containing the string
+# (e.g. 001_test_name.sol) and the leading indentation used in C++ sources is removed.
 
 import sys
 import re
 
-def extract_test_cases(_path):
-    lines = open(_path, mode='rb', encoding='utf8').read().splitlines()
+from snippet_extraction import iter_raw_strings, load_with_normalized_line_breaks
+
+TEST_CASE_NAME_PATTERN = re.compile(r'BOOST_AUTO_TEST_CASE\(([^(\n]*)\)')
 
-    inside = False
-    delimiter = ''
-    test = ''
+def extract_test_cases(_path):
+    content = load_with_normalized_line_breaks(_path)
 
     ctr = 1
     test_name = ''
+    position = 0
+
+    for raw_string in iter_raw_strings(content):
+        if not raw_string.terminated:
+            break
+
+        # The name is the last one that appears before the string, outside of other strings.
+        for m in TEST_CASE_NAME_PATTERN.finditer(content, position, raw_string.start):
+            test_name = m.group(1)
+        position = raw_string.end
 
-    for l in lines:
-        if inside:
-            if l.strip().endswith(')' + delimiter + '";'):
-                open('%03d_%s.sol' % (ctr, test_name), mode='wb', encoding='utf8').write(test)
-                ctr += 1
-                inside = False
-                test = ''
-            else:
-                l = re.sub('^\t\t', '', l)
-                l = l.replace('\t', '        ')
-                test += l + '\n'
-        else:
-            m = re.search(r'BOOST_AUTO_TEST_CASE\(([^(]*)\)', l.strip())
-            if m:
-                test_name = m.group(1)
-            m = re.search(r'R"([^(]*)\($', l.strip())
-            if m:
-                inside = True
-                delimiter = m.group(1)
+        test = re.sub('^\t\t', '', raw_string.body, flags=re.MULTILINE).replace('\t', '        ')
+        with open('%03d_%s.sol' % (ctr, test_name), mode='w', encoding='utf8', newline='') as test_file:
+            test_file.write(test)
+        ctr += 1
 
 if __name__ == '__main__':
     extract_test_cases(sys.argv[1])
@@ -5,102 +5,279 @@
 # This can be used to extract the Solidity test cases
 # into files for e.g. fuzz testing as
 # scripts/isolate_tests.py test/libsolidity/*
+#
+# The extraction itself is implemented in snippet_extraction.py.
 
 import sys
 import re
 import os
 import hashlib
+import json
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 from os.path import join, isfile, split
 
-def extract_test_cases(path):
-    lines = open(path, encoding="utf8", errors='ignore', mode='r', newline='').read().splitlines()
+from snippet_extraction import MisindentedCodeError, iter_doc_cases, iter_test_cases
 
-    inside = False
-    delimiter = ''
-    tests = []
+MANIFEST_VERSION = 1
 
-    for l in lines:
-        if inside:
-            if l.strip().endswith(')' + delimiter + '";'):
-                inside = False
-            else:
-                tests[-1] += l + '\n'
-        else:
-            m = re.search(r'R"([^(]*)\($', l.strip())
-            if m:
-                inside = True
-                delimiter = m.group(1)
-                tests += ['']
-
-    return tests
-
-# Contract sources are indented by 4 spaces.
-# Look for `pragma solidity`, `contract`, `library` or `interface`
-# and abort a line not indented properly.
-def extract_docs_cases(path):
-    inside = False
-    extractedLines = []
-    tests = []
-
-    # Collect all snippets of indented blocks
-    for l in open(path, mode='r', errors='ignore', encoding='utf8', newline='').read().splitlines():
-        if l != '':
-            if not inside and l.startswith(' '):
-                # start new test
-                extractedLines += ['']
-            inside = l.startswith(' ')
-        if inside:
-            extractedLines[-1] += l + '\n'
-
-    codeStart = "(// SPDX-License-Identifier:|pragma solidity|contract.*{|library.*{|interface.*{)"
-
-    # Filter all tests that do not contain Solidity or are intended incorrectly.
-    for lines in extractedLines:
-        if re.search(r'^\s{0,3}' + codeStart, lines, re.MULTILINE):
-            print("Intendation error in " + path + ":")
-            print(lines)
-            exit(1)
-        if re.search(r'^\s{4}' + codeStart, lines, re.MULTILINE):
-            tests.append(lines)
-
-    return tests
-
-def write_cases(f, tests):
+def iter_named_cases(f, tests, deduplicate=False):
     cleaned_filename = f.replace(".","_").replace("-","_").replace(" ","_").lower()
     for test in tests:
         # When code examples are extracted they indented by 8 spaces, which violates the style guide,
         # so before checking remove 4 spaces from each line.
         remainder = re.sub(r'^ {4}', '', test, 0, re.MULTILINE)
-        sol_filename = 'test_%s_%s.sol' % (hashlib.sha256(test.encode("utf-8")).hexdigest(), cleaned_filename)
-        open(sol_filename, mode='w', encoding='utf8', newline='').write(remainder)
+        if deduplicate:
+            # Content-addressed: identical test cases from any number of inputs end up in the same file.
+            sol_filename = 'test_%s.sol' % hashlib.sha256(remainder.encode("utf-8", "surrogateescape")).hexdigest()
+        else:
+            sol_filename = 'test_%s_%s.sol' % (hashlib.sha256(test.encode("utf-8", "surrogateescape")).hexdigest(), cleaned_filename)
+        yield (sol_filename, remainder)
 
-def extract_and_write(f, path):
+def write_cases(f, tests, deduplicate=False):
+    sol_filenames = []
+    for sol_filename, remainder in iter_named_cases(f, tests, deduplicate):
+        # NOTE: With deduplication the name depends only on the content so an existing file
+        # does not have to be written again.
+        if not deduplicate or not isfile(sol_filename):
+            # NOTE: surrogateescape writes back undecodable bytes of cases extracted with legacy rules.
+            open(sol_filename, mode='w', encoding='utf8', errors='surrogateescape', newline='').write(remainder)
+        sol_filenames.append(sol_filename)
+    return sol_filenames
+
+def iter_cases(path, docs):
     if docs:
-        cases = extract_docs_cases(path)
+        return iter_doc_cases(path)
     else:
-        if f.endswith('.sol'):
-            cases = [open(path, mode='r', encoding='utf8', newline='').read()]
-        else:
-            cases = extract_test_cases(path)
-    write_cases(f, cases)
+        return iter_test_cases(path)
 
-if __name__ == '__main__':
-    path = sys.argv[1]
-    docs = False
-    if len(sys.argv) > 2 and sys.argv[2] == 'docs':
-        docs = True
+def extract_and_write(f, path, docs, deduplicate=False):
+    return write_cases(f, iter_cases(path, docs), deduplicate)
+
+def extract_named_cases(f, path, docs):
+    return list(iter_named_cases(f, iter_cases(path, docs)))
+
+def iter_extracted_cases(input_files, docs, jobs):
+    # Yields (file name, content) of every test case, in the same order and under the same name
+    # they would be written with, without writing anything.
+    if jobs == 1:
+        for f, path in input_files:
+            yield from iter_named_cases(f, iter_cases(path, docs))
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # NOTE: map() yields results in input order as soon as they are ready.
+        for named_cases in executor.map(
+            extract_named_cases,
+            [f for f, _ in input_files],
+            [path for _, path in input_files],
+            [docs] * len(input_files),
+            chunksize=max(1, len(input_files) // (jobs * 4)),
+        ):
+            yield from named_cases
 
+def find_input_files(path):
     if isfile(path):
-        extract_and_write(path, path)
+        return [(path, path)]
+
+    input_files = []
+    for root, subdirs, files in os.walk(path):
+        if '_build' in subdirs:
+            subdirs.remove('_build')
+        if 'compilationTests' in subdirs:
+            subdirs.remove('compilationTests')
+        # NOTE: Sort to get the same order of processing (and of error messages) on every platform.
+        subdirs.sort()
+        for f in sorted(files):
+            _, tail = split(f)
+            if tail == "invalid_utf8_sequence.sol":
+                continue  # ignore the test with broken utf-8 encoding
+            input_files.append((f, join(root, f)))
+    return input_files
+
+def extract_and_write_all(input_files, docs, jobs, deduplicate=False):
+    if jobs == 1:
+        return [extract_and_write(f, path, docs, deduplicate) for f, path in input_files]
+
+    # Output file names depend only on the content and the input file name so they do not
+    # depend on the order in which workers finish. Exceptions (including indentation errors
+    # in docs) are re-raised here, in input order.
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # NOTE: A large chunksize keeps the per-task overhead low. Most input files are tiny.
+        chunksize = max(1, len(input_files) // (jobs * 4))
+        return list(executor.map(
+            extract_and_write,
+            [f for f, _ in input_files],
+            [path for _, path in input_files],
+            [docs] * len(input_files),
+            [deduplicate] * len(input_files),
+            chunksize=chunksize,
+        ))
+
+def file_sha256(path):
+    with open(path, 'rb') as input_file:
+        return hashlib.sha256(input_file.read()).hexdigest()
+
+def load_manifest(manifest_path):
+    if not isfile(manifest_path):
+        return {'version': MANIFEST_VERSION, 'runs': {}}
+
+    with open(manifest_path, encoding='utf8') as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get('version') != MANIFEST_VERSION:
+        sys.exit(f"Unsupported version of manifest {manifest_path}. Remove it together with the extracted files.")
+    return manifest
+
+def store_json(json_path, value):
+    # NOTE: Write to a temporary file first so that an interrupted run can't leave a truncated file behind.
+    tmp_json_path = json_path + '.tmp'
+    with open(tmp_json_path, 'w', encoding='utf8', newline='\n') as json_file:
+        json.dump(value, json_file, indent=4, sort_keys=True)
+        json_file.write('\n')
+    os.replace(tmp_json_path, json_path)
+
+def extract_and_write_changed(root, input_files, docs, jobs, manifest_path, deduplicate=False):
+    # The manifest maps every input file to the files extracted from it. Inputs are identified by
+    # path relative to the root directory. The root and the mode are part of the key because the
+    # same output directory is often shared by multiple runs (e.g. test/ and docs/).
+    manifest = load_manifest(manifest_path)
+    run_key = f"{'docs' if docs else 'tests'}{',deduplicated' if deduplicate else ''}:{os.path.abspath(root)}"
+    previous_entries = manifest['runs'].get(run_key, {})
+
+    current_entries = {}
+    changed_files = []
+    changed_file_entries = []
+    for f, path in input_files:
+        input_key = os.path.relpath(path, root)
+        stat = os.stat(path)
+        entry = previous_entries.get(input_key)
+
+        if entry is not None and all(isfile(output) for output in entry['outputs']):
+            if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                current_entries[input_key] = entry
+                continue
+
+            # NOTE: The modification time changes on checkout even if the content does not.
+            digest = file_sha256(path)
+            if entry['sha256'] == digest:
+                current_entries[input_key] = {**entry, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+                continue
+        else:
+            digest = file_sha256(path)
+
+        # NOTE: The file is hashed before extraction. If it changes in the meantime, the next run
+        # will just extract it again.
+        changed_files.append((f, path))
+        changed_file_entries.append((input_key, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}))
+
+    for (input_key, entry), outputs in zip(changed_file_entries, extract_and_write_all(changed_files, docs, jobs, deduplicate)):
+        current_entries[input_key] = {**entry, 'outputs': sorted(set(outputs))}
+
+    # Identical snippets in files with the same name produce the same output, so an output
+    # is stale only if no input in any run still produces it.
+    live_outputs = {output for entry in current_entries.values() for output in entry['outputs']}
+    for other_run_key, entries in manifest['runs'].items():
+        if other_run_key != run_key:
+            live_outputs |= {output for entry in entries.values() for output in entry['outputs']}
+
+    stale_outputs = {output for entry in previous_entries.values() for output in entry['outputs']} - live_outputs
+    for output in sorted(stale_outputs):
+        if isfile(output):
+            os.remove(output)
+
+    manifest['runs'][run_key] = current_entries
+    store_json(manifest_path, manifest)
+
+    outputs_by_input = {input_key: entry['outputs'] for input_key, entry in current_entries.items()}
+    return (outputs_by_input, len(changed_files), len(stale_outputs))
+
+def parse_command_line():
+    parser = ArgumentParser(description="Extracts Solidity test cases from C++, RST and Solidity files into individual files.")
+    parser.add_argument(dest='path', help="File or directory to extract test cases from.")
+    parser.add_argument(
+        dest='mode',
+        nargs='?',
+        choices=['docs'],
+        help="Use 'docs' to extract code blocks from RST files instead of raw strings from C++ sources.",
+    )
+    parser.add_argument(
+        '--jobs',
+        dest='jobs',
+        default=1,
+        type=int,
+        help="Number of worker processes extracting files in parallel.",
+    )
+    parser.add_argument(
+        '--manifest',
+        dest='manifest',
+        default=None,
+        help=(
+            "Manifest of the files extracted by previous runs into the current working directory. "
+            "If given, only new and modified input files are extracted and files extracted earlier "
+            "from inputs that have since changed or disappeared are removed. The manifest is created if it does not exist."
+        ),
+    )
+    parser.add_argument(
+        '--ndjson',
+        dest='ndjson',
+        default=False,
+        action='store_true',
+        help=(
+            "Instead of writing files, print the test cases to the standard output, one JSON object per line: "
+            '{"name": <file name>, "content": <source code>}. Suitable for prepare_report.py --sources-from-stdin.'
+        ),
+    )
+    parser.add_argument(
+        '--deduplicate',
+        dest='index',
+        default=None,
+        help=(
+            "Write every distinct test case only once, to a file named after the hash of its content, "
+            "and store the names of the files extracted from each input file in the specified JSON index file."
+        ),
+    )
+    return parser.parse_args()
+
+def main(options):
+    if options.jobs < 1:
+        sys.exit("--jobs must be at least 1.")
+
+    if options.ndjson and (options.manifest is not None or options.index is not None):
+        sys.exit("--ndjson can't be combined with --manifest or --deduplicate.")
+
+    input_files = find_input_files(options.path)
+    if options.ndjson:
+        for name, content in iter_extracted_cases(input_files, options.mode == 'docs', options.jobs):
+            print(json.dumps({'name': name, 'content': content}))
+        return
+
+    deduplicate = options.index is not None
+    if options.manifest is None:
+        outputs = extract_and_write_all(input_files, options.mode == 'docs', options.jobs, deduplicate)
+        outputs_by_input = {
+            os.path.relpath(path, options.path): sorted(set(file_outputs))
+            for (_, path), file_outputs in zip(input_files, outputs)
+        }
     else:
-        for root, subdirs, files in os.walk(path):
-            if '_build' in subdirs:
-                subdirs.remove('_build')
-            if 'compilationTests' in subdirs:
-                subdirs.remove('compilationTests')
-            for f in files:
-                _, tail = split(f)
-                if tail == "invalid_utf8_sequence.sol":
-                    continue  # ignore the test with broken utf-8 encoding
-                path = join(root, f)
-                extract_and_write(f, path)
+        (outputs_by_input, changed_count, stale_count) = extract_and_write_changed(
+            options.path,
+            input_files,
+            options.mode == 'docs',
+            options.jobs,
+            options.manifest,
+            deduplicate,
+        )
+        print(f"Extracted {changed_count} new or modified files out of {len(input_files)}.")
+        print(f"Removed {stale_count} stale outputs.")
+
+    if deduplicate:
+        store_json(options.index, {input_key: outputs for input_key, outputs in outputs_by_input.items() if len(outputs) > 0})
+        unique_outputs = {output for file_outputs in outputs_by_input.values() for output in file_outputs}
+        print(f"Extracted {len(unique_outputs)} distinct test cases from {len(outputs_by_input)} files.")
+
+if __name__ == '__main__':
+    try:
+        main(parse_command_line())
+    except MisindentedCodeError as exception:
+        print(exception, file=sys.stderr)
+        sys.exit(1)
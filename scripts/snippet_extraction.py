@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+#
+# Library for extracting Solidity snippets from the test suite and the documentation:
+# - raw strings (R"(...)") from C++ sources,
+# - whole Solidity source files,
+# - indented code blocks from RST files.
+# Used by scripts/isolate_tests.py, scripts/extract_test_cases.py and
+# scripts/wasm-rebuild/docker-scripts/isolate_tests.py.
+#
+# The functions extracting raw strings accept legacy_rules=True to get the rules of the original
+# Python 2 script used to rebuild historic releases (see iter_legacy_raw_strings()).
+#
+# All the iter_*() functions are generators and yield snippets one by one so that callers can start
+# processing them (e.g. compiling) without waiting for the whole tree to be scanned.
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Union
+
+# Line breaks recognized by str.splitlines() in addition to '\n'.
+OTHER_LINE_BREAKS = ['\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029']
+
+RAW_STRING_START_PATTERN = re.compile(r'R"([^(\n]*)\([^\S\n]*$', re.MULTILINE)
+
+# A line ending with any of the line breaks recognized by bytes.splitlines() or the last line without one.
+LEGACY_LINE_PATTERN = re.compile(r'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$')
+LEGACY_RAW_STRING_START_PATTERN = re.compile(r'R"([^(]*)\((.*)$')
+# Whitespace removed by bytes.strip().
+LEGACY_WHITESPACE = ' \t\n\r\x0b\x0c'
+
+# Contract sources are indented by 4 spaces.
+# Look for `pragma solidity`, `contract`, `library` or `interface`
+# and abort a line not indented properly.
+DOCS_CODE_LINE_PATTERN = re.compile(
+    r'^([^\S\n]*)(// SPDX-License-Identifier:|pragma solidity|contract.*{|library.*{|interface.*{)',
+    re.MULTILINE,
+)
+# A line not indented with a space that is not empty ends an indented block.
+INDENTED_BLOCK_END_PATTERN = re.compile(r'\n[^ \n]')
+
+
+class MisindentedCodeError(Exception):
+    def __init__(self, path: str, block: str):
+        # NOTE: Passing all arguments to the base class keeps the exception picklable, which is
+        # necessary to get it out of a worker process.
+        super().__init__(path, block)
+        self.path = path
+        self.block = block
+
+    def __str__(self):
+        return f"Intendation error in {self.path}:\n{self.block}"
+
+
+@dataclass(frozen=True)
+class RawString:
+    body: str
+    # Offset of the `R"` that starts the string.
+    start: int
+    # Offset of the first line after the one that ends the string.
+    end: int
+    # False if the end of the file was reached before the end of the string. The body then
+    # contains everything up to the end of the file.
+    terminated: bool
+
+
+def load_with_normalized_line_breaks(path: Union[Path, str]) -> str:
+    with open(path, encoding="utf8", errors='ignore', mode='r', newline='') as source_file:
+        content = source_file.read()
+
+    # NOTE: The scanners only understand '\n' so normalize other line breaks the same way
+    # str.splitlines() would. This is rare and done once per file.
+    if any(line_break in content for line_break in OTHER_LINE_BREAKS):
+        lines = content.splitlines()
+        content = '\n'.join(lines) + '\n' if len(lines) > 0 else ''
+    return content
+
+
+@lru_cache(maxsize=None)
+def raw_string_end_pattern(delimiter: str) -> re.Pattern:
+    return re.compile(re.escape(')' + delimiter + '";') + r'[^\S\n]*$', re.MULTILINE)
+
+
+def load_without_decoding_errors(path: Union[Path, str]) -> str:
+    # NOTE: surrogateescape maps invalid bytes to surrogates so that the content can be written
+    # back exactly as it was, byte for byte.
+    with open(path, encoding='utf8', errors='surrogateescape', mode='r', newline='') as source_file:
+        return source_file.read()
+
+
+def iter_legacy_raw_strings(content: str) -> Iterator[RawString]:
+    # Rules of the original Python 2 script, which worked on lines of undecoded content:
+    # - A raw string starts at `R"delimiter(` anywhere in a line. The rest of that line is a part
+    #   of the string, without a line break.
+    # - It ends on a line ending with `)delimiter";`, ignoring surrounding whitespace. The text that
+    #   precedes it on that line is a part of the string, stripped and without a line break.
+    # - An unterminated raw string extends to the end of the file.
+    start = None
+    delimiter = ''
+    body = ''
+    for line_match in LEGACY_LINE_PATTERN.finditer(content):
+        line = line_match.group(0).rstrip('\r\n')
+        stripped_line = line.strip(LEGACY_WHITESPACE)
+
+        if start is not None:
+            if stripped_line.endswith(')' + delimiter + '";'):
+                yield RawString(body + stripped_line[:-(3 + len(delimiter))], start, line_match.end(), True)
+                start = None
+            else:
+                body += line + '\n'
+        else:
+            start_match = LEGACY_RAW_STRING_START_PATTERN.search(stripped_line)
+            if start_match is not None:
+                start = line_match.start() + line.index(stripped_line) + start_match.start()
+                delimiter = start_match.group(1)
+                body = start_match.group(2)
+
+    if start is not None:
+        yield RawString(body, start, len(content), False)
+
+
+def iter_raw_strings(content: str, legacy_rules: bool = False) -> Iterator[RawString]:
+    if legacy_rules:
+        yield from iter_legacy_raw_strings(content)
+        return
+
+    # Every raw string starts at the end of a line (`R"delimiter(`) and ends with a line ending
+    # in `)delimiter";`. Only the lines in between are extracted. Trailing whitespace is ignored
+    # on both lines. Expects content with line breaks normalized to '\n'.
+    position = 0
+    while position < len(content):
+        start_match = RAW_STRING_START_PATTERN.search(content, position)
+        if start_match is None:
+            return
+
+        body_start = content.find('\n', start_match.end())
+        body_start = len(content) if body_start == -1 else body_start + 1
+
+        end_match = raw_string_end_pattern(start_match.group(1)).search(content, body_start)
+        if end_match is None:
+            body_end = len(content)
+            position = len(content)
+        else:
+            body_end = max(content.rfind('\n', body_start, end_match.start()) + 1, body_start)
+            position = content.find('\n', end_match.end())
+            position = len(content) if position == -1 else position + 1
+
+        body = content[body_start:body_end]
+        if body != '' and not body.endswith('\n'):
+            # Unterminated raw string at the end of a file without a trailing newline.
+            body += '\n'
+        yield RawString(body, start_match.start(), position, end_match is not None)
+
+
+def iter_test_cases(path: Union[Path, str], legacy_rules: bool = False) -> Iterator[str]:
+    # Solidity files are test cases on their own. In all other files test cases are raw strings.
+    # With legacy_rules, files are not decoded (see load_without_decoding_errors()) and line breaks
+    # are not normalized.
+    if legacy_rules:
+        content = load_without_decoding_errors(path)
+        if str(path).endswith('.sol'):
+            yield content
+        else:
+            for raw_string in iter_legacy_raw_strings(content):
+                yield raw_string.body
+        return
+
+    if str(path).endswith('.sol'):
+        with open(path, mode='r', encoding='utf8', newline='') as source_file:
+            yield source_file.read()
+        return
+
+    for raw_string in iter_raw_strings(load_with_normalized_line_breaks(path)):
+        yield raw_string.body
+
+
+def find_indented_block_start(content: str, position: int) -> int:
+    if position == 0 and content.startswith(' '):
+        return 0
+
+    newline_position = content.find('\n ', position)
+    return newline_position + 1 if newline_position != -1 else -1
+
+
+def iter_indented_blocks(content: str) -> Iterator[str]:
+    # Yields maximal runs of lines that are indented with a space or empty, starting with an indented line.
+    block_start = find_indented_block_start(content, 0)
+    while block_start != -1:
+        end_match = INDENTED_BLOCK_END_PATTERN.search(content, block_start)
+        if end_match is None:
+            block = content[block_start:]
+            yield block if block.endswith('\n') else block + '\n'
+            return
+
+        yield content[block_start:end_match.start() + 1]
+        block_start = find_indented_block_start(content, end_match.end())
+
+
+def iter_doc_cases(path: Union[Path, str]) -> Iterator[str]:
+    # Yields all indented blocks that contain Solidity code. Raises MisindentedCodeError on the first
+    # block that contains Solidity code not indented by exactly 4 characters.
+    for block in iter_indented_blocks(load_with_normalized_line_breaks(path)):
+        indentations = {len(match.group(1)) for match in DOCS_CODE_LINE_PATTERN.finditer(block)}
+        if any(indentation < 4 for indentation in indentations):
+            raise MisindentedCodeError(str(path), block)
+        if 4 in indentations:
+            yield block
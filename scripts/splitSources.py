@@ -8,19 +8,33 @@
 # as a result prints
 # -  string of created files separated by whitespaces
 # -  'false' if the file only had one source
+# Exit codes: 0 if the file was split, 1 if it only had one source, 2 if it is not valid UTF-8,
+# 3 on an unexpected error and 4 on invalid command-line arguments.
+#
+# Batch usage: scripts/splitSources.py --output-dir DIR [--jobs N] pathToTestfile...
+# Splits all the files in a single process, each into its own subdirectory of DIR, and prints
+# a JSON list with one entry per test file, in the order they were given:
+#     {"test": <path>, "directory": <subdirectory>, "sources": <created files or null>, "error": <message or null>}
+# "sources" is null if the file only had one source. The names of the created files are relative
+# to "directory". "error" is set if the file is not valid UTF-8 (expected for some tests).
+#
+# As a library: loadSources(pathToTestfile) returns the sources as a {sourceName: content} dict
+# without writing anything to disk, e.g. to build Standard JSON input for solc.
 
-import sys
+import json
 import os
+import sys
 import traceback
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-hasMultipleSources = False
-createdSources = []
+USAGE_ERROR_EXIT_CODE = 4
 
 
 def uncaught_exception_hook(exc_type, exc_value, exc_traceback):
-    # The script `scripts/ASTImportTest.sh` will interpret return code 3
-    # as a critical error (because of the uncaught exception) and will
-    # terminate further execution.
+    # Return code 3 signals a critical error (because of the uncaught exception)
+    # so that calling scripts can terminate further execution.
     print("Unhandled exception: %s", "".join(traceback.format_exception(exc_type, exc_value, exc_traceback)))
     sys.exit(3)
 
@@ -34,41 +48,87 @@ def extractSourceName(line):
     return False, line[line.find(":")+2 : line.find(" ====")]
 
 
-# expects the first line of lines to be "==== Source: sourceName ===="
-# writes the following source into a file named sourceName
-def writeSourceToFile(lines):
-    filePath, srcName = extractSourceName(lines[0])
-    # print("sourceName is ", srcName)
-    # print("filePath is", filePath)
-    if filePath != False:
-        os.system("mkdir -p " + filePath)
-    f = open(srcName, mode='a+', encoding='utf8', newline='')
-    createdSources.append(srcName)
-    i = 0
-    for idx, line in enumerate(lines[1:]):
-
-        # write to file
-        if line[:12] != "==== Source:":
-            f.write(line)
-
-        # recursive call if there is another source
-        else:
-            writeSourceToFile(lines[1+idx:])
-            break
+# Yields (begin, end) index ranges into lines, one per source. Each range starts with
+# the "==== Source: sourceName ====" line.
+def iterSourceRanges(lines):
+    begin = None
+    for idx, line in enumerate(lines):
+        if line[:12] == "==== Source:":
+            if begin is not None:
+                yield begin, idx
+            begin = idx
+    if begin is not None:
+        yield begin, len(lines)
 
 
-if __name__ == '__main__':
-    filePath = sys.argv[1]
-    sys.excepthook = uncaught_exception_hook
+# Returns the sources of a multi-source test as a {sourceName: content} dict, in the order
+# they appear in the file, or None if the file only has one source.
+# Content of sources declared more than once is concatenated.
+def parseSources(lines):
+    if len(lines) == 0 or lines[0][:12] != "==== Source:":
+        return None
 
-    try:
-        # decide if file has multiple sources
-        lines = open(filePath, mode='r', encoding='utf8', newline='').read().splitlines()
-        if lines[0][:12] == "==== Source:":
-            hasMultipleSources = True
-            writeSourceToFile(lines)
+    sources = {}
+    for begin, end in iterSourceRanges(lines):
+        _, srcName = extractSourceName(lines[begin])
+        content = ''.join(lines[idx] + '\n' for idx in range(begin + 1, end))
+        sources[srcName] = sources.get(srcName, '') + content
+    return sources
+
+
+def loadSources(testFilePath):
+    with open(testFilePath, mode='r', encoding='utf8', newline='') as testFile:
+        return parseSources(testFile.read().splitlines())
+
+
+# Returns the list of created files or None if the file only had one source.
+def splitSources(testFilePath, outputDir='.'):
+    sources = loadSources(testFilePath)
+    if sources is None:
+        return None
 
-        if hasMultipleSources:
+    for srcName, content in sources.items():
+        if os.path.dirname(srcName) != '':
+            os.makedirs(os.path.join(outputDir, os.path.dirname(srcName)), exist_ok=True)
+        with open(os.path.join(outputDir, srcName), mode='w', encoding='utf8', newline='') as f:
+            f.write(content)
+    return list(sources)
+
+
+def splitIntoDirectory(testFilePath, outputDir):
+    os.makedirs(outputDir, exist_ok=True)
+    try:
+        return {'test': testFilePath, 'directory': outputDir, 'sources': splitSources(testFilePath, outputDir), 'error': None}
+    except UnicodeDecodeError as ude:
+        return {
+            'test': testFilePath,
+            'directory': outputDir,
+            'sources': None,
+            'error': "UnicodeDecodeError in '" + testFilePath + "': " + str(ude),
+        }
+
+
+def splitAll(testFilePaths, outputDir, jobs):
+    # Every test gets its own directory because different tests use the same source names.
+    # NOTE: The directory names only depend on the position of the test on the list, which keeps
+    # the output independent of the number of jobs.
+    outputDirs = [os.path.join(outputDir, str(i)) for i in range(len(testFilePaths))]
+    if jobs <= 1 or len(testFilePaths) <= 1:
+        return [splitIntoDirectory(path, directory) for path, directory in zip(testFilePaths, outputDirs)]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(
+            splitIntoDirectory,
+            testFilePaths,
+            outputDirs,
+            chunksize=max(1, len(testFilePaths) // (jobs * 4)),
+        ))
+
+
+def splitSingle(filePath):
+    try:
+        createdSources = splitSources(filePath)
+        if createdSources is not None:
             srcString = ""
             for src in createdSources:
                 srcString += src + ' '
@@ -82,3 +142,46 @@ if __name__ == '__main__':
         print("This is expected for some tests containing invalid utf8 sequences. "
               "Exception will be ignored.")
         sys.exit(2)
+
+
+class CommandLineParser(ArgumentParser):
+    # NOTE: ArgumentParser exits with code 2 on invalid arguments, which test/stopAfterParseTests.sh
+    # would take for a test that is not valid UTF-8 and skip.
+    def error(self, message):
+        self.print_usage(sys.stderr)
+        self.exit(USAGE_ERROR_EXIT_CODE, f"{self.prog}: error: {message}\n")
+
+
+def commandline_parser():
+    parser = CommandLineParser(description="Splits syntax tests with multiple sources into separate files.")
+    parser.add_argument(dest='test_files', nargs='+', help="Test files to split.")
+    parser.add_argument(
+        '--output-dir',
+        dest='output_dir',
+        default=None,
+        help=(
+            "Batch mode. Split every test file into its own subdirectory of this directory "
+            "and print a JSON summary instead of the names of the created files."
+        ),
+    )
+    parser.add_argument(
+        '--jobs',
+        dest='jobs',
+        type=int,
+        default=os.cpu_count(),
+        help="Number of test files split in parallel in batch mode. By default the number of CPUs.",
+    )
+    return parser
+
+
+if __name__ == '__main__':
+    sys.excepthook = uncaught_exception_hook
+    parser = commandline_parser()
+    options = parser.parse_args()
+
+    if options.output_dir is None:
+        if len(options.test_files) != 1:
+            parser.error("Only one test file can be split without --output-dir.")
+        splitSingle(options.test_files[0])
+    else:
+        print(json.dumps(splitAll(options.test_files, str(Path(options.output_dir).absolute()), options.jobs), indent=4))
@@ -1,55 +1,63 @@
-#!/usr/bin/env python2
+#!/usr/bin/env python3
+#
+# Extracts test cases from the given directory of a (possibly historic) solidity checkout into the
+# current working directory.
+#
+# By default the rules of the original version of this script are used (legacy_rules in
+# scripts/snippet_extraction.py). Unlike scripts/isolate_tests.py, raw strings are extracted from
+# all files that are not *.sol and compilationTests/ is not skipped. They are kept so that the set
+# of extracted test cases stays the same as in the original rebuild.
+#
+# With --current-rules the extraction is done exactly like in scripts/isolate_tests.py instead.
+#
+# Requires Python 3.7 or newer and the scripts/ directory two levels above this one (rebuild.sh
+# mounts all of it).
 
 import sys
-import re
 import os
-import hashlib
-from os.path import join, isfile
-
-
-def extract_test_cases(path):
-    lines = open(path, encoding="utf8", errors='ignore', mode='rb').read().splitlines()
-
-    inside = False
-    delimiter = ''
-    tests = []
-
-    for l in lines:
-      if inside:
-        if l.strip().endswith(')' + delimiter + '";'):
-          tests[-1] += l.strip()[:-(3 + len(delimiter))]
-          inside = False
-        else:
-          tests[-1] += l + '\n'
-      else:
-        m = re.search(r'R"([^(]*)\((.*)$', l.strip())
-        if m:
-          inside = True
-          delimiter = m.group(1)
-          tests += [m.group(2)]
-
-    return tests
-
-def extract_and_write(f, path):
-    if f.endswith('.sol'):
-        cases = [open(path, 'r').read()]
-    else:
-        cases = extract_test_cases(path)
-    write_cases(f, cases)
+from argparse import ArgumentParser
+from os.path import join
+from pathlib import Path
 
-def write_cases(f, tests):
-    cleaned_filename = f.replace(".","_").replace("-","_").replace(" ","_").lower()
-    for test in tests:
-        remainder = re.sub(r'^ {4}', '', test, 0, re.MULTILINE)
-        open('test_%s_%s.sol' % (hashlib.sha256(test).hexdigest(), cleaned_filename), 'w').write(remainder)
+if sys.version_info < (3, 7):
+    sys.exit("This script requires Python 3.7 or newer.")
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+# pragma pylint: disable=import-error,wrong-import-position
+from isolate_tests import extract_and_write_all, find_input_files, write_cases
+from snippet_extraction import iter_test_cases
+# pragma pylint: enable=import-error,wrong-import-position
 
-if __name__ == '__main__':
-    path = sys.argv[1]
 
+def extract_with_original_rules(path):
     for root, subdirs, files in os.walk(path):
         if '_build' in subdirs:
             subdirs.remove('_build')
         for f in files:
-            path = join(root, f)
-            extract_and_write(f, path)
+            write_cases(f, iter_test_cases(join(root, f), legacy_rules=True))
+
+
+def extract_with_current_rules(path):
+    extract_and_write_all(find_input_files(path), False, 1)
+
+
+def parse_command_line():
+    parser = ArgumentParser(description="Extracts test cases from a solidity checkout into the current working directory.")
+    parser.add_argument(dest='path', help="Directory to extract test cases from (e.g. test/ of the checkout).")
+    parser.add_argument(
+        '--current-rules',
+        dest='current_rules',
+        default=False,
+        action='store_true',
+        help="Use the extraction rules of scripts/isolate_tests.py instead of the original ones.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    options = parse_command_line()
+    if options.current_rules:
+        extract_with_current_rules(options.path)
+    else:
+        extract_with_original_rules(options.path)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+# Measures the cost of the step that prepare_report.py used to perform before every CLI compiler
+# run: reading the source and writing an exact copy of it into a temporary directory. Now the copy
+# is only made when --smt-use=strip-pragmas actually modifies the file.
+#
+# Usage: test/scripts/benchmark_bytecodecompare_cli_source_copy.py <dir with *.sol files> [--tmp-dir DIR] [--repeat N]
+
+import sys
+import timeit
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+# pragma pylint: disable=import-error,wrong-import-position
+from bytecodecompare.prepare_report import SMTUse, load_source
+# pragma pylint: enable=import-error,wrong-import-position
+
+
+def read_sources(source_paths):
+    for source_path in source_paths:
+        load_source(source_path, SMTUse.PRESERVE)
+
+
+def read_and_copy_sources(source_paths, tmp_dir: Path):
+    for source_path in source_paths:
+        compiler_input = load_source(source_path, SMTUse.PRESERVE)
+        with open(tmp_dir / source_path.name, 'w', encoding='utf8', newline='') as modified_source_file:
+            modified_source_file.write(compiler_input)
+
+
+def main():
+    parser = ArgumentParser(description="Benchmarks copying sources into a temporary directory before compilation.")
+    parser.add_argument(dest='source_dir', help="Directory containing *.sol files, e.g. output of isolate_tests.py.")
+    parser.add_argument(
+        '--tmp-dir',
+        dest='tmp_dir',
+        default=None,
+        help="Where to create the temporary directory. Use it to compare a tmpfs with a disk-backed location.",
+    )
+    parser.add_argument('--repeat', dest='repeat', default=5, type=int, help="Number of timed runs of each variant.")
+    options = parser.parse_args()
+
+    source_paths = sorted(Path(options.source_dir).glob('*.sol'))
+    if len(source_paths) == 0:
+        sys.exit(f"No *.sol files found in {options.source_dir}.")
+
+    with TemporaryDirectory(prefix='benchmark_bytecodecompare_cli_source_copy-', dir=options.tmp_dir) as tmp_dir:
+        print(f"Files: {len(source_paths)}")
+        for name, function in [
+            ("read", lambda: read_sources(source_paths)),
+            ("read + copy", lambda: read_and_copy_sources(source_paths, Path(tmp_dir))),
+        ]:
+            best_time = min(timeit.repeat(function, number=1, repeat=options.repeat))
+            print(f"{name:>12}: {best_time * 1000:.1f} ms ({best_time / len(source_paths) * 1000000:.1f} us per file)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Compares the performance of parse_cli_output() from prepare_report.py with the previous,
+# regex-based implementation. The input is built by concatenating CLI outputs from fixtures so
+# that it contains thousands of contracts.
+#
+# Usage: test/scripts/benchmark_bytecodecompare_parse_cli_output.py [--repeat N] [--scale N]
+
+import re
+import sys
+import timeit
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+from unittest_helpers import FIXTURE_DIR, load_fixture
+
+# pragma pylint: disable=import-error,wrong-import-position
+from bytecodecompare.prepare_report import CONTRACT_SEPARATOR_PATTERN, ContractReport, FileReport
+from bytecodecompare.prepare_report import clean_string, parse_cli_output
+# pragma pylint: enable=import-error,wrong-import-position
+
+
+BYTECODE_REGEX = re.compile(r'^ *Binary: *\n(?P<bytecode>.*[0-9a-f$_]+.*)$', re.MULTILINE)
+METADATA_REGEX = re.compile(r'^ *Metadata: *\n *(?P<metadata>\{.*\}) *$', re.MULTILINE)
+
+
+def parse_cli_output_with_regexes(source_file_name: Path, cli_output: str) -> FileReport:
+    # Reference implementation: the version of parse_cli_output() that splits the output into
+    # segments and then searches each segment for bytecode and metadata.
+    output_segments = re.split(CONTRACT_SEPARATOR_PATTERN, cli_output)
+    assert len(output_segments) % 3 == 1
+
+    if len(output_segments) == 1:
+        return FileReport(file_name=source_file_name, contract_reports=None)
+
+    file_report = FileReport(file_name=source_file_name, contract_reports=[])
+    for file_name, contract_name, contract_output in zip(output_segments[1::3], output_segments[2::3], output_segments[3::3]):
+        bytecode_match = re.search(BYTECODE_REGEX, contract_output)
+        metadata_match = re.search(METADATA_REGEX, contract_output)
+
+        assert file_report.contract_reports is not None
+        file_report.contract_reports.append(ContractReport(
+            contract_name=contract_name.strip(),
+            file_name=Path(file_name.strip()) if file_name is not None else None,
+            bytecode=clean_string(bytecode_match['bytecode'] if bytecode_match is not None else None),
+            metadata=clean_string(metadata_match['metadata'] if metadata_match is not None else None),
+        ))
+
+    return file_report
+
+
+def build_cli_output(scale: int) -> str:
+    fixture_outputs = [load_fixture(path.name) for path in sorted(FIXTURE_DIR.glob('*_cli_output.txt'))]
+    return ''.join(fixture_outputs) * scale
+
+
+def main():
+    parser = ArgumentParser(description="Benchmarks parse_cli_output() from prepare_report.py.")
+    parser.add_argument('--repeat', dest='repeat', default=5, type=int, help="Number of timed runs of each parser.")
+    parser.add_argument('--scale', dest='scale', default=500, type=int, help="Number of copies of the fixture outputs.")
+    options = parser.parse_args()
+
+    cli_output = build_cli_output(options.scale)
+    report = parse_cli_output(Path('file.sol'), cli_output)
+    assert report.contract_reports is not None
+    if report != parse_cli_output_with_regexes(Path('file.sol'), cli_output):
+        sys.exit("The parsers produced different reports.")
+
+    print(f"Input: {len(cli_output) / 1024 / 1024:.1f} MiB, {len(report.contract_reports)} contracts")
+    for name, parser_function in [
+        ("regex-based", parse_cli_output_with_regexes),
+        ("line-based", parse_cli_output),
+    ]:
+        best_time = min(timeit.repeat(lambda f=parser_function: f(Path('file.sol'), cli_output), number=1, repeat=options.repeat))
+        print(f"{name:>12}: {best_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Compares the performance of finding IDs outside of comments in error_codes.py using the
+# comment spans precomputed by find_comment_spans() with the previous implementation of
+# in_comment(), which searched backwards from every match to the start of the file.
+#
+# Usage: test/scripts/benchmark_error_codes_in_comment.py [--repeat N] [source files...]
+
+import re
+import sys
+import timeit
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+# pragma pylint: disable=import-error,wrong-import-position
+from error_codes import SOURCE_FILE_PATTERN, find_comment_spans, in_comment, read_file
+# pragma pylint: enable=import-error,wrong-import-position
+
+
+LIBSOLIDITY_DIR = Path(__file__).parent.parent.parent / 'libsolidity'
+
+
+def in_comment_rfind(source, pos):
+    # Reference implementation: the version of in_comment() from error_codes.py that did not
+    # recognize string literals.
+    slash_slash_pos = source.rfind("//", 0, pos)
+    lf_pos = source.rfind("\n", 0, pos)
+    if slash_slash_pos > lf_pos:
+        return True
+    slash_star_pos = source.rfind("/*", 0, pos)
+    star_slash_pos = source.rfind("*/", 0, pos)
+    return slash_star_pos > star_slash_pos
+
+
+def find_ids_rfind(source, matches):
+    return [m.group(0) for m in matches if not in_comment_rfind(source, m.start())]
+
+
+def find_ids_comment_spans(source, matches):
+    if len(matches) == 0:
+        return []
+
+    comment_spans = find_comment_spans(source)
+    return [m.group(0) for m in matches if not in_comment(comment_spans, m.start())]
+
+
+def main():
+    parser = ArgumentParser(description="Benchmarks comment detection in error_codes.py.")
+    parser.add_argument('--repeat', dest='repeat', default=5, type=int, help="Number of timed runs of each implementation.")
+    parser.add_argument(
+        dest='source_files',
+        nargs='*',
+        help="Files to search for IDs. By default all C++ files in libsolidity/.",
+    )
+    options = parser.parse_args()
+
+    source_files = options.source_files
+    if len(source_files) == 0:
+        source_files = sorted(LIBSOLIDITY_DIR.glob('**/*.cpp')) + sorted(LIBSOLIDITY_DIR.glob('**/*.h'))
+    if len(source_files) == 0:
+        sys.exit("No source files found.")
+
+    sources = [read_file(str(source_file)) for source_file in source_files]
+    # NOTE: Only the time spent on deciding whether matches are in comments is measured.
+    matches = [list(re.finditer(SOURCE_FILE_PATTERN, source)) for source in sources]
+
+    id_count = 0
+    for source_file, source, source_matches in zip(source_files, sources, matches):
+        ids = find_ids_comment_spans(source, source_matches)
+        # NOTE: The results may legitimately differ for files with comment markers inside string literals.
+        if ids != find_ids_rfind(source, source_matches):
+            print(f"The implementations found different IDs in {source_file}.")
+        id_count += len(ids)
+
+    print(f"Input: {len(source_files)} files, {sum(len(source) for source in sources) / 1024 / 1024:.1f} MiB, {id_count} IDs")
+    for name, function in [
+        ("rfind", find_ids_rfind),
+        ("comment spans", find_ids_comment_spans),
+    ]:
+        best_time = min(timeit.repeat(
+            lambda f=function: [f(source, source_matches) for source, source_matches in zip(sources, matches)],
+            number=1,
+            repeat=options.repeat,
+        ))
+        print(f"{name:>14}: {best_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
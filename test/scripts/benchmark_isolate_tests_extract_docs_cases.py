@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Compares the performance of iter_doc_cases() from snippet_extraction.py with the previous,
+# line-based implementation on the documentation in docs/.
+#
+# Usage: test/scripts/benchmark_isolate_tests_extract_docs_cases.py [--repeat N] [source files...]
+
+import re
+import sys
+import timeit
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+# pragma pylint: disable=import-error,wrong-import-position
+from snippet_extraction import iter_doc_cases
+# pragma pylint: enable=import-error,wrong-import-position
+
+
+DOCS_DIR = Path(__file__).parent.parent.parent / 'docs'
+
+
+def extract_docs_cases_line_by_line(path):
+    # Reference implementation: the version of extract_docs_cases() from isolate_tests.py that
+    # builds blocks by concatenating lines and then runs two regular expressions over each of them.
+    inside = False
+    extractedLines = []
+    tests = []
+
+    for l in open(path, mode='r', errors='ignore', encoding='utf8', newline='').read().splitlines():
+        if l != '':
+            if not inside and l.startswith(' '):
+                extractedLines += ['']
+            inside = l.startswith(' ')
+        if inside:
+            extractedLines[-1] += l + '\n'
+
+    codeStart = "(// SPDX-License-Identifier:|pragma solidity|contract.*{|library.*{|interface.*{)"
+
+    for lines in extractedLines:
+        if re.search(r'^\s{0,3}' + codeStart, lines, re.MULTILINE):
+            sys.exit(f"Intendation error in {path}.")
+        if re.search(r'^\s{4}' + codeStart, lines, re.MULTILINE):
+            tests.append(lines)
+
+    return tests
+
+
+def main():
+    parser = ArgumentParser(description="Benchmarks iter_doc_cases() from snippet_extraction.py.")
+    parser.add_argument('--repeat', dest='repeat', default=5, type=int, help="Number of timed runs of each implementation.")
+    parser.add_argument(
+        dest='source_files',
+        nargs='*',
+        help="Files to extract code blocks from. By default all RST files in docs/.",
+    )
+    options = parser.parse_args()
+
+    source_files = options.source_files if len(options.source_files) > 0 else sorted(DOCS_DIR.glob('**/*.rst'))
+    if len(source_files) == 0:
+        sys.exit("No source files found.")
+
+    test_count = 0
+    for source_file in source_files:
+        tests = list(iter_doc_cases(source_file))
+        if tests != extract_docs_cases_line_by_line(source_file):
+            sys.exit(f"The implementations extracted different code blocks from {source_file}.")
+        test_count += len(tests)
+
+    input_size = sum(Path(source_file).stat().st_size for source_file in source_files)
+    print(f"Input: {len(source_files)} files, {input_size / 1024 / 1024:.1f} MiB, {test_count} code blocks")
+    for name, function in [
+        ("line-based", extract_docs_cases_line_by_line),
+        ("scanner", lambda path: list(iter_doc_cases(path))),
+    ]:
+        best_time = min(timeit.repeat(
+            lambda f=function: [f(str(source_file)) for source_file in source_files],
+            number=1,
+            repeat=options.repeat,
+        ))
+        print(f"{name:>12}: {best_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
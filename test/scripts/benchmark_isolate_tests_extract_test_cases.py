@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# Compares the performance of iter_test_cases() from snippet_extraction.py with the previous,
+# line-based implementation on the C++ test suites in test/libsolidity/.
+#
+# Usage: test/scripts/benchmark_isolate_tests_extract_test_cases.py [--repeat N] [source files...]
+
+import re
+import sys
+import timeit
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+
+from unittest_helpers import LIBSOLIDITY_TEST_DIR
+
+# pragma pylint: disable=import-error,wrong-import-position
+from snippet_extraction import iter_test_cases
+# pragma pylint: enable=import-error,wrong-import-position
+
+
+def extract_test_cases_line_by_line(path):
+    # Reference implementation: the version of extract_test_cases() from isolate_tests.py that
+    # strips and searches every line and builds tests by repeated concatenation.
+    lines = open(path, encoding="utf8", errors='ignore', mode='r', newline='').read().splitlines()
+
+    inside = False
+    delimiter = ''
+    tests = []
+
+    for l in lines:
+        if inside:
+            if l.strip().endswith(')' + delimiter + '";'):
+                inside = False
+            else:
+                tests[-1] += l + '\n'
+        else:
+            m = re.search(r'R"([^(]*)\($', l.strip())
+            if m:
+                inside = True
+                delimiter = m.group(1)
+                tests += ['']
+
+    return tests
+
+
+def main():
+    parser = ArgumentParser(description="Benchmarks iter_test_cases() from snippet_extraction.py.")
+    parser.add_argument('--repeat', dest='repeat', default=5, type=int, help="Number of timed runs of each implementation.")
+    parser.add_argument(
+        dest='source_files',
+        nargs='*',
+        help="Files to extract test cases from. By default all C++ files in test/libsolidity/.",
+    )
+    options = parser.parse_args()
+
+    source_files = options.source_files if len(options.source_files) > 0 else sorted(LIBSOLIDITY_TEST_DIR.glob('*.cpp'))
+    if len(source_files) == 0:
+        sys.exit("No source files found.")
+
+    test_count = 0
+    for source_file in source_files:
+        tests = list(iter_test_cases(source_file))
+        if tests != extract_test_cases_line_by_line(source_file):
+            sys.exit(f"The implementations extracted different test cases from {source_file}.")
+        test_count += len(tests)
+
+    input_size = sum(Path(source_file).stat().st_size for source_file in source_files)
+    print(f"Input: {len(source_files)} files, {input_size / 1024 / 1024:.1f} MiB, {test_count} test cases")
+    for name, function in [
+        ("line-based", extract_test_cases_line_by_line),
+        ("scanner", lambda path: list(iter_test_cases(path))),
+    ]:
+        best_time = min(timeit.repeat(
+            lambda f=function: [f(source_file) for source_file in source_files],
+            number=1,
+            repeat=options.repeat,
+        ))
+        print(f"{name:>12}: {best_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
+# pragma pylint: disable=import-error
+from ASTImportTest import prepare_sources, remove_null_members
+# pragma pylint: enable=import-error
+
+
+class TestPrepareSources(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_ASTImportTest-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = Path(tmp_dir.name)
+
+    def test_should_use_test_file_as_the_only_source_if_it_has_no_source_markers(self):
+        test_file = self.tmp_dir / 'single.sol'
+        test_file.write_text("contract C {}\n", encoding='utf8')
+
+        self.assertEqual(prepare_sources(test_file), ({str(test_file): {'content': "contract C {}\n"}}, False))
+
+    def test_should_split_multi_source_tests(self):
+        test_file = self.tmp_dir / 'multi.sol'
+        test_file.write_text(
+            "==== Source: a ====\n"
+            "contract A {}\n"
+            "==== Source: dir/b ====\n"
+            "import \"a\";\n",
+            encoding='utf8',
+        )
+
+        self.assertEqual(
+            prepare_sources(test_file),
+            ({'a': {'content': "contract A {}\n"}, 'dir/b': {'content': "import \"a\";\n"}}, False),
+        )
+
+    def test_should_let_compiler_read_files_with_invalid_utf8(self):
+        test_file = self.tmp_dir / 'invalid_utf8.sol'
+        test_file.write_bytes(b"contract C { string s = \"\xff\"; }\n")
+
+        self.assertEqual(prepare_sources(test_file), ({str(test_file): {'urls': [str(test_file)]}}, True))
+
+
+class TestRemoveNullMembers(unittest.TestCase):
+    def test_should_remove_null_members_recursively(self):
+        ast = {
+            'id': 1,
+            'documentation': None,
+            'nodes': [{'id': 2, 'name': None, 'parameters': [None]}],
+        }
+
+        self.assertEqual(remove_null_members(ast), {'id': 1, 'nodes': [{'id': 2, 'parameters': [None]}]})
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+import json
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+# NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
+# pragma pylint: disable=import-error
+from bytecodecompare.benchmark_compiler import Regression, commandline_parser, find_regressions, main, summarize
+# pragma pylint: enable=import-error
+
+
+def make_results(total_median: float, file_medians: dict) -> dict:
+    return {
+        'corpus_version': '1',
+        'corpus_hash': 'abcd',
+        'interface': 'standard-json',
+        'metric': 'wall_time',
+        'repeat': 3,
+        'total': {'median': total_median, 'variance': 0.0},
+        'files': {
+            file_name: {
+                'unoptimized': {'median': unoptimized, 'variance': 0.0},
+                'optimized': {'median': optimized, 'variance': 0.0},
+            }
+            for file_name, (unoptimized, optimized) in file_medians.items()
+        },
+    }
+
+
+class TestBenchmarkCompiler(unittest.TestCase):
+    def test_summarize(self):
+        self.assertEqual(summarize([3.0, 1.0, 2.0]), {'median': 2.0, 'variance': 1.0})
+        self.assertEqual(summarize([3.0]), {'median': 3.0, 'variance': 0.0})
+
+    def test_find_regressions_should_accept_results_within_thresholds(self):
+        baseline = make_results(10.0, {'a.sol': (1.0, 2.0), 'b.sol': (3.0, 4.0)})
+        results = make_results(10.4, {'a.sol': (1.2, 1.5), 'b.sol': (3.0, 4.7)})
+
+        self.assertEqual(find_regressions(results, baseline, 0.05, 0.25, 0.05), [])
+
+    def test_find_regressions_should_report_total_and_file_regressions(self):
+        baseline = make_results(10.0, {'a.sol': (1.0, 2.0), 'b.sol': (0.01, 4.0)})
+        results = make_results(11.0, {'a.sol': (1.3, 2.0), 'b.sol': (0.03, 4.0)})
+
+        self.assertEqual(find_regressions(results, baseline, 0.05, 0.25, 0.05), [
+            Regression('<total>', 10.0, 11.0),
+            Regression('a.sol (unoptimized)', 1.0, 1.3),
+        ])
+
+    def test_find_regressions_should_refuse_to_compare_different_corpora(self):
+        baseline = make_results(10.0, {'a.sol': (1.0, 2.0)})
+        results = make_results(10.0, {'a.sol': (1.0, 2.0)})
+        results['corpus_hash'] = 'efgh'
+
+        with self.assertRaises(ValueError):
+            find_regressions(results, baseline, 0.05, 0.25, 0.05)
+
+    def test_regression_str(self):
+        self.assertEqual(str(Regression('a.sol (optimized)', 2.0, 3.0)), "a.sol (optimized): 2.0000 s -> 3.0000 s (+50.0%)")
+
+    def test_main_should_fail_with_a_message_on_incomparable_baseline(self):
+        with TemporaryDirectory(prefix='test_benchmark_compiler-') as tmp_dir:
+            baseline = make_results(10.0, {'a.sol': (1.0, 2.0)})
+            baseline['metric'] = 'cpu_time'
+            baseline_path = Path(tmp_dir) / 'baseline.json'
+            baseline_path.write_text(json.dumps(baseline), encoding='utf8')
+            options = commandline_parser().parse_args([
+                'solc',
+                '--baseline-file', str(baseline_path),
+                '--output-file', str(Path(tmp_dir) / 'benchmark.json'),
+            ])
+
+            results = make_results(10.0, {'a.sol': (1.0, 2.0)})
+
+            stderr = StringIO()
+            with patch('bytecodecompare.benchmark_compiler.find_source_files', return_value=['a.sol']), \
+                    patch('bytecodecompare.benchmark_compiler.run_benchmark', return_value=results), \
+                    redirect_stdout(StringIO()), \
+                    redirect_stderr(stderr):
+                self.assertEqual(main(options), 1)
+
+            self.assertIn("different metric", stderr.getvalue())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+
+# NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
+# pragma pylint: disable=import-error
+from bytecodecompare.compare_reports import compare_reports, iter_report_entries, strip_cbor_metadata
+# pragma pylint: enable=import-error
+
+
+# pragma pylint: disable=line-too-long
+# Bytecode followed by CBOR metadata: {"ipfs": <hash>, "solc": 0.8.0} and its length.
+BYTECODE_A = (
+    '6080604052600080fdfe'
+    'a2646970667358221220'
+    '7f9515e2263fa71a7984707e2aefd82241fac15c497386ca798b526f14f8ba66'
+    '64736f6c63430008000033'
+)
+BYTECODE_A_OTHER_HASH = (
+    '6080604052600080fdfe'
+    'a2646970667358221220'
+    '104c345633313efe410492448844d96d78452c3044ce126b5e041b7fbeaa7900'
+    '64736f6c63430008000033'
+)
+BYTECODE_B = (
+    '6080604052600180fdfe'
+    'a2646970667358221220'
+    '7f9515e2263fa71a7984707e2aefd82241fac15c497386ca798b526f14f8ba66'
+    '64736f6c63430008000033'
+)
+# pragma pylint: enable=line-too-long
+
+
+class TestCompareReports(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = 10000
+
+        tmp_dir = TemporaryDirectory(prefix='test_bytecodecompare_compare_reports-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_path = Path(tmp_dir.name)
+
+    def write_report(self, name: str, content: str) -> Path:
+        report_path = self.tmp_path / name
+        report_path.write_text(dedent(content), encoding='utf8')
+        return report_path
+
+    def test_strip_cbor_metadata(self):
+        self.assertEqual(strip_cbor_metadata(BYTECODE_A), '6080604052600080fdfe')
+        self.assertEqual(strip_cbor_metadata('6080604052600080fdfe'), '6080604052600080fdfe')
+        self.assertEqual(strip_cbor_metadata('<NO BYTECODE>'), '<NO BYTECODE>')
+        library_placeholder = '__$fb58009a6b1ecea3b9d99bedd645df4ec3$__'
+        self.assertEqual(strip_cbor_metadata(library_placeholder), library_placeholder)
+
+    def test_iter_report_entries_should_infer_optimize_setting(self):
+        report_path = self.write_report('report.txt', f"""\
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            a.sol:B <NO BYTECODE>
+            a.sol:B <NO METADATA>
+            b.sol: <ERROR>
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            a.sol:B <NO BYTECODE>
+            a.sol:B <NO METADATA>
+            b.sol: <ERROR>
+        """)
+
+        self.assertEqual(
+            [(entry.optimize, entry.file_name, entry.contract_name) for entry in iter_report_entries(report_path)],
+            [
+                (False, 'a.sol', 'A'),
+                (False, 'a.sol', 'B'),
+                (False, 'b.sol', None),
+                (True, 'a.sol', 'A'),
+                (True, 'a.sol', 'B'),
+                (True, 'b.sol', None),
+            ]
+        )
+
+    def test_iter_report_entries_should_handle_single_file_reports(self):
+        report_path = self.write_report('report.txt', """\
+            a.sol: <ERROR>
+            a.sol:A <NO BYTECODE>
+            a.sol:A <NO METADATA>
+        """)
+
+        self.assertEqual(
+            [(entry.optimize, entry.file_name, entry.contract_name) for entry in iter_report_entries(report_path)],
+            [(False, 'a.sol', None), (True, 'a.sol', 'A')]
+        )
+
+    def test_compare_reports_should_find_no_differences_in_identical_reports(self):
+        report = f"""\
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            a.sol:A {BYTECODE_B}
+            a.sol:A {{}}
+        """
+
+        result = compare_reports(self.write_report('1.txt', report), self.write_report('2.txt', report))
+
+        self.assertTrue(result.identical())
+        self.assertEqual(result.format_summary('1.txt', '2.txt'), '')
+
+    def test_compare_reports_should_classify_differences(self):
+        first_report_path = self.write_report('1.txt', f"""\
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            b.sol:B {BYTECODE_A}
+            b.sol:B {{"x":1}}
+            c.sol:C {BYTECODE_A}
+            c.sol:C {{}}
+            d.sol: <ERROR>
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            b.sol:B {BYTECODE_A}
+            b.sol:B {{}}
+            c.sol:C {BYTECODE_A}
+            c.sol:C {{}}
+            d.sol: <ERROR>
+        """)
+        second_report_path = self.write_report('2.txt', f"""\
+            a.sol:A {BYTECODE_A_OTHER_HASH}
+            a.sol:A {{}}
+            b.sol:B {BYTECODE_A_OTHER_HASH}
+            b.sol:B {{"x":2}}
+            c.sol:C {BYTECODE_B}
+            c.sol:C {{}}
+            d.sol:D <NO BYTECODE>
+            d.sol:D <NO METADATA>
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            b.sol:B {BYTECODE_A}
+            b.sol:B {{}}
+            c.sol:C {BYTECODE_A}
+            c.sol:C {{}}
+            d.sol: <ERROR>
+        """)
+
+        result = compare_reports(first_report_path, second_report_path)
+
+        self.assertFalse(result.identical())
+        self.assertEqual(
+            result.format_summary('1.txt', '2.txt'),
+            dedent("""\
+                Bytecode differences (1):
+                    c.sol:C (optimize=False)
+                Metadata differences (1):
+                    b.sol:B (optimize=False)
+                Only in 1.txt (1):
+                    d.sol:<ERROR> (optimize=False)
+                Only in 2.txt (1):
+                    d.sol:D (optimize=False)
+                Ignored 2 bytecode differences confined to the CBOR metadata at the end of the bytecode.
+            """)
+        )
+
+    def test_compare_reports_should_not_depend_on_file_order(self):
+        first_report_path = self.write_report('1.txt', f"""\
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            b.sol:B {BYTECODE_A}
+            b.sol:B {{}}
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            b.sol:B {BYTECODE_A}
+            b.sol:B {{}}
+        """)
+        second_report_path = self.write_report('2.txt', f"""\
+            b.sol:B {BYTECODE_A}
+            b.sol:B {{}}
+            a.sol:A {BYTECODE_A}
+            a.sol:A {{}}
+            b.sol:B {BYTECODE_A}
+            b.sol:B {{}}
+            a.sol:A {BYTECODE_B}
+            a.sol:A {{}}
+        """)
+
+        result = compare_reports(first_report_path, second_report_path)
+
+        self.assertEqual([entry.key for entry in result.bytecode_differences], [(True, 'a.sol', 'A')])
+        self.assertEqual(result.metadata_differences, [])
+        self.assertEqual(result.only_in_first, [])
+        self.assertEqual(result.only_in_second, [])
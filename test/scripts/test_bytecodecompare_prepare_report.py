@@ -1,19 +1,33 @@
 #!/usr/bin/env python
 
 import json
+import os
+import subprocess
+import sys
+import time
 import unittest
+from io import StringIO
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from textwrap import dedent
+from unittest.mock import patch
 
 from unittest_helpers import FIXTURE_DIR, LIBSOLIDITY_TEST_DIR, load_fixture, load_libsolidity_test_case
 
 # NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
 # pragma pylint: disable=import-error
-from bytecodecompare.prepare_report import CompilerInterface, FileReport, ContractReport, SMTUse, Statistics
-from bytecodecompare.prepare_report import load_source, parse_cli_output, parse_standard_json_output, prepare_compiler_input
+from bytecodecompare.prepare_report import CompilationCache, CompilerInterface, CompilerProfile, CompilerRunProfile
+from bytecodecompare.prepare_report import CompilerServer, CompilerServerPool
+from bytecodecompare.prepare_report import FileReport, ContractReport, ReportJournal, SMTUse, Statistics
+from bytecodecompare.prepare_report import collect_streamed_sources, find_failed_source_units, generate_report, load_source
+from bytecodecompare.prepare_report import parse_cli_output, read_ndjson_sources
+from bytecodecompare.prepare_report import parse_standard_json_batch_output, parse_standard_json_output, prepare_compiler_input
+from bytecodecompare.prepare_report import run_compiler_batch, run_compiler_process
 # pragma pylint: enable=import-error
 
 
+CLI_COMPILER_SERVER_PATH = Path(__file__).parent.parent.parent / 'scripts/bytecodecompare/cli_compiler_server.py'
+
 SMT_SMOKE_TEST_SOL_PATH = LIBSOLIDITY_TEST_DIR / 'smtCheckerTests/simple/smoke_test.sol'
 SMT_SMOKE_TEST_SOL_CODE = load_libsolidity_test_case(SMT_SMOKE_TEST_SOL_PATH)
 
@@ -151,6 +165,345 @@ class TestPrepareReport_Statistics(unittest.TestCase):
         self.assertEqual(statistics, Statistics(2, 4, 1, 2, 2))
         self.assertEqual(str(statistics), "test cases: 2, contracts: 4+, errors: 1, missing bytecode: 2, missing metadata: 2")
 
+    def test_str_with_cache_statistics(self):
+        statistics = Statistics(file_count=3, contract_count=3, cache_hit_count=2, cache_miss_count=1)
+
+        self.assertEqual(
+            str(statistics),
+            "test cases: 3, contracts: 3, errors: 0, missing bytecode: 0, missing metadata: 0, cache hits: 2, cache misses: 1"
+        )
+
+    def test_str_with_compiler_server_statistics(self):
+        statistics = Statistics(
+            file_count=10,
+            contract_count=10,
+            compiler_server_start_count=2,
+            compiler_server_start_up_time=0.5,
+            compiler_server_request_count=10,
+            compiler_server_request_time=1.5,
+        )
+
+        self.assertEqual(
+            str(statistics),
+            "test cases: 10, contracts: 10, errors: 0, missing bytecode: 0, missing metadata: 0\n"
+            "compiler server requests: 10, start-ups: 2, average start-up time: 0.250 s, average request time: 0.150 s"
+        )
+
+
+class TestCompilationCache(PrepareReportTestBase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_path = Path(tmp_dir.name)
+
+        self.compiler_path = self.tmp_path / 'solc'
+        self.compiler_path.write_bytes(b'compiler binary')
+        self.cache = CompilationCache(self.tmp_path / 'cache', self.compiler_path, max_size=1024 * 1024)
+
+    def key(self, source_file_name: Path, optimize: bool = False) -> str:
+        return self.cache.key(source_file_name, optimize, False, CompilerInterface.STANDARD_JSON, SMTUse.DISABLE, True)
+
+    def test_load_should_return_stored_report(self):
+        report = FileReport(
+            file_name=SMT_SMOKE_TEST_SOL_PATH,
+            contract_reports=[
+                ContractReport(contract_name='C', file_name=Path('smoke_test.sol'), bytecode='6080', metadata='{}'),
+                ContractReport(contract_name='D', file_name=None, bytecode=None, metadata=None),
+            ],
+        )
+
+        self.assertIsNone(self.cache.load(SMT_SMOKE_TEST_SOL_PATH, self.key(SMT_SMOKE_TEST_SOL_PATH)))
+        self.cache.store(self.key(SMT_SMOKE_TEST_SOL_PATH), report)
+        self.assertEqual(self.cache.load(SMT_SMOKE_TEST_SOL_PATH, self.key(SMT_SMOKE_TEST_SOL_PATH)), report)
+
+    def test_load_should_return_stored_error_report(self):
+        report = FileReport(file_name=SMT_SMOKE_TEST_SOL_PATH, contract_reports=None)
+
+        self.cache.store(self.key(SMT_SMOKE_TEST_SOL_PATH), report)
+        self.assertEqual(self.cache.load(SMT_SMOKE_TEST_SOL_PATH, self.key(SMT_SMOKE_TEST_SOL_PATH)), report)
+
+    def test_load_should_treat_malformed_entries_as_misses(self):
+        key = self.key(SMT_SMOKE_TEST_SOL_PATH)
+        self.cache.entry_path(key).parent.mkdir(parents=True)
+
+        for content in ['{', '[]', '{}', '{"contract_reports": [{}]}', '{"contract_reports": [1]}']:
+            self.cache.entry_path(key).write_text(content, encoding='utf8')
+            self.assertIsNone(self.cache.load(SMT_SMOKE_TEST_SOL_PATH, key))
+
+    def test_key_should_depend_on_compiler_source_and_settings(self):
+        keys = {
+            self.key(SMT_SMOKE_TEST_SOL_PATH),
+            self.key(SMT_SMOKE_TEST_SOL_PATH, optimize=True),
+            self.key(SYNTAX_SMOKE_TEST_SOL_PATH),
+            self.cache.key(SMT_SMOKE_TEST_SOL_PATH, False, False, CompilerInterface.CLI, SMTUse.DISABLE, True),
+            self.cache.key(SMT_SMOKE_TEST_SOL_PATH, False, False, CompilerInterface.STANDARD_JSON, SMTUse.STRIP_PRAGMAS, True),
+        }
+        self.compiler_path.write_bytes(b'another compiler binary')
+        keys.add(CompilationCache(self.tmp_path / 'cache', self.compiler_path, 0).key(
+            SMT_SMOKE_TEST_SOL_PATH, False, False, CompilerInterface.STANDARD_JSON, SMTUse.DISABLE, True
+        ))
+
+        self.assertEqual(len(keys), 6)
+        self.assertEqual(self.key(SMT_SMOKE_TEST_SOL_PATH), self.key(SMT_SMOKE_TEST_SOL_PATH))
+
+    def test_evict_should_remove_least_recently_used_entries(self):
+        report = FileReport(file_name=Path('file.sol'), contract_reports=None)
+        for i in range(3):
+            self.cache.store(str(i) * 64, report)
+            os.utime(self.cache.entry_path(str(i) * 64), (1000 + i, 1000 + i))
+        entry_size = self.cache.entry_path('0' * 64).stat().st_size
+
+        # Loading an entry makes it the most recently used one
+        self.assertIsNotNone(self.cache.load(Path('file.sol'), '0' * 64))
+        self.cache.max_size = 2 * entry_size
+        self.cache.evict()
+
+        self.assertIsNotNone(self.cache.load(Path('file.sol'), '0' * 64))
+        self.assertIsNone(self.cache.load(Path('file.sol'), '1' * 64))
+        self.assertIsNotNone(self.cache.load(Path('file.sol'), '2' * 64))
+
+
+class TestReportJournal(PrepareReportTestBase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.journal_path = Path(tmp_dir.name) / 'report.txt.journal'
+
+    def test_resume_should_drop_incomplete_last_line(self):
+        report_a = FileReport(file_name=Path('a.sol'), contract_reports=None)
+        report_b = FileReport(file_name=Path('b.sol'), contract_reports=[])
+
+        journal = ReportJournal(self.journal_path, {}, resume=False)
+        journal.record(False, report_a)
+        journal.close()
+        with open(self.journal_path, 'a', encoding='utf8') as journal_file:
+            journal_file.write('{"settings": {}, "optim')
+
+        journal = ReportJournal(self.journal_path, {}, resume=True)
+        journal.record(False, report_b)
+        journal.close()
+
+        journal = ReportJournal(self.journal_path, {}, resume=True)
+        journal.close()
+        self.assertEqual(journal.completed_report(False, Path('a.sol')), report_a)
+        self.assertEqual(journal.completed_report(False, Path('b.sol')), report_b)
+
+    def test_resume_should_skip_lines_that_are_not_valid_records(self):
+        report_a = FileReport(file_name=Path('a.sol'), contract_reports=[])
+
+        with open(self.journal_path, 'w', encoding='utf8') as journal_file:
+            journal_file.write('{"settings": {}, "optimize": false}\n')
+            journal_file.write('[1, 2]\n')
+            journal_file.write('{"settings": {}, "optimize": false, "file_name": "b.sol", "contract_reports": [{}]}\n')
+            journal_file.write('{"settings": {}, "optimize": false, "file_name": "a.sol", "contract_reports": []}\n')
+
+        journal = ReportJournal(self.journal_path, {}, resume=True)
+        journal.close()
+        self.assertEqual(journal.completed_reports, {(False, 'a.sol'): report_a})
+
+
+class TestCompilerServer(PrepareReportTestBase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-')
+        self.addCleanup(tmp_dir.cleanup)
+
+        # Fake compiler echoing the names of the sources it got and failing if there are none.
+        fake_compiler_path = Path(tmp_dir.name) / 'fake_solc.py'
+        fake_compiler_path.write_text(dedent("""\
+            import json
+            import sys
+
+            assert sys.argv[1:] == ['--standard-json']
+            sources = json.load(sys.stdin)['sources']
+            print(json.dumps({'sources': sorted(sources)}))
+            sys.exit(0 if len(sources) > 0 else 1)
+        """), encoding='utf8')
+
+        self.server_command = [sys.executable, str(CLI_COMPILER_SERVER_PATH), sys.executable, str(fake_compiler_path)]
+
+    def test_compile(self):
+        server = CompilerServer(self.server_command)
+        try:
+            first_output = server.compile(json.dumps({'sources': {'a.sol': {}}}), exit_on_error=False)
+            second_output = server.compile(json.dumps({'sources': {'b.sol': {}, 'c.sol': {}}}), exit_on_error=False)
+            third_output = server.compile(json.dumps({'sources': {}}), exit_on_error=False)
+        finally:
+            server.close()
+
+        self.assertEqual(json.loads(first_output), {'sources': ['a.sol']})
+        self.assertEqual(json.loads(second_output), {'sources': ['b.sol', 'c.sol']})
+        self.assertEqual(json.loads(third_output), {'sources': []})
+        self.assertEqual(server.request_count, 3)
+        self.assertGreater(server.start_up_time, 0)
+        self.assertGreater(server.request_time, 0)
+
+    def test_compile_should_raise_on_compiler_error_if_requested(self):
+        server = CompilerServer(self.server_command)
+        try:
+            with self.assertRaises(subprocess.CalledProcessError) as context:
+                server.compile(json.dumps({'sources': {}}), exit_on_error=True)
+        finally:
+            server.close()
+
+        self.assertEqual(context.exception.returncode, 1)
+        self.assertEqual(json.loads(context.exception.output), {'sources': []})
+
+    def test_pool_should_reuse_servers(self):
+        pool = CompilerServerPool(self.server_command)
+        try:
+            for source_name in ['a.sol', 'b.sol', 'c.sol']:
+                output = pool.compile(json.dumps({'sources': {source_name: {}}}), exit_on_error=False)
+                self.assertEqual(json.loads(output), {'sources': [source_name]})
+        finally:
+            pool.close()
+
+        statistics = Statistics()
+        pool.aggregate_statistics(statistics)
+        self.assertEqual(statistics.compiler_server_start_count, 1)
+        self.assertEqual(statistics.compiler_server_request_count, 3)
+
+
+class TestCompilerProfile(PrepareReportTestBase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_path = Path(tmp_dir.name)
+
+        self.profile = CompilerProfile()
+        self.profile.record(CompilerRunProfile(('a.sol',), False, wall_time=1.0, cpu_time=0.5, peak_rss=2048))
+        self.profile.record(CompilerRunProfile(('b.sol', 'c.sol'), True, wall_time=3.0, cpu_time=None, peak_rss=None))
+        self.profile.record(CompilerRunProfile(('a.sol',), True, wall_time=2.0, cpu_time=1.5, peak_rss=1024))
+
+    def test_aggregate_statistics(self):
+        statistics = Statistics()
+        self.profile.aggregate_statistics(statistics)
+
+        self.assertEqual(statistics.compiler_run_count, 3)
+        self.assertEqual(statistics.compiler_wall_time, 6.0)
+        self.assertEqual(statistics.compiler_cpu_time, 2.0)
+        self.assertEqual(statistics.compiler_peak_rss, 2048)
+
+    def test_aggregate_statistics_without_resource_usage(self):
+        profile = CompilerProfile()
+        profile.record(CompilerRunProfile(('a.sol',), False, wall_time=1.0, cpu_time=None, peak_rss=None))
+        statistics = Statistics(file_count=1, contract_count=1)
+        profile.aggregate_statistics(statistics)
+
+        self.assertIsNone(statistics.compiler_cpu_time)
+        self.assertIsNone(statistics.compiler_peak_rss)
+        self.assertEqual(
+            str(statistics),
+            "test cases: 1, contracts: 1, errors: 0, missing bytecode: 0, missing metadata: 0\n"
+            "compiler runs: 1, wall time: 1.0 s, CPU time: n/a, peak RSS: n/a"
+        )
+
+    def test_write_json(self):
+        self.profile.write(self.tmp_path / 'timings.json', top_count=2)
+
+        with open(self.tmp_path / 'timings.json', encoding='utf8') as timings_file:
+            self.assertEqual(json.load(timings_file), {
+                'total': {'run_count': 3, 'wall_time': 6.0, 'cpu_time': 2.0, 'peak_rss': 2048},
+                'slowest_runs': [
+                    {'file_names': ['b.sol', 'c.sol'], 'optimize': True, 'wall_time': 3.0, 'cpu_time': None, 'peak_rss': None},
+                    {'file_names': ['a.sol'], 'optimize': True, 'wall_time': 2.0, 'cpu_time': 1.5, 'peak_rss': 1024},
+                ],
+            })
+
+    def test_write_csv(self):
+        self.profile.write(self.tmp_path / 'timings.csv', top_count=5)
+
+        self.assertEqual(
+            (self.tmp_path / 'timings.csv').read_text(encoding='utf8').splitlines(),
+            [
+                'file_names,optimize,wall_time,cpu_time,peak_rss',
+                'b.sol c.sol,True,3.0,,',
+                'a.sol,True,2.0,1.5,1024',
+                'a.sol,False,1.0,0.5,2048',
+            ]
+        )
+
+    def test_run_compiler_process_should_record_resource_usage(self):
+        profile = CompilerProfile()
+        process = run_compiler_process(
+            [sys.executable, '-c', 'import sys; print(sys.stdin.read().upper())'],
+            'contract C {}',
+            None,
+            True,
+            [Path('c.sol')],
+            True,
+            profile,
+        )
+
+        self.assertEqual(process.returncode, 0)
+        self.assertEqual(process.stdout.strip(), 'CONTRACT C {}')
+        self.assertEqual(len(profile.runs), 1)
+        self.assertEqual(profile.runs[0].file_names, ('c.sol',))
+        self.assertTrue(profile.runs[0].optimize)
+        self.assertGreater(profile.runs[0].wall_time, 0)
+        if hasattr(os, 'wait4'):
+            self.assertGreater(profile.runs[0].cpu_time, 0)
+            self.assertGreater(profile.runs[0].peak_rss, 0)
+
+    def test_run_compiler_process_should_not_block_on_large_input_and_output(self):
+        process = run_compiler_process(
+            [sys.executable, '-c', 'import sys; data = sys.stdin.read(); sys.stderr.write(data); print(len(data))'],
+            'x' * 1024 * 1024,
+            None,
+            True,
+            [Path('c.sol')],
+            True,
+            None,
+        )
+
+        self.assertEqual(process.stdout.strip(), str(1024 * 1024))
+        self.assertEqual(process.stderr, 'x' * 1024 * 1024)
+
+    def test_run_compiler_process_should_report_process_killed_by_signal(self):
+        if sys.platform == 'win32':
+            self.skipTest("Signals are not available on Windows.")
+
+        process = run_compiler_process(
+            [sys.executable, '-c', 'import os, signal; os.kill(os.getpid(), signal.SIGKILL)'],
+            None,
+            None,
+            False,
+            [Path('c.sol')],
+            True,
+            None,
+        )
+
+        self.assertEqual(process.returncode, -9)
+
+    def test_run_compiler_process_should_work_without_wait4(self):
+        if hasattr(os, 'wait4'):
+            wait4 = os.wait4
+            del os.wait4
+            self.addCleanup(setattr, os, 'wait4', wait4)
+
+        profile = CompilerProfile()
+        process = run_compiler_process(
+            [sys.executable, '-c', 'import sys; print(sys.stdin.read()); exit(2)'],
+            'contract C {}',
+            None,
+            False,
+            [Path('c.sol')],
+            True,
+            profile,
+        )
+
+        self.assertEqual(process.returncode, 2)
+        self.assertEqual(process.stdout.strip(), 'contract C {}')
+        self.assertIsNone(profile.runs[0].cpu_time)
+        self.assertIsNone(profile.runs[0].peak_rss)
+
+    def test_run_compiler_process_should_raise_on_error_if_requested(self):
+        with self.assertRaises(subprocess.CalledProcessError):
+            run_compiler_process([sys.executable, '-c', 'exit(1)'], None, None, True, [Path('c.sol')], True, None)
+
 
 class TestLoadSource(PrepareReportTestBase):
     def test_load_source_should_strip_smt_pragmas_if_requested(self):
@@ -430,6 +783,68 @@ class TestParseStandardJSONOutput(PrepareReportTestBase):
         self.assertEqual(parse_standard_json_output(Path('file.sol'), CODE_GENERATION_ERROR_JSON_OUTPUT), expected_report)
 
 
+class TestParseStandardJSONBatchOutput(PrepareReportTestBase):
+    def test_parse_standard_json_batch_output(self):
+        compiler_output = dedent("""\
+            {
+                "contracts": {
+                    "a.sol": {
+                        "A": {"evm": {"bytecode": {"object": "6001"}}, "metadata": "{}"}
+                    },
+                    "b.sol": {},
+                    "c.sol": {
+                        "C": {"evm": {"bytecode": {"object": "6003"}}, "metadata": "{}"},
+                        "D": {"evm": {"bytecode": {"object": "6004"}}}
+                    }
+                },
+                "errors": [
+                    {"severity": "warning", "type": "Warning", "sourceLocation": {"file": "a.sol", "start": -1, "end": -1}}
+                ]
+            }
+        """)
+
+        expected_reports = [
+            FileReport(
+                file_name=Path('dir/a.sol'),
+                contract_reports=[ContractReport(contract_name='A', file_name=Path('a.sol'), bytecode='6001', metadata='{}')],
+            ),
+            FileReport(file_name=Path('dir/b.sol'), contract_reports=None),
+            FileReport(
+                file_name=Path('dir/c.sol'),
+                contract_reports=[
+                    ContractReport(contract_name='C', file_name=Path('c.sol'), bytecode='6003', metadata='{}'),
+                    ContractReport(contract_name='D', file_name=Path('c.sol'), bytecode='6004', metadata=None),
+                ],
+            ),
+            FileReport(file_name=Path('dir/d.sol'), contract_reports=None),
+        ]
+
+        source_file_names = [Path('dir/a.sol'), Path('dir/b.sol'), Path('dir/c.sol'), Path('dir/d.sol')]
+        self.assertEqual(parse_standard_json_batch_output(source_file_names, compiler_output), expected_reports)
+
+    def test_parse_standard_json_batch_output_should_not_report_anything_on_compiler_errors(self):
+        self.assertIsNone(parse_standard_json_batch_output([Path('file.sol')], UNKNOWN_PRAGMA_SOL_JSON_OUTPUT))
+
+    def test_parse_standard_json_batch_output_should_not_report_anything_on_internal_compiler_errors(self):
+        self.assertIsNone(parse_standard_json_batch_output([Path('file.sol')], UNIMPLEMENTED_FEATURE_JSON_OUTPUT))
+
+    def test_find_failed_source_units(self):
+        compiler_output = dedent("""\
+            {
+                "errors": [
+                    {"severity": "error", "type": "ParserError", "sourceLocation": {"file": "a.sol", "start": 1, "end": 2}},
+                    {"severity": "warning", "type": "Warning", "sourceLocation": {"file": "b.sol", "start": 1, "end": 2}},
+                    {"severity": "error", "type": "TypeError", "sourceLocation": {"file": "c.sol", "start": 1, "end": 2}}
+                ]
+            }
+        """)
+
+        self.assertEqual(find_failed_source_units(compiler_output), {'a.sol', 'c.sol'})
+
+    def test_find_failed_source_units_should_return_none_if_error_has_no_location(self):
+        self.assertIsNone(find_failed_source_units(UNIMPLEMENTED_FEATURE_JSON_OUTPUT))
+
+
 class TestParseCLIOutput(PrepareReportTestBase):
     def test_parse_standard_json_output_should_report_missing_if_value_is_just_whitespace(self):
         compiler_output = dedent("""\
@@ -641,6 +1056,28 @@ class TestParseCLIOutput(PrepareReportTestBase):
 
         self.assertEqual(parse_cli_output(Path('contract.sol'), compiler_output), expected_report)
 
+    def test_parse_cli_output_should_not_take_values_from_next_contract(self):
+        compiler_output = dedent("""\
+            ======= contract.sol:C =======
+            Binary:
+            ======= contract.sol:D =======
+            Metadata:
+            ======= contract.sol:E =======
+            Binary:
+            6080
+        """)
+
+        expected_report = FileReport(
+            file_name=Path('contract.sol'),
+            contract_reports=[
+                ContractReport(contract_name='C', file_name=Path('contract.sol'), bytecode=None, metadata=None),
+                ContractReport(contract_name='D', file_name=Path('contract.sol'), bytecode=None, metadata=None),
+                ContractReport(contract_name='E', file_name=Path('contract.sol'), bytecode='6080', metadata=None),
+            ]
+        )
+
+        self.assertEqual(parse_cli_output(Path('contract.sol'), compiler_output), expected_report)
+
     def test_parse_cli_output_should_handle_link_references_in_bytecode(self):
         compiler_output = dedent("""\
             ======= contract.sol:C =======
@@ -662,3 +1099,367 @@ class TestParseCLIOutput(PrepareReportTestBase):
         # pragma pylint: enable=line-too-long
 
         self.assertEqual(parse_cli_output(Path('contract.sol'), compiler_output), expected_report)
+
+
+def fake_run_compiler(compiler_path, source_file_name, optimize, *_args, **_kwargs):  # pylint: disable=unused-argument
+    # Files that come first in the sorted order take the longest so that with multiple jobs they
+    # finish last.
+    time.sleep(0.01 * (4 - int(source_file_name.stem[-1])))
+    return FileReport(
+        file_name=source_file_name,
+        contract_reports=[ContractReport(
+            contract_name='C',
+            file_name=source_file_name,
+            bytecode=('6080' if optimize else '6060') + source_file_name.stem,
+            metadata='{}',
+        )],
+    )
+
+
+class TestSourceStream(PrepareReportTestBase):
+    def test_read_ndjson_sources(self):
+        stream = StringIO(
+            '{"name": "a.sol", "content": "contract A {}\\n"}\n'
+            '\n'
+            '{"name": "b.sol", "content": ""}\n'
+        )
+
+        self.assertEqual(list(read_ndjson_sources(stream)), [('a.sol', 'contract A {}\n'), ('b.sol', '')])
+
+    def test_read_ndjson_sources_should_report_line_number_of_invalid_input(self):
+        stream = StringIO('{"name": "a.sol", "content": ""}\n{"name": "b.sol"}\n')
+
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            list(read_ndjson_sources(stream))
+
+    def test_collect_streamed_sources_should_skip_duplicates(self):
+        source_contents = {}
+        source_stream = [('b.sol', 'contract B {}'), ('a.sol', 'contract A {}'), ('b.sol', 'contract B {}')]
+
+        self.assertEqual(list(collect_streamed_sources(source_stream, source_contents)), [Path('b.sol'), Path('a.sol')])
+        self.assertEqual(source_contents, {'a.sol': 'contract A {}', 'b.sol': 'contract B {}'})
+
+    def test_collect_streamed_sources_should_reject_duplicates_with_different_content(self):
+        source_stream = [('a.sol', 'contract A {}'), ('a.sol', 'contract B {}')]
+
+        with self.assertRaisesRegex(ValueError, "different content"):
+            list(collect_streamed_sources(source_stream, {}))
+
+    def test_collect_streamed_sources_should_reject_paths(self):
+        with self.assertRaisesRegex(ValueError, "plain file name"):
+            list(collect_streamed_sources([('dir/a.sol', 'contract A {}')], {}))
+
+    def test_prepare_compiler_input_should_use_streamed_content(self):
+        (command_line, compiler_input) = prepare_compiler_input(
+            Path('solc'),
+            Path('a.sol'),
+            optimize=False,
+            force_no_optimize_yul=False,
+            interface=CompilerInterface.STANDARD_JSON,
+            smt_use=SMTUse.DISABLE,
+            metadata_option_supported=True,
+            source_contents={'a.sol': 'contract A {}'},
+        )
+
+        self.assertEqual(command_line, ['solc', '--standard-json'])
+        self.assertEqual(json.loads(compiler_input)['sources'], {'a.sol': {'content': 'contract A {}'}})
+
+
+@patch('bytecodecompare.prepare_report.detect_metadata_cli_option_support', lambda compiler_path: True)
+@patch('bytecodecompare.prepare_report.run_compiler', fake_run_compiler)
+class TestGenerateReport(PrepareReportTestBase):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-')
+        self.addCleanup(self.tmp_dir.cleanup)
+
+        self.compiler_path = Path(self.tmp_dir.name) / 'solc'
+        self.compiler_path.write_bytes(b'compiler binary')
+
+    def generate(self, source_file_names=('file3.sol', 'file1.sol', 'file2.sol', 'file0.sol'), **kwargs) -> str:
+        report_file_path = Path(self.tmp_dir.name) / 'report.txt'
+        generate_report(
+            list(source_file_names),
+            self.compiler_path,
+            CompilerInterface.STANDARD_JSON,
+            SMTUse.DISABLE,
+            force_no_optimize_yul=False,
+            report_file_path=report_file_path,
+            verbose=False,
+            exit_on_error=False,
+            **kwargs,
+        )
+        return report_file_path.read_text(encoding='utf8')
+
+    def test_generate_report(self):
+        expected_report = (
+            "file0.sol:C 6060file0\n"
+            "file0.sol:C {}\n"
+            "file1.sol:C 6060file1\n"
+            "file1.sol:C {}\n"
+            "file2.sol:C 6060file2\n"
+            "file2.sol:C {}\n"
+            "file3.sol:C 6060file3\n"
+            "file3.sol:C {}\n"
+            "file0.sol:C 6080file0\n"
+            "file0.sol:C {}\n"
+            "file1.sol:C 6080file1\n"
+            "file1.sol:C {}\n"
+            "file2.sol:C 6080file2\n"
+            "file2.sol:C {}\n"
+            "file3.sol:C 6080file3\n"
+            "file3.sol:C {}\n"
+        )
+
+        self.assertEqual(self.generate(), expected_report)
+
+    def test_generate_report_should_not_depend_on_the_number_of_jobs(self):
+        self.assertEqual(self.generate(jobs=4), self.generate(jobs=1))
+
+    def test_generate_report_should_accept_streamed_sources(self):
+        compiled_sources = []
+
+        def recording_run_compiler(compiler_path, source_file_name, optimize, *args):
+            source_contents = args[-1]
+            compiled_sources.append((source_file_name.name, source_contents[source_file_name.name]))
+            return fake_run_compiler(compiler_path, source_file_name, optimize, *args)
+
+        source_stream = [
+            ('file3.sol', 'contract C3 {}'),
+            ('file1.sol', 'contract C1 {}'),
+            ('file3.sol', 'contract C3 {}'),
+            ('file2.sol', 'contract C2 {}'),
+            ('file0.sol', 'contract C0 {}'),
+        ]
+        expected_report = self.generate()
+
+        with patch('bytecodecompare.prepare_report.run_compiler', recording_run_compiler):
+            self.assertEqual(self.generate([], source_stream=iter(source_stream), jobs=4), expected_report)
+
+        self.assertEqual(len(compiled_sources), 8)
+        self.assertEqual(set(compiled_sources), set(source_stream))
+
+    def test_generate_report_should_not_recompile_cached_files(self):
+        cache = CompilationCache(Path(self.tmp_dir.name) / 'cache', self.compiler_path, max_size=1024 * 1024)
+
+        with TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-') as source_dir:
+            for i in range(4):
+                (Path(source_dir) / f'file{i}.sol').write_text(f'contract C{i} {{}}', encoding='utf8')
+
+            cwd = os.getcwd()
+            os.chdir(source_dir)
+            try:
+                first_report = self.generate(cache=cache)
+                with patch('bytecodecompare.prepare_report.run_compiler') as run_compiler_mock:
+                    second_report = self.generate(cache=cache)
+            finally:
+                os.chdir(cwd)
+
+        run_compiler_mock.assert_not_called()
+        self.assertEqual(second_report, first_report)
+
+    def test_generate_report_should_not_cache_abnormal_terminations(self):
+        cache = CompilationCache(Path(self.tmp_dir.name) / 'cache', self.compiler_path, max_size=1024 * 1024)
+
+        def crashing_run_compiler(compiler_path, source_file_name, optimize, *args):
+            if source_file_name == Path('file2.sol'):
+                return FileReport(file_name=source_file_name, contract_reports=None, abnormal_termination=True)
+            return fake_run_compiler(compiler_path, source_file_name, optimize, *args)
+
+        with TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-') as source_dir:
+            for i in range(4):
+                (Path(source_dir) / f'file{i}.sol').write_text(f'contract C{i} {{}}', encoding='utf8')
+
+            cwd = os.getcwd()
+            os.chdir(source_dir)
+            try:
+                with patch('bytecodecompare.prepare_report.run_compiler', crashing_run_compiler):
+                    self.assertIn("file2.sol: <ERROR>\n", self.generate(cache=cache))
+                with patch('bytecodecompare.prepare_report.run_compiler', wraps=fake_run_compiler) as run_compiler_mock:
+                    self.generate(cache=cache)
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(
+            [(call.args[1], call.args[2]) for call in run_compiler_mock.call_args_list],
+            [(Path('file2.sol'), False), (Path('file2.sol'), True)],
+        )
+
+    def test_generate_report_should_resume_interrupted_run(self):
+        compiled_files = []
+
+        def failing_run_compiler(compiler_path, source_file_name, optimize, *args):
+            if optimize and source_file_name == Path('file2.sol'):
+                raise KeyboardInterrupt()
+            return recording_run_compiler(compiler_path, source_file_name, optimize, *args)
+
+        def recording_run_compiler(compiler_path, source_file_name, optimize, *args):
+            compiled_files.append((source_file_name.name, optimize))
+            return fake_run_compiler(compiler_path, source_file_name, optimize, *args)
+
+        expected_report = self.generate()
+        journal_path = Path(self.tmp_dir.name) / 'report.txt.journal'
+        self.assertFalse(journal_path.exists())
+
+        with patch('bytecodecompare.prepare_report.run_compiler', failing_run_compiler):
+            with self.assertRaises(KeyboardInterrupt):
+                self.generate()
+        self.assertTrue(journal_path.exists())
+
+        compiled_files.clear()
+        with patch('bytecodecompare.prepare_report.run_compiler', recording_run_compiler):
+            self.assertEqual(self.generate(resume=True), expected_report)
+
+        self.assertEqual(compiled_files, [('file2.sol', True), ('file3.sol', True)])
+        self.assertFalse(journal_path.exists())
+
+    def test_generate_report_should_not_resume_run_with_different_compiler(self):
+        with patch('bytecodecompare.prepare_report.run_compiler', side_effect=KeyboardInterrupt()):
+            with self.assertRaises(KeyboardInterrupt):
+                self.generate()
+
+        compiled_files = []
+
+        def recording_run_compiler(compiler_path, source_file_name, optimize, *args):
+            compiled_files.append((source_file_name.name, optimize))
+            return fake_run_compiler(compiler_path, source_file_name, optimize, *args)
+
+        self.compiler_path.write_bytes(b'another compiler binary')
+        with patch('bytecodecompare.prepare_report.run_compiler', recording_run_compiler):
+            self.generate(resume=True)
+
+        self.assertEqual(len(compiled_files), 8)
+
+
+class FakeStandardJSONCompiler:
+    # Compiles every source into a single contract. Sources can trigger failures by containing:
+    # - 'located error': an error attributed to the source,
+    # - 'internal error': an internal compiler error without a location,
+    # - 'out of memory': a crash without any output, but only if compiled together with more than one other source.
+    # NOTE: Like solc >= 0.4.14, the metadata lists only the source of the contract.
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, _compiler_path, standard_json_input, *_args) -> str:
+        sources = json.loads(standard_json_input)['sources']
+        self.batches.append(list(sources))
+
+        if any('out of memory' in source['content'] for source in sources.values()) and len(sources) > 2:
+            return ''
+
+        errors = []
+        for source_name, source in sources.items():
+            if 'located error' in source['content']:
+                errors.append({'type': 'TypeError', 'severity': 'error', 'sourceLocation': {'file': source_name}})
+            if 'internal error' in source['content']:
+                errors.append({'type': 'CompilerError', 'severity': 'error'})
+        if len(errors) > 0:
+            return json.dumps({'errors': errors})
+
+        return json.dumps({'contracts': {
+            source_name: {'C': {
+                'evm': {'bytecode': {'object': '6080' + Path(source_name).stem}},
+                'metadata': json.dumps({'sources': [source_name]}),
+            }}
+            for source_name in sources
+        }})
+
+
+class TestRunCompilerBatch(PrepareReportTestBase):
+    def setUp(self):
+        super().setUp()
+        self.compiler = FakeStandardJSONCompiler()
+        patcher = patch('bytecodecompare.prepare_report.run_standard_json_compiler', self.compiler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def compile(self, source_contents, batch=None):
+        return run_compiler_batch(
+            Path('solc'),
+            [Path(source_name) for source_name in (batch if batch is not None else source_contents)],
+            False,
+            False,
+            CompilerInterface.STANDARD_JSON,
+            SMTUse.DISABLE,
+            True,
+            Path('.'),
+            False,
+            source_contents=source_contents,
+        )
+
+    def assert_same_as_separate_runs(self, source_contents, reports):
+        self.assertEqual(reports, [
+            self.compile(source_contents, [source_name])[0]
+            for source_name in source_contents
+        ])
+
+    def test_should_retry_files_with_located_errors_alone(self):
+        source_contents = {'a.sol': '', 'b.sol': 'located error', 'c.sol': '', 'd.sol': ''}
+
+        reports = self.compile(source_contents)
+
+        self.assertEqual(self.compiler.batches, [
+            ['a.sol', 'b.sol', 'c.sol', 'd.sol'],
+            ['b.sol'],
+            ['a.sol', 'c.sol', 'd.sol'],
+        ])
+        self.assertIsNone(reports[1].contract_reports)
+        self.assert_same_as_separate_runs(source_contents, reports)
+
+    def test_should_bisect_on_internal_compiler_error_without_location(self):
+        source_contents = {'a.sol': '', 'b.sol': 'internal error', 'c.sol': '', 'd.sol': ''}
+
+        reports = self.compile(source_contents)
+
+        self.assertEqual(self.compiler.batches, [
+            ['a.sol', 'b.sol', 'c.sol', 'd.sol'],
+            ['a.sol', 'b.sol'],
+            ['a.sol'],
+            ['b.sol'],
+            ['c.sol', 'd.sol'],
+        ])
+        self.assertIsNone(reports[1].contract_reports)
+        self.assert_same_as_separate_runs(source_contents, reports)
+
+    def test_should_bisect_on_crash(self):
+        source_contents = {'a.sol': '', 'b.sol': 'out of memory', 'c.sol': '', 'd.sol': ''}
+
+        reports = self.compile(source_contents)
+
+        self.assertEqual(self.compiler.batches, [['a.sol', 'b.sol', 'c.sol', 'd.sol'], ['a.sol', 'b.sol'], ['c.sol', 'd.sol']])
+        self.assertIsNotNone(reports[1].contract_reports)
+        self.assert_same_as_separate_runs(source_contents, reports)
+
+    def test_generate_report_should_not_depend_on_batch_size(self):
+        source_contents = {
+            f'file{i}.sol': ['', 'located error', 'internal error', 'out of memory'][i % 4]
+            for i in range(10)
+        }
+        with TemporaryDirectory(prefix='test_bytecodecompare_prepare_report-') as tmp_dir:
+            compiler_path = Path(tmp_dir) / 'solc'
+            compiler_path.write_bytes(b'compiler binary')
+
+            def generate(batch_size):
+                report_file_path = Path(tmp_dir) / f'report{batch_size}.txt'
+                with patch('bytecodecompare.prepare_report.detect_metadata_cli_option_support', lambda compiler_path: True):
+                    generate_report(
+                        [],
+                        compiler_path,
+                        CompilerInterface.STANDARD_JSON,
+                        SMTUse.DISABLE,
+                        force_no_optimize_yul=False,
+                        report_file_path=report_file_path,
+                        verbose=False,
+                        exit_on_error=False,
+                        batch_size=batch_size,
+                        source_stream=iter(source_contents.items()),
+                    )
+                return report_file_path.read_bytes()
+
+            single_file_report = generate(1)
+            batch_report = generate(4)
+
+        self.assertIn(b"file1.sol: <ERROR>\n", single_file_report)
+        self.assertIn(b"file3.sol:C 6080file3\n", single_file_report)
+        self.assertEqual(batch_report, single_file_report)
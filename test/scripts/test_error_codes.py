@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+
+import os
+import random
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
+# pragma pylint: disable=import-error
+from error_codes import IdIndex, find_changed_files, find_comment_spans, find_ids_in_source_files, fix_ids_in_source_files
+from error_codes import in_comment, plan_id_replacements
+# pragma pylint: enable=import-error
+
+
+class TestInComment(unittest.TestCase):
+    def comment_flags(self, source):
+        comment_spans = find_comment_spans(source)
+        return [in_comment(comment_spans, source.index(word)) for word in ['A', 'B', 'C', 'D']]
+
+    def test_should_detect_line_and_block_comments(self):
+        self.assertEqual(self.comment_flags("A // B\nC /* \n D */"), [False, True, False, True])
+
+    def test_should_ignore_comment_markers_in_string_literals(self):
+        self.assertEqual(self.comment_flags('"http://" A; "/*" B; "\\"//" C\n\'"\' D'), [False, False, False, False])
+
+    def test_should_ignore_comment_markers_in_raw_string_literals(self):
+        self.assertEqual(self.comment_flags('R"x(")x // A)x" B /* C\nD'), [False, False, True, True])
+
+    def test_should_ignore_unterminated_literals(self):
+        self.assertEqual(self.comment_flags('A "B /* C\nD'), [False, False, True, True])
+
+    def test_should_treat_unterminated_block_comment_as_comment_until_end_of_file(self):
+        self.assertEqual(self.comment_flags('A /* B " C\nD'), [False, True, True, True])
+
+
+ERROR_CODES_PATH = Path(__file__).parent.parent.parent / 'scripts/error_codes.py'
+
+
+class TestNextId(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_error_codes-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = Path(tmp_dir.name)
+
+        for directory in ['libevmasm', 'liblangutil', 'libsolc', 'libsolidity', 'libsolutil', 'libyul', 'solc']:
+            (self.tmp_dir / directory).mkdir()
+        for directory in ['errorRecoveryTests', 'smtCheckerTests', 'syntaxTests']:
+            (self.tmp_dir / 'test/libsolidity' / directory).mkdir(parents=True)
+        (self.tmp_dir / 'test/libyul/yulSyntaxTests').mkdir(parents=True)
+        (self.tmp_dir / 'libsolidity/source.cpp').write_text("m_errorReporter.typeError(1234_error, x);\n", encoding='utf8')
+        (self.tmp_dir / 'test/cmdlineTests/error_codes').mkdir(parents=True)
+        (self.tmp_dir / 'test/cmdlineTests/error_codes/err').write_text("Error (1234): x\n", encoding='utf8')
+
+    def next_id(self, hash_seed):
+        process = subprocess.run(
+            [sys.executable, str(ERROR_CODES_PATH), '--next', '--seed', '5', '--jobs', '1'],
+            cwd=self.tmp_dir,
+            env={**os.environ, 'PYTHONHASHSEED': hash_seed},
+            stdout=subprocess.PIPE,
+            encoding='utf8',
+            check=True,
+        )
+        return process.stdout.splitlines()[-1]
+
+    def test_should_give_the_same_id_for_the_same_seed_regardless_of_hash_seed(self):
+        self.assertRegex(self.next_id('1'), r"^Next ID: [1-9]\d{3}$")
+        self.assertEqual(self.next_id('1'), self.next_id('2'))
+        self.assertEqual(self.next_id('1'), self.next_id('3'))
+
+
+class TestFixIds(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_error_codes-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = Path(tmp_dir.name)
+
+    def write_sources(self, sources):
+        file_names = []
+        for name, content in sources.items():
+            (self.tmp_dir / name).mkdir(exist_ok=True)
+            file_name = str(self.tmp_dir / name / 'source.cpp')
+            Path(file_name).write_text(content, encoding='utf8')
+            file_names.append(file_name)
+        return file_names
+
+    def fix(self, sources, seed, jobs):
+        file_names = self.write_sources(sources)
+        random.seed(seed)
+        fix_ids_in_source_files(file_names, find_ids_in_source_files(file_names), jobs)
+        return [Path(file_name).read_text(encoding='utf8') for file_name in file_names]
+
+    def test_plan_should_keep_last_appearance_of_duplicates_and_replace_all_incorrect_ids(self):
+        id_to_file_names = {
+            '1234': ['a.cpp', 'b.cpp', 'b.cpp'],
+            '0123': ['b.cpp'],
+            '5678': ['c.cpp'],
+            '12345': ['a.cpp'],
+        }
+
+        self.assertEqual(
+            plan_id_replacements(['a.cpp', 'b.cpp', 'c.cpp'], id_to_file_names),
+            {'a.cpp': {'1234': 1, '12345': 1}, 'b.cpp': {'1234': 1, '0123': 1}},
+        )
+
+    def test_should_replace_only_incorrect_ids_outside_of_comments(self):
+        [fixed_a, fixed_b] = self.fix(
+            {
+                'a': "x(1234_error); // 1234_error\ny(0123_error);\n",
+                'b': "z(1234_error);\n",
+            },
+            seed=1,
+            jobs=1,
+        )
+
+        self.assertRegex(fixed_a, r"^x\(([1-9]\d{3})_error\); // 1234_error\ny\(([1-9]\d{3})_error\);\n$")
+        self.assertNotIn('x(1234_error)', fixed_a)
+        self.assertNotIn('0123_error', fixed_a)
+        self.assertEqual(fixed_b, "z(1234_error);\n")
+        self.assertEqual(list(self.tmp_dir.glob('**/*.tmp')), [])
+
+    def test_should_give_the_same_result_for_the_same_seed_regardless_of_the_number_of_jobs(self):
+        sources = {str(i): f"x({1000 + i % 3}_error);\ny(0{i}_error);\n" for i in range(8)}
+
+        self.assertEqual(self.fix(sources, seed=42, jobs=4), self.fix(sources, seed=42, jobs=1))
+
+
+class TestIdIndex(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_error_codes-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = Path(tmp_dir.name)
+        self.index_path = str(self.tmp_dir / 'index.json')
+
+        self.file_names = [str(self.tmp_dir / 'a.cpp'), str(self.tmp_dir / 'b.cpp')]
+        Path(self.file_names[0]).write_text("m_errorReporter.typeError(1234_error, x); // 5678_error\n", encoding='utf8')
+        Path(self.file_names[1]).write_text("m_errorReporter.typeError(1234_error, y);\n", encoding='utf8')
+
+    def scan(self, changed_file_names=frozenset()):
+        scanned_files = []
+
+        def recording_scan_file(file_name):
+            scanned_files.append(Path(file_name).name)
+            return [file_name[-5]]
+
+        result = IdIndex(self.index_path).scan(
+            'sources',
+            self.file_names,
+            recording_scan_file,
+            changed_file_names=changed_file_names,
+        )
+        return (result, scanned_files)
+
+    def test_should_find_the_same_ids_with_and_without_index(self):
+        expected_ids = {'1234': self.file_names}
+
+        self.assertEqual(find_ids_in_source_files(self.file_names), expected_ids)
+        self.assertEqual(find_ids_in_source_files(self.file_names, IdIndex(self.index_path)), expected_ids)
+        self.assertEqual(find_ids_in_source_files(self.file_names, IdIndex(self.index_path)), expected_ids)
+
+    def test_should_not_depend_on_the_number_of_jobs(self):
+        for i in range(10):
+            file_name = str(self.tmp_dir / f'{i}.cpp')
+            Path(file_name).write_text(f"m_errorReporter.typeError({1000 + i % 3}_error, x);\n", encoding='utf8')
+            self.file_names.append(file_name)
+
+        self.assertEqual(find_ids_in_source_files(self.file_names, jobs=4), find_ids_in_source_files(self.file_names))
+        self.assertEqual(
+            find_ids_in_source_files(self.file_names, IdIndex(self.index_path), jobs=4),
+            find_ids_in_source_files(self.file_names),
+        )
+
+    def test_should_scan_only_changed_files(self):
+        self.assertEqual(self.scan()[1], ['a.cpp', 'b.cpp'])
+        self.assertEqual(self.scan(), ({self.file_names[0]: ['a'], self.file_names[1]: ['b']}, []))
+
+        Path(self.file_names[1]).write_text("m_errorReporter.typeError(4321_error, y);\n", encoding='utf8')
+        self.assertEqual(self.scan()[1], ['b.cpp'])
+
+    def test_should_not_scan_files_that_were_only_touched(self):
+        self.scan()
+
+        os.utime(self.file_names[0], ns=(0, 0))
+        self.assertEqual(self.scan()[1], [])
+
+    def test_should_always_scan_files_reported_as_changed(self):
+        self.scan()
+
+        # Same size and modification time, so the index alone would not notice the change.
+        stat = os.stat(self.file_names[1])
+        Path(self.file_names[1]).write_text("m_errorReporter.typeError(4321_error, y);\n", encoding='utf8')
+        os.utime(self.file_names[1], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self.scan()[1], [])
+        self.assertEqual(self.scan({self.file_names[1]})[1], ['b.cpp'])
+
+    def test_should_find_new_ids_in_files_reported_as_changed(self):
+        find_ids_in_source_files(self.file_names, IdIndex(self.index_path))
+
+        stat = os.stat(self.file_names[1])
+        Path(self.file_names[1]).write_text("m_errorReporter.typeError(4321_error, y);\n", encoding='utf8')
+        os.utime(self.file_names[1], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(
+            find_ids_in_source_files(self.file_names, IdIndex(self.index_path), changed_file_names={self.file_names[1]}),
+            {'1234': [self.file_names[0]], '4321': [self.file_names[1]]},
+        )
+
+    def test_should_rebuild_index_that_cannot_be_read(self):
+        Path(self.index_path).write_text("{", encoding='utf8')
+
+        self.assertEqual(self.scan()[1], ['a.cpp', 'b.cpp'])
+        self.assertEqual(self.scan()[1], [])
+
+
+class TestFindChangedFiles(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_error_codes-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.repo_dir = Path(tmp_dir.name)
+
+    def git(self, *args):
+        subprocess.run(
+            ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+            cwd=self.repo_dir,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+
+    def test_should_find_modified_added_and_untracked_files(self):
+        self.git('init', '-q')
+        for name in ['unchanged.cpp', 'modified.cpp', 'removed.cpp']:
+            (self.repo_dir / name).write_text("// file\n", encoding='utf8')
+        self.git('add', '.')
+        self.git('commit', '-q', '-m', 'initial')
+
+        (self.repo_dir / 'modified.cpp').write_text("// modified\n", encoding='utf8')
+        (self.repo_dir / 'removed.cpp').unlink()
+        (self.repo_dir / 'added.cpp').write_text("// added\n", encoding='utf8')
+        self.git('add', 'added.cpp')
+        (self.repo_dir / 'untracked.cpp').write_text("// untracked\n", encoding='utf8')
+
+        self.assertEqual(
+            find_changed_files(str(self.repo_dir), 'HEAD'),
+            {str(self.repo_dir / name) for name in ['modified.cpp', 'removed.cpp', 'added.cpp', 'untracked.cpp']},
+        )
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
+# pragma pylint: disable=import-error
+from isolate_tests import extract_and_write_changed, find_input_files, write_cases
+# pragma pylint: enable=import-error
+
+
+class TestWriteCases(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_isolate_tests-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp_dir.name)
+
+    def test_should_name_files_after_test_and_input_file(self):
+        outputs = write_cases('A-b.cpp', ['    contract A {}\n', '    contract A {}\n'])
+
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertTrue(outputs[0].startswith('test_') and outputs[0].endswith('_a_b_cpp.sol'))
+        self.assertEqual(Path(outputs[0]).read_text(encoding='utf8'), 'contract A {}\n')
+
+    def test_should_write_identical_test_cases_once_when_deduplicating(self):
+        outputs_a = write_cases('a.cpp', ['    contract A {}\n', 'contract B {}\n'], True)
+        outputs_b = write_cases('b.rst', ['contract A {}\n'], True)
+
+        self.assertEqual(outputs_b, [outputs_a[0]])
+        self.assertEqual(sorted(outputs_a), sorted(str(path) for path in Path('.').glob('*.sol')))
+        self.assertEqual(Path(outputs_a[0]).read_text(encoding='utf8'), 'contract A {}\n')
+
+
+class TestExtractAndWriteChanged(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_isolate_tests-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.input_dir = Path(tmp_dir.name) / 'input'
+        self.output_dir = Path(tmp_dir.name) / 'output'
+        self.input_dir.mkdir()
+        self.output_dir.mkdir()
+
+        # Extracted files are always written to the current working directory.
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.output_dir)
+
+    def extract(self, deduplicate=False):
+        (_outputs_by_input, changed_count, stale_count) = extract_and_write_changed(
+            str(self.input_dir),
+            find_input_files(str(self.input_dir)),
+            False,
+            1,
+            str(self.output_dir / 'manifest.json'),
+            deduplicate,
+        )
+        return (changed_count, stale_count)
+
+    def outputs(self):
+        return sorted(path.name for path in self.output_dir.glob('*.sol'))
+
+    def test_should_extract_only_new_and_modified_files(self):
+        (self.input_dir / 'a.sol').write_text("contract A {}\n", encoding='utf8')
+        (self.input_dir / 'b.sol').write_text("contract B {}\n", encoding='utf8')
+
+        self.assertEqual(self.extract(), (2, 0))
+        self.assertEqual(len(self.outputs()), 2)
+        self.assertEqual(self.extract(), (0, 0))
+
+        (self.input_dir / 'b.sol').write_text("contract B2 {}\n", encoding='utf8')
+        self.assertEqual(self.extract(), (1, 1))
+        self.assertEqual(len(self.outputs()), 2)
+        self.assertIn(
+            "contract B2 {}\n",
+            [(self.output_dir / output).read_text(encoding='utf8') for output in self.outputs()],
+        )
+
+    def test_should_not_extract_files_that_were_only_touched(self):
+        (self.input_dir / 'a.sol').write_text("contract A {}\n", encoding='utf8')
+        self.assertEqual(self.extract(), (1, 0))
+
+        os.utime(self.input_dir / 'a.sol', ns=(0, 0))
+        self.assertEqual(self.extract(), (0, 0))
+
+    def test_should_remove_outputs_of_removed_files(self):
+        (self.input_dir / 'a.sol').write_text("contract A {}\n", encoding='utf8')
+        (self.input_dir / 'b.sol').write_text("contract B {}\n", encoding='utf8')
+        self.extract()
+        outputs_before = self.outputs()
+
+        (self.input_dir / 'b.sol').unlink()
+        self.assertEqual(self.extract(), (0, 1))
+        self.assertEqual(self.outputs(), [output for output in outputs_before if output.endswith('_a_sol.sol')])
+
+    def test_should_keep_outputs_still_produced_by_other_inputs(self):
+        (self.input_dir / 'x').mkdir()
+        (self.input_dir / 'y').mkdir()
+        (self.input_dir / 'x/a.sol').write_text("contract A {}\n", encoding='utf8')
+        (self.input_dir / 'y/a.sol').write_text("contract A {}\n", encoding='utf8')
+        self.extract()
+        self.assertEqual(len(self.outputs()), 1)
+
+        (self.input_dir / 'y/a.sol').unlink()
+        self.assertEqual(self.extract(), (0, 0))
+        self.assertEqual(len(self.outputs()), 1)
+
+    def test_should_extract_again_if_outputs_are_missing(self):
+        (self.input_dir / 'a.sol').write_text("contract A {}\n", encoding='utf8')
+        self.extract()
+        for output in self.outputs():
+            (self.output_dir / output).unlink()
+
+        self.assertEqual(self.extract(), (1, 0))
+        self.assertEqual(len(self.outputs()), 1)
+
+    def test_should_keep_deduplicated_outputs_still_produced_by_other_inputs(self):
+        (self.input_dir / 'a.sol').write_text("contract A {}\n", encoding='utf8')
+        (self.input_dir / 'b.sol').write_text("contract A {}\n", encoding='utf8')
+        self.assertEqual(self.extract(True), (2, 0))
+        self.assertEqual(len(self.outputs()), 1)
+
+        (self.input_dir / 'b.sol').write_text("contract B {}\n", encoding='utf8')
+        self.assertEqual(self.extract(True), (1, 0))
+        self.assertEqual(len(self.outputs()), 2)
+
+        (self.input_dir / 'a.sol').unlink()
+        self.assertEqual(self.extract(True), (0, 1))
+        self.assertEqual(len(self.outputs()), 1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
+# pragma pylint: disable=import-error
+from snippet_extraction import MisindentedCodeError, iter_doc_cases, iter_raw_strings, iter_test_cases
+# pragma pylint: enable=import-error
+
+
+class TestIterTestCases(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_snippet_extraction-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.source_path = Path(tmp_dir.name) / 'test.cpp'
+
+    def extract(self, content: str):
+        with open(self.source_path, 'w', encoding='utf8', newline='') as source_file:
+            source_file.write(content)
+        return list(iter_test_cases(self.source_path))
+
+    def test_should_extract_raw_strings(self):
+        self.assertEqual(
+            self.extract(
+                'char const* a = R"(\n'
+                '    contract A {}\n'
+                ')";\n'
+                'char const* b = R"DELIMITER(  \n'
+                '    contract B { string s = ")"; }\n'
+                '\n'
+                '  )DELIMITER";  \n'
+                'char const* c = "contract C {}";\n'
+            ),
+            ['    contract A {}\n', '    contract B { string s = ")"; }\n\n'],
+        )
+
+    def test_should_handle_empty_and_unterminated_raw_strings(self):
+        self.assertEqual(self.extract('R"(\n)";\nR"(\ncontract A {}'), ['', 'contract A {}\n'])
+        self.assertEqual(self.extract('R"('), [''])
+
+    def test_should_return_solidity_files_as_is(self):
+        self.source_path = self.source_path.with_suffix('.sol')
+        self.assertEqual(self.extract('contract A {}\r\nR"(\n'), ['contract A {}\r\nR"(\n'])
+
+    def test_should_normalize_line_breaks(self):
+        self.assertEqual(self.extract('R"(\r\ncontract A {}\r\n)";\r\n'), ['contract A {}\n'])
+        self.assertEqual(self.extract('R"(\rcontract A {}\r)";'), ['contract A {}\n'])
+
+
+class TestIterDocCases(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_snippet_extraction-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.source_path = Path(tmp_dir.name) / 'doc.rst'
+
+    def extract(self, content: str):
+        with open(self.source_path, 'w', encoding='utf8', newline='') as source_file:
+            source_file.write(content)
+        return list(iter_doc_cases(self.source_path))
+
+    def test_should_extract_indented_blocks_with_code(self):
+        self.assertEqual(
+            self.extract(
+                '.. code-block:: solidity\n'
+                '\n'
+                '    pragma solidity >=0.4.0;\n'
+                '\n'
+                '    contract C {\n'
+                '        function f() public {}\n'
+                '    }\n'
+                '\n'
+                'Text.\n'
+                '\n'
+                '    Indented text without code.\n'
+                '\n'
+                '::\n'
+                '\n'
+                '    contract D {}'
+            ),
+            [
+                '    pragma solidity >=0.4.0;\n\n    contract C {\n        function f() public {}\n    }\n\n',
+                '    contract D {}\n',
+            ],
+        )
+
+    def test_should_report_incorrectly_indented_code(self):
+        with self.assertRaises(MisindentedCodeError) as error_context:
+            self.extract('Text.\n\n    contract C {\n      }\n   contract D {\n    }\n')
+
+        self.assertEqual(error_context.exception.path, str(self.source_path))
+        self.assertEqual(error_context.exception.block, '    contract C {\n      }\n   contract D {\n    }\n')
+
+
+class TestIterRawStrings(unittest.TestCase):
+    def test_should_report_offsets_and_termination(self):
+        content = 'a\nx = R"(\nA\n)";\nb\ny = R"(\nB\n'
+
+        self.assertEqual(
+            [(r.body, content[r.start:r.end], r.terminated) for r in iter_raw_strings(content)],
+            [('A\n', 'R"(\nA\n)";\n', True), ('B\n', 'R"(\nB\n', False)],
+        )
+
+    def test_should_apply_legacy_rules(self):
+        content = 'x = R"(first \n  A\r\n  last)"; \ry = R"D( B)D";\nz = R"( C'
+
+        self.assertEqual(
+            [(r.body, content[r.start:r.end], r.terminated) for r in iter_raw_strings(content, legacy_rules=True)],
+            [
+                ('first  A\nlast', 'R"(first \n  A\r\n  last)"; \r', True),
+                (' B)D";z = R"( C\n', 'R"D( B)D";\nz = R"( C', False),
+            ],
+        )
+
+
+class TestIterLegacyTestCases(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_snippet_extraction-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_path = Path(tmp_dir.name)
+
+    def extract(self, file_name: str, content: bytes):
+        (self.tmp_path / file_name).write_bytes(content)
+        return list(iter_test_cases(self.tmp_path / file_name, legacy_rules=True))
+
+    def test_should_extract_raw_strings_from_any_file(self):
+        self.assertEqual(self.extract('test.txt', b'R"(\r\ncontract A {}\r\n)";\r\n'), ['contract A {}\n'])
+
+    def test_should_preserve_undecodable_bytes(self):
+        [sol_case] = self.extract('test.sol', b'contract C {}\r\n// \xff\n')
+        [cpp_case] = self.extract('test.cpp', b'R"(\n\xff\n)";\n')
+
+        self.assertEqual(sol_case.encode('utf-8', 'surrogateescape'), b'contract C {}\r\n// \xff\n')
+        self.assertEqual(cpp_case.encode('utf-8', 'surrogateescape'), b'\xff\n')
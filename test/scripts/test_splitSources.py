@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# NOTE: This test file file only works with scripts/ added to PYTHONPATH so pylint can't find the imports
+# pragma pylint: disable=import-error
+from splitSources import USAGE_ERROR_EXIT_CODE, parseSources, splitAll
+# pragma pylint: enable=import-error
+
+SPLIT_SOURCES_PATH = Path(__file__).parents[2] / 'scripts' / 'splitSources.py'
+
+
+class TestSplitAll(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = TemporaryDirectory(prefix='test_splitSources-')
+        self.addCleanup(tmp_dir.cleanup)
+        self.input_dir = Path(tmp_dir.name) / 'input'
+        self.output_dir = Path(tmp_dir.name) / 'output'
+        self.input_dir.mkdir()
+
+        (self.input_dir / 'multi.sol').write_text(
+            "==== Source: a.sol ====\n"
+            "contract A {}\n"
+            "==== Source: dir/b.sol ====\n"
+            "import \"a.sol\";\n",
+            encoding='utf8',
+        )
+        (self.input_dir / 'single.sol').write_text("contract C {}\n", encoding='utf8')
+        (self.input_dir / 'invalid_utf8.sol').write_bytes(b"contract C { string s = \"\xff\"; }\n")
+
+    def split(self, jobs):
+        test_files = [str(self.input_dir / name) for name in ['multi.sol', 'single.sol', 'invalid_utf8.sol']]
+        return splitAll(test_files, str(self.output_dir), jobs)
+
+    def test_should_split_every_file_into_its_own_directory(self):
+        results = self.split(1)
+
+        self.assertEqual([result['sources'] for result in results], [['a.sol', 'dir/b.sol'], None, None])
+        self.assertEqual([result['directory'] for result in results], [str(self.output_dir / str(i)) for i in range(3)])
+        self.assertEqual([result['error'] is not None for result in results], [False, False, True])
+        self.assertEqual((self.output_dir / '0/a.sol').read_text(encoding='utf8'), "contract A {}\n")
+        self.assertEqual((self.output_dir / '0/dir/b.sol').read_text(encoding='utf8'), "import \"a.sol\";\n")
+        self.assertEqual(list((self.output_dir / '1').iterdir()), [])
+
+    def test_should_not_depend_on_the_number_of_jobs(self):
+        self.assertEqual(self.split(4), self.split(1))
+
+
+class TestParseSources(unittest.TestCase):
+    def test_should_return_sources_in_order_of_appearance(self):
+        lines = [
+            "==== Source: b.sol ====",
+            "// comment",
+            "contract B {}",
+            "==== Source: a.sol ====",
+            "==== Source: b.sol ====",
+            "contract B2 {}",
+        ]
+
+        self.assertEqual(
+            list(parseSources(lines).items()),
+            [('b.sol', "// comment\ncontract B {}\ncontract B2 {}\n"), ('a.sol', "")],
+        )
+
+    def test_should_return_none_for_single_source_files(self):
+        self.assertIsNone(parseSources(["contract C {}", "==== Source: a.sol ===="]))
+        self.assertIsNone(parseSources([]))
+
+
+class TestCommandLine(unittest.TestCase):
+    def test_should_not_report_usage_errors_as_invalid_utf8(self):
+        for arguments in [[], ['a.sol', 'b.sol'], ['--jobs', 'x', 'a.sol']]:
+            with self.subTest(arguments=arguments):
+                result = subprocess.run(
+                    [sys.executable, str(SPLIT_SOURCES_PATH)] + arguments,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    check=False,
+                )
+                self.assertEqual(result.returncode, USAGE_ERROR_EXIT_CODE)